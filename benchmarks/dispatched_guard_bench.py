@@ -0,0 +1,75 @@
+"""
+Benchmark: memory and lookup latency of the dispatched-song guard at 1M entries.
+
+Run from the repository root:
+
+    python -m benchmarks.dispatched_guard_bench
+
+Compares the previous ``set`` of (team, URL) string tuples with
+DispatchedGuard holding everything exactly, and with a 100k exact window in
+front of a Bloom filter sized for 1M entries (0.1% false positives).
+"""
+
+import random
+import time
+import tracemalloc
+
+from services.queue.dispatched_guard import DispatchedGuard
+
+ENTRIES = 1_000_000
+LOOKUPS = 100_000
+TEAMS = [f"🎤equipo︱{n}︱test" for n in range(50)]
+ALPHABET = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_"
+LAST = "AEIMQUYcgkosw048"
+
+
+class TupleSet(set):
+    """The previous guard: a set of (team, link) tuples."""
+
+    def add(self, team, video_id):
+        super().add((team, f"https://www.youtube.com/watch?v={video_id}"))
+
+    def __contains__(self, item):
+        team, video_id = item
+        return super().__contains__((team, f"https://www.youtube.com/watch?v={video_id}"))
+
+
+def random_id(rng: random.Random) -> str:
+    return "".join(rng.choice(ALPHABET) for _ in range(10)) + rng.choice(LAST)
+
+
+def run(name: str, factory, entries: list, probes_hit: list, probes_miss: list) -> None:
+    tracemalloc.start()
+    guard = factory()
+    for team, video_id in entries:
+        guard.add(team, video_id)
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    hits = sum(1 for item in probes_hit if item in guard)
+    hit_time = time.perf_counter() - start
+    start = time.perf_counter()
+    false_hits = sum(1 for item in probes_miss if item in guard)
+    miss_time = time.perf_counter() - start
+
+    print(f"{name:<26} | {memory / 2**20:8.1f} MiB | {memory / len(entries):6.1f} B/entry "
+          f"| hit {hit_time / len(probes_hit) * 1e6:5.2f} µs ({hits / len(probes_hit):.1%}) "
+          f"| miss {miss_time / len(probes_miss) * 1e6:5.2f} µs ({false_hits / len(probes_miss):.2%} false hits)")
+
+
+def main() -> None:
+    rng = random.Random(1)
+    entries = [(rng.choice(TEAMS), random_id(rng)) for _ in range(ENTRIES)]
+    probes_hit = rng.sample(entries, LOOKUPS)
+    probes_miss = [(rng.choice(TEAMS), random_id(rng)) for _ in range(LOOKUPS)]
+
+    print(f"{ENTRIES} dispatched entries, {LOOKUPS} lookups each for hits and misses")
+    run("set of (team, URL)", TupleSet, entries, probes_hit, probes_miss)
+    run("guard, exact", DispatchedGuard, entries, probes_hit, probes_miss)
+    run("guard, 100k window + Bloom", lambda: DispatchedGuard(100_000, ENTRIES, 0.001),
+        entries, probes_hit, probes_miss)
+
+
+if __name__ == "__main__":
+    main()
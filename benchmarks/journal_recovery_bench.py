@@ -0,0 +1,89 @@
+"""
+Benchmark: QueueJournal record cost and crash-recovery time for a 50k-operation night.
+
+Run from the repository root:
+
+    python -m benchmarks.journal_recovery_bench
+
+A synthetic night (links staged, edited, deleted and dispatched in cycles) is
+driven through a journaled QueueBuffer/QueueManager. The journal is then
+reopened into fresh objects, once replaying the full log and once from the
+periodic snapshots, and the recovered state is checked against the original.
+"""
+
+import contextlib
+import io
+import logging
+import random
+import tempfile
+import time
+
+from services.queue.journal import QueueJournal, _STOP, logger as journal_logger
+from services.queue.queue_buffer import QueueBuffer
+from services.queue.queue_manager import QueueManager, logger as queue_logger
+
+OPERATIONS = 50_000
+TEAMS = [f"🎤equipo︱{n}︱" for n in range(30)]
+
+
+def drive(buffer: QueueBuffer, queue: QueueManager, journal: QueueJournal) -> None:
+    """Run the synthetic night until the journal has seen OPERATIONS operations."""
+    rng = random.Random(50)
+    staged = []
+    n = 0
+    while journal._seq < OPERATIONS:
+        n += 1
+        team = rng.choice(TEAMS)
+        link = f"https://youtu.be/{n:011d}"
+        roll = rng.random()
+        if roll < 0.70 or not staged:
+            if buffer.add_song(team, link)["success"]:
+                staged.append((team, link))
+        elif roll < 0.80:
+            old_team, old_link = staged.pop(rng.randrange(len(staged)))
+            if buffer.replace_song(old_team, old_link, link)["success"]:
+                staged.append((old_team, link))
+        elif roll < 0.90:
+            buffer.delete_song(*staged.pop(rng.randrange(len(staged))))
+        else:
+            buffer.apply_to(queue)
+            staged.clear()
+
+
+def run(snapshot_every: int) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        journal = QueueJournal(directory, snapshot_every=snapshot_every, fsync=False)
+        buffer, queue = QueueBuffer(), QueueManager()
+        journal.recover(buffer, queue)
+
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):      # apply_to is chatty
+            drive(buffer, queue, journal)
+        elapsed = time.perf_counter() - start
+        # Simulate a crash: wait for the writer, but skip the final snapshot
+        journal._writes.put(_STOP)
+        journal._thread.join()
+
+        fresh_buffer, fresh_queue = QueueBuffer(), QueueManager()
+        start = time.perf_counter()
+        recovered = QueueJournal(directory, snapshot_every=snapshot_every, fsync=False)
+        replayed = recovered.recover(fresh_buffer, fresh_queue)
+        recovery = time.perf_counter() - start
+        recovered.close()
+
+        assert fresh_buffer.to_state() == buffer.to_state()
+        assert fresh_queue.to_state()["queues"] == queue.to_state()["queues"]
+        print(f"snapshot every {snapshot_every:>6} ops | driving: {elapsed / OPERATIONS * 1e6:6.2f} µs/op "
+              f"| replayed {replayed:>6} ops | recovery {recovery * 1000:7.1f} ms")
+
+
+def main() -> None:
+    for log in (journal_logger, queue_logger):
+        log.setLevel(logging.WARNING)
+    print("(driving time includes the buffer/queue work, not only journaling)")
+    for snapshot_every in (10**9, 2000):
+        run(snapshot_every)
+
+
+if __name__ == "__main__":
+    main()
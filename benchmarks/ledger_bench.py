@@ -0,0 +1,84 @@
+"""
+Benchmark: recording dispatched songs with a 100k-song history.
+
+Run from the repository root:
+
+    python -m benchmarks.ledger_bench
+
+1. One dispatch cycle (3 songs) written the old way (read, parse, extend and
+   rewrite dispatched_songs.json with indent=4) versus appended to the
+   JSON-lines ledger (until the writer thread has fsynced it).
+2. kai_api answering /songs after that cycle: parsing the whole JSON file
+   versus an incremental LedgerReader refresh.
+"""
+
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from services.ledger import LedgerReader, SongLedger
+from services.queue.song_entry import SongEntry, decode_songs
+from services.video_id import unpack_video_id
+
+HISTORY = 100_000
+CYCLES = 5
+SONGS_PER_CYCLE = 3
+TEAMS = [f"🎤equipo︱{n}︱test" for n in range(30)]
+
+
+def song(n: int) -> SongEntry:
+    return SongEntry(TEAMS[n % len(TEAMS)], unpack_video_id(n * 7919), 1745940600 + n)
+
+
+def legacy_cycle(path: Path, songs) -> None:
+    """MusicDispatcherCog._write_dispatched_songs before the ledger."""
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (FileNotFoundError, json.JSONDecodeError):
+        data = []
+    data.extend(s.to_dict() for s in songs)
+    path.write_text(json.dumps(data, indent=4), encoding="utf-8")
+
+
+def main() -> None:
+    directory = Path(tempfile.mkdtemp())
+    history = [song(n) for n in range(HISTORY)]
+    cycles = [[song(HISTORY + c * SONGS_PER_CYCLE + i) for i in range(SONGS_PER_CYCLE)] for c in range(CYCLES)]
+
+    legacy_path = directory / "dispatched_songs.json"
+    legacy_path.write_text(json.dumps([s.to_dict() for s in history], indent=4), encoding="utf-8")
+    start = time.perf_counter()
+    for songs in cycles:
+        legacy_cycle(legacy_path, songs)
+    legacy_write = (time.perf_counter() - start) / CYCLES
+    start = time.perf_counter()
+    decode_songs(legacy_path.read_text(encoding="utf-8"))
+    legacy_read = time.perf_counter() - start
+
+    ledger_path = directory / "dispatched_songs.jsonl"
+    ledger = SongLedger(ledger_path, legacy_path=None)
+    ledger.append(history)
+    ledger.close()
+    reader = LedgerReader(ledger_path)
+    reader.refresh()
+
+    write_times, read_times = [], []
+    for songs in cycles:
+        ledger = SongLedger(ledger_path, legacy_path=None)     # reopened so close() can wait for the fsync
+        start = time.perf_counter()
+        ledger.append(songs)
+        ledger.close()
+        write_times.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        reader.refresh()
+        read_times.append(time.perf_counter() - start)
+
+    print(f"history {HISTORY} songs, {SONGS_PER_CYCLE} songs per cycle")
+    print(f"{'':<22} | {'write/cycle ms':>14} | {'/songs read ms':>14}")
+    print(f"{'JSON rewrite':<22} | {legacy_write * 1e3:>14.2f} | {legacy_read * 1e3:>14.2f}")
+    print(f"{'JSON-lines ledger':<22} | {min(write_times) * 1e3:>14.2f} | {min(read_times) * 1e3:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
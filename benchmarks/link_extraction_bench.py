@@ -0,0 +1,94 @@
+"""
+Benchmark: extracting the song from team-channel messages.
+
+Run from the repository root:
+
+    python -m benchmarks.link_extraction_bench
+
+The corpus is message texts built around the YouTube URLs found in
+notebooks/bot_dj.ipynb, rewritten into every URL form people paste
+(watch, m., music., shorts, live, youtu.be, ?si= / &list= variants), mixed
+with plain chatter. For each, the old LinkManager path (its own regex, then
+the URL parser on the link it found) is compared with
+services.video_id.extract_video_ids, on
+
+1. throughput (messages per second, URL cache bypassed), and
+2. how many of the messages holding one link each recognise.
+"""
+
+import random
+import re
+import time
+
+from services.video_id import extract_video_ids, video_id_from_url
+
+MESSAGES = 50_000
+OLD_REGEX = re.compile(r'(https?://(?:www\.)?youtube\.com/watch\?v=[\w-]+|https?://youtu\.be/[\w-]+)')
+parse = video_id_from_url.__wrapped__        # bypass the URL cache: every message is a new string
+CHATTER = [
+    "hola a todos!", "¿quién canta la siguiente?", "esa canción es buenísima 🎤",
+    "jajaja", "me toca?", "ahora vuelvo", "subid el volumen porfa",
+]
+
+
+def corpus_ids() -> list[str]:
+    with open("notebooks/bot_dj.ipynb", encoding="utf-8") as fh:
+        text = fh.read()
+    return sorted(set(re.findall(r"(?:v=|youtu\.be/)([A-Za-z0-9_-]{11})", text)))
+
+
+def url_form(video_id: str, rng: random.Random) -> str:
+    return rng.choice([
+        f"https://www.youtube.com/watch?v={video_id}",
+        f"https://www.youtube.com/watch?v={video_id}&list=PL{rng.getrandbits(40):x}",
+        f"https://youtu.be/{video_id}?si={rng.getrandbits(40):x}",
+        f"https://youtu.be/{video_id}",
+        f"https://m.youtube.com/watch?v={video_id}",
+        f"https://music.youtube.com/watch?v={video_id}&si={rng.getrandbits(40):x}",
+        f"https://youtube.com/shorts/{video_id}?si={rng.getrandbits(40):x}",
+        f"https://www.youtube.com/live/{video_id}",
+    ])
+
+
+def messages(ids: list[str]) -> list[str]:
+    rng = random.Random(8)
+    texts = []
+    for _ in range(MESSAGES):
+        if rng.random() < 0.3:
+            texts.append(rng.choice(CHATTER))
+        else:
+            texts.append(rng.choice(["{}", "mi canción: {}", "{} 🎶", "esta! {} porfa"]).format(url_form(rng.choice(ids), rng)))
+    return texts
+
+
+def old_validate(text: str):
+    links = OLD_REGEX.findall(text)
+    if len(links) == 1:
+        video_id = parse(links[0])
+        if video_id:
+            return True, video_id
+    return False, None
+
+
+def new_validate(text: str):
+    video_ids = extract_video_ids(text)
+    if len(video_ids) == 1:
+        return True, video_ids[0]
+    return False, None
+
+
+def main() -> None:
+    texts = messages(corpus_ids())
+    with_link = sum("youtu" in text for text in texts)
+    print(f"{MESSAGES} messages, {with_link} with a link")
+    print(f"{'extractor':<18} | {'msg/s':>9} | {'µs/link found':>13} | {'links recognised':>16}")
+    for name, validate in (("LinkManager (old)", old_validate), ("extract_video_ids", new_validate)):
+        start = time.perf_counter()
+        found = sum(validate(text)[0] for text in texts)
+        elapsed = time.perf_counter() - start
+        print(f"{name:<18} | {MESSAGES / elapsed:>9.0f} | {elapsed / found * 1e6:>13.2f} | "
+              f"{found:>7} ({found / with_link:>5.1%})")
+
+
+if __name__ == "__main__":
+    main()
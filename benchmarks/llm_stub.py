@@ -0,0 +1,191 @@
+"""
+Local OpenAI-compatible stand-in for the LLM behind SmartBotService.
+
+Run from the repository root:
+
+    python -m benchmarks.llm_stub --port 8001 --latency 0.8 --error-rate 0.02
+
+and point the bot at it in config.yaml (any key starting with ``sk-``):
+
+    smart_bot:
+      deepseek_key: sk-stub
+      base_url: http://127.0.0.1:8001
+
+It serves ``GET /models`` and ``POST /chat/completions`` (with or without
+a ``/v1`` prefix), over keep-alive HTTP/1.1, and answers
+
+* with a tool call when the request carries ``tools`` (instructor's default
+  mode), with the JSON arguments in the message content otherwise;
+* with the canned result (``--canned``, a JSON file; by default a valid
+  ValidationFormat) for a single-object schema, or that result repeated
+  ``minItems`` times for the batched ``results`` schema;
+* after ``latency`` seconds (+ ``latency_per_item`` per result), or with a
+  500 error for a share ``error_rate`` of the requests.
+
+Requests, errors and results served are counted on the StubLLMServer,
+which benchmarks/presentation_bench.py runs in-process.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+DEFAULT_RESULT: Dict[str, Any] = {
+    "name": "Ana", "city": "Barcelona", "age": 27, "finding_us": "Instagram", "interest": "karaoke",
+    "job": None, "platform": "PC", "anime": "Frieren", "additional": None,
+    "is_valid": True, "output_message": "¡Bienvenida a BcnNoKai! Ya tienes el rol de Kai Timido Aprendiz.",
+}
+
+
+class StubLLMServer:
+    """OpenAI-compatible chat-completions and models endpoints with scripted behaviour."""
+
+    def __init__(
+        self,
+        latency: float = 0.5,
+        latency_per_item: float = 0.0,
+        error_rate: float = 0.0,
+        canned: Optional[Dict[str, Any]] = None,
+        model: str = "deepseek-chat",
+        seed: Optional[int] = None,
+    ) -> None:
+        self.latency = latency
+        self.latency_per_item = latency_per_item
+        self.error_rate = error_rate
+        self.canned = canned if canned is not None else DEFAULT_RESULT
+        self.model = model
+        self.requests = 0
+        self.errors = 0
+        self.results = 0
+        # Messages of the last chat completion received (what the client sent)
+        self.last_messages: List[Dict[str, Any]] = []
+        self._random = random.Random(seed)
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Start serving; returns the base URL (*port* 0 picks a free one)."""
+        self._server = await asyncio.start_server(self._connection, host, port)
+        return "http://%s:%d" % self._server.sockets[0].getsockname()[:2]
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    def describe(self) -> str:
+        return f"{self.requests} request(s), {self.errors} error(s), {self.results} result(s) served"
+
+    # ------------------------------------------------------------------
+    # HTTP
+    # ------------------------------------------------------------------
+
+    async def _connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    return
+                request_line, *header_lines = head.decode("latin-1").split("\r\n")
+                method, path, _ = request_line.split(" ", 2)
+                headers = {name.strip().lower(): value.strip()
+                           for name, _, value in (line.partition(":") for line in header_lines if line)}
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+
+                status, payload = await self._respond(method, path.split("?")[0].removeprefix("/v1"), body)
+                data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                writer.write(b"HTTP/1.1 %d %s\r\nContent-Type: application/json\r\nContent-Length: %d\r\n\r\n"
+                             % (status, b"OK" if status == 200 else b"Error", len(data)) + data)
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close":
+                    return
+        finally:
+            writer.close()
+
+    async def _respond(self, method: str, path: str, body: bytes) -> Tuple[int, Dict[str, Any]]:
+        if method == "GET" and path == "/models":
+            return 200, {"object": "list", "data": [
+                {"id": self.model, "object": "model", "created": 0, "owned_by": "stub"}]}
+        if method != "POST" or path != "/chat/completions":
+            return 404, {"error": {"message": f"{method} {path} not found", "type": "invalid_request_error"}}
+
+        self.requests += 1
+        request = json.loads(body)
+        self.last_messages = request.get("messages") or []
+        schema, tool_name = _requested_schema(request)
+        count = _result_count(schema)
+        await asyncio.sleep(self.latency + self.latency_per_item * count)
+        if self._random.random() < self.error_rate:
+            self.errors += 1
+            return 500, {"error": {"message": "stub: simulated failure", "type": "server_error"}}
+
+        self.results += count
+        arguments = {"results": [self.canned] * count} if _is_batch(schema) else self.canned
+        message: Dict[str, Any] = {"role": "assistant", "content": json.dumps(arguments, ensure_ascii=False)}
+        finish_reason = "stop"
+        if tool_name is not None:
+            message = {"role": "assistant", "content": None, "tool_calls": [{
+                "id": f"call_{self.requests}", "type": "function",
+                "function": {"name": tool_name, "arguments": message["content"]},
+            }]}
+            finish_reason = "tool_calls"
+        return 200, {
+            "id": f"chatcmpl-stub-{self.requests}", "object": "chat.completion", "created": int(time.time()),
+            "model": request.get("model", self.model),
+            "choices": [{"index": 0, "message": message, "finish_reason": finish_reason}],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+        }
+
+
+def _requested_schema(request: Dict[str, Any]) -> Tuple[Dict[str, Any], Optional[str]]:
+    """The JSON schema of the answer asked for, and the tool to call (if any)."""
+    tools = request.get("tools") or []
+    if tools:
+        function = tools[0]["function"]
+        return function.get("parameters") or {}, function["name"]
+    response_format = request.get("response_format") or {}
+    return (response_format.get("json_schema") or {}).get("schema") or {}, None
+
+
+def _is_batch(schema: Dict[str, Any]) -> bool:
+    return (schema.get("properties") or {}).get("results", {}).get("type") == "array"
+
+
+def _result_count(schema: Dict[str, Any]) -> int:
+    return schema["properties"]["results"].get("minItems", 1) if _is_batch(schema) else 1
+
+
+async def _serve(args: argparse.Namespace) -> None:
+    canned = None
+    if args.canned:
+        with open(args.canned, encoding="utf-8") as fh:
+            canned = json.load(fh)
+    stub = StubLLMServer(args.latency, args.latency_per_item, args.error_rate, canned)
+    print(f"LLM stub listening on {await stub.start(args.host, args.port)}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        print(stub.describe())
+        await stub.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--latency", type=float, default=0.5, help="seconds per request")
+    parser.add_argument("--latency-per-item", type=float, default=0.0, help="extra seconds per result")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with a 500")
+    parser.add_argument("--canned", help="JSON file with the result to return")
+    try:
+        asyncio.run(_serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
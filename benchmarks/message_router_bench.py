@@ -0,0 +1,133 @@
+"""
+Benchmark: on_message cost, four cog listeners vs the MessageRouter.
+
+Run from the repository root:
+
+    python -m benchmarks.message_router_bench
+
+A synthetic stream of messages (mostly team channels, some free talk, a few
+guarded, presentation and management channels, some from bots) is handed to
+
+1. the four listeners the cogs used to register (EventCog, MessageGuardCog,
+   MusicDispatcherCog, PresentationManagerCog), each re-checking author,
+   category and channel name, scheduled as one task each the way discord.py
+   dispatches events;
+2. the MessageRouter, scheduled as a single task, which classifies the
+   channel once (cached by ID) and runs only the owning handler.
+
+The handlers themselves do nothing, so the numbers are the routing overhead.
+"""
+
+import asyncio
+import random
+import time
+from types import SimpleNamespace
+
+from bot.channels import ChannelClassifier, ChannelKind
+from bot.router import MessageRouter
+
+MESSAGES = 50_000
+CONFIG = {
+    "monitored_category": "KARAPARTY",
+    "monitored_channels": [f"🎤equipo︱{n}︱" for n in range(30)],
+    "free_talk_channels": ["💬︱charla", "💬︱memes"],
+    "presentation_channel": "✋︱presentación",
+    "managment": "managment",
+}
+
+
+def make_stream() -> list:
+    rng = random.Random(7)
+    karaoke = SimpleNamespace(id=1, name="KARAPARTY")
+    lobby = SimpleNamespace(id=2, name="LOBBY")
+    channels = [SimpleNamespace(id=100 + n, name=f"🎤equipo︱{n}︱los_{n}", category=karaoke) for n in range(30)]
+    channels += [
+        SimpleNamespace(id=10, name="💬︱charla", category=karaoke),
+        SimpleNamespace(id=11, name="💬︱memes", category=karaoke),
+        SimpleNamespace(id=12, name="random", category=karaoke),
+        SimpleNamespace(id=13, name="✋︱presentación", category=lobby),
+        SimpleNamespace(id=14, name="managment", category=lobby),
+        SimpleNamespace(id=15, name="general", category=lobby),
+    ]
+    weights = [2] * 30 + [10, 5, 1, 1, 1, 10]
+    human, bot = SimpleNamespace(bot=False), SimpleNamespace(bot=True)
+    return [
+        SimpleNamespace(author=bot if rng.random() < 0.1 else human, channel=channel, content="hola")
+        for channel in rng.choices(channels, weights, k=MESSAGES)
+    ]
+
+
+async def handled(message) -> None:
+    pass
+
+
+# The four listeners' checks, as they were before the router.
+async def events_listener(message) -> None:
+    if message.author.bot:
+        return
+    name = message.channel.name
+    sep = name.rfind("︱")
+    prefix = name[:sep + 1] if sep != -1 else name
+    if (message.channel.category and message.channel.category.name == CONFIG["monitored_category"]
+            and prefix in CONFIG["monitored_channels"]):
+        await handled(message)
+
+
+async def guard_listener(message) -> None:
+    if message.author.bot or not message.channel.category:
+        return
+    if message.channel.category.name != CONFIG["monitored_category"]:
+        return
+    parts = message.channel.name.split("︱")
+    name = "︱".join(parts[:2]) + "︱" if len(parts) >= 3 and parts[1].isdigit() else message.channel.name
+    if name not in CONFIG["monitored_channels"] + CONFIG["free_talk_channels"]:
+        await handled(message)
+
+
+async def dispatcher_listener(message) -> None:
+    if message.author.bot:
+        return
+    if message.channel.name != CONFIG["managment"]:
+        return
+    await handled(message)
+
+
+async def presentation_listener(message) -> None:
+    if message.author.bot or not message.channel.category:
+        return
+    if message.channel.name != CONFIG["presentation_channel"]:
+        return
+    await handled(message)
+
+
+async def run(stream, listeners) -> float:
+    start = time.perf_counter()
+    tasks = []
+    for message in stream:
+        tasks.extend(asyncio.create_task(listener(message)) for listener in listeners)
+        if len(tasks) >= 1000:
+            await asyncio.gather(*tasks)
+            tasks.clear()
+    await asyncio.gather(*tasks)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    stream = make_stream()
+    router = MessageRouter(ChannelClassifier(CONFIG))
+    for kind in (ChannelKind.MONITORED, ChannelKind.GUARDED, ChannelKind.PRESENTATION, ChannelKind.MANAGEMENT):
+        router.route(kind, handled)
+
+    listeners = (events_listener, guard_listener, dispatcher_listener, presentation_listener)
+    four = asyncio.run(run(stream, listeners))
+    routed = asyncio.run(run(stream, (router.dispatch,)))
+    print(f"{MESSAGES} messages")
+    print(f"{'setup':<16} | {'tasks':>7} | {'total ms':>8} | {'µs/msg':>6}")
+    print(f"{'four listeners':<16} | {MESSAGES * 4:>7} | {four * 1e3:>8.1f} | {four / MESSAGES * 1e6:>6.2f}")
+    print(f"{'router':<16} | {MESSAGES:>7} | {routed * 1e3:>8.1f} | {routed / MESSAGES * 1e6:>6.2f}")
+    for line in router.describe():
+        print(f"  {line}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Benchmark: presentations through PresentationManagerCog against a local LLM stub.
+
+Run from the repository root (needs the bot's dependencies: discord.py,
+openai, instructor, pydantic):
+
+    python -m benchmarks.presentation_bench --presentations 200 --latency 0.8
+
+N newcomers post their presentation at once. Each goes through the cog's
+``handle_presentation`` (template parser, validation cache, batcher and
+SmartBotService) against the StubLLMServer of benchmarks/llm_stub.py,
+running in the same process, with fake Discord members and channels.
+The texts are free-form and all different, so each needs the LLM.
+
+Reported: throughput (presentations per second), p50/p99 time from the
+message to the bot's reply, requests reaching the stub and replies asking
+the user to try later (failed validations), for the settings given.
+"""
+
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+from types import SimpleNamespace
+
+from benchmarks.llm_stub import StubLLMServer
+from cogs.presentation_manager import PresentationManagerCog
+
+TEXT = "Hola! Soy {name}, tengo {age} años y os encontré por {found}. Me gusta el karaoke. (#{number})"
+NAMES = ["Ana", "Leo", "Marta", "Pau", "Rin", "Nico"]
+FOUND = ["Instagram", "un amigo", "reddit", "el Salón del Manga"]
+
+
+def fake_bot(base_url: str, args: argparse.Namespace) -> SimpleNamespace:
+    config = {
+        "bot": {"starting_role": "Kai Timido Aprendiz"},
+        "queue": {"state_dir": tempfile.mkdtemp()},
+        "smart_bot": {
+            "deepseek_key": "sk-stub", "base_url": base_url, "presentation_instruction": "Tu nombre es Kai...",
+            "max_concurrency": args.max_concurrency, "timeout": 30,
+            "batch_size": args.batch_size, "batch_wait": args.batch_wait,
+        },
+    }
+    return SimpleNamespace(
+        config=config,
+        router=SimpleNamespace(route=lambda kind, handler: None, unroute=lambda kind: None),
+        resolver=SimpleNamespace(role=lambda guild, name: SimpleNamespace(name=name)),
+    )
+
+
+def fake_message(number: int, replies: dict) -> SimpleNamespace:
+    async def send(text):
+        replies[number] = (time.perf_counter(), text)
+
+    async def roles(*_):
+        return None
+
+    author = SimpleNamespace(mention=f"<@{number}>", add_roles=roles, remove_roles=roles)
+    content = TEXT.format(name=NAMES[number % len(NAMES)], age=20 + number % 20,
+                          found=FOUND[number % len(FOUND)], number=number)
+    return SimpleNamespace(content=content, author=author, guild=SimpleNamespace(name="BcnNoKai"),
+                           channel=SimpleNamespace(send=send))
+
+
+async def run(args: argparse.Namespace) -> None:
+    stub = StubLLMServer(args.latency, args.latency_per_item, args.error_rate, seed=24)
+    cog = PresentationManagerCog(fake_bot(await stub.start(), args))
+    replies: dict = {}
+    messages = [fake_message(number, replies) for number in range(args.presentations)]
+
+    start = time.perf_counter()
+    await asyncio.gather(*(cog.handle_presentation(message) for message in messages))
+    elapsed = time.perf_counter() - start
+    await cog.cog_unload()
+    await stub.stop()
+
+    latencies = sorted(replied - start for replied, _ in replies.values())
+    later = sum("vuelve a enviarla" in text for _, text in replies.values())
+    percentiles = statistics.quantiles(latencies, n=100)
+    print(f"{args.presentations} presentations, stub latency {args.latency:.2f} s, error rate {args.error_rate:.0%}, "
+          f"max_concurrency {args.max_concurrency}, batch_size {args.batch_size}")
+    print(f"throughput: {args.presentations / elapsed:.1f} presentations/s ({elapsed:.2f} s in total)")
+    print(f"reply latency: p50 {percentiles[49]:.2f} s, p99 {percentiles[98]:.2f} s, max {latencies[-1]:.2f} s")
+    print(f"stub: {stub.describe()}; {later} presenter(s) asked to try later")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Presentations through the cog against a local LLM stub.")
+    parser.add_argument("--presentations", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.8, help="stub seconds per request")
+    parser.add_argument("--latency-per-item", type=float, default=0.05, help="stub extra seconds per result")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--max-concurrency", type=int, default=2)
+    parser.add_argument("--batch-size", type=int, default=8, help="1 sends one request per presentation")
+    parser.add_argument("--batch-wait", type=float, default=2.0)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Benchmark: deciding presentations locally before asking the LLM.
+
+Run from the repository root:
+
+    python -m benchmarks.presentation_parser_bench
+
+There is no recorded corpus of presentations in the repository, so one is
+generated: the template of ``presentation_instruction`` in
+config.yaml.template filled in the ways people fill it in (all of it, some
+of it, with or without emojis, a minor's age, an age in words or as a
+year of birth) mixed with free-form introductions, in the proportions
+given in MIX. The API round-trip is not called but drawn from a
+log-normal distribution around LLM_MEDIAN seconds.
+
+Reported: the share of presentations decided locally, and the mean and
+p95 time to a decision with the LLM alone versus parser first.
+"""
+
+import random
+import statistics
+import time
+
+from services.presentation_parser import PresentationParser
+
+PRESENTATIONS = 20_000
+LLM_MEDIAN = 2.5           # seconds, per API call
+LLM_SIGMA = 0.5
+
+LABELS = [
+    ("👤 Nombre / Nickname", "Nombre", ["Ana", "Leo", "Marta", "xX_Rin_Xx", "Pau"]),
+    ("🌍 Ciudad o País de origen", "Ciudad", ["Barcelona", "Badalona", "Lima, Perú", "Girona"]),
+    ("🎂 Edad", "Edad", ["27", "31 años", "24", "35", "22"]),
+    ("🔎 ¿Cómo conociste BCNNokai?", "Cómo nos conociste", ["Instagram", "un amigo", "reddit", "en el Salón del Manga"]),
+    ("🎮 Juegos favoritos / Actividades de interés", "Aficiones", ["karaoke y rol", "Persona 5", "LoL, Valorant"]),
+    ("💼 Ocupación o Intereses", "Ocupación", ["estudiante", "enfermera", "programador", ""]),
+    ("🕹️ Plataformas de juego favoritas", "Plataformas", ["PC", "Switch, PS5", ""]),
+    ("📺 Anime o Manga favorito", "Anime", ["Frieren", "One Piece", "Berserk"]),
+    ("✨ Algo más que te gustaría compartir", "Algo más", ["", "¡Hola a todos!", "me encanta cantar"]),
+]
+FREE_FORM = [
+    "Hola! Soy {name}, tengo {age} años, soy de {city} y os encontré por {found}. Me gusta {likes}.",
+    "Buenas, me llamo {name}. Vengo por {found}, juego a {likes}.",
+    "holaa soy {name} de {city} 😊 me encanta {likes}",
+]
+# kind ➜ weight
+MIX = {"complete": 50, "no_emoji": 10, "incomplete": 12, "minor": 2, "age_in_words": 4, "birth_year": 2, "free_form": 20}
+
+
+def template(rng: random.Random, emojis: bool = True, skip: int = 0, age: str = "") -> str:
+    lines = ["🎉 ¡Presentación BCNNokai! 🎉"] if emojis else []
+    skipped = set(rng.sample([0, 3, 4], skip))
+    for index, (label, plain, values) in enumerate(LABELS):
+        value = "" if index in skipped else (age if index == 2 and age else rng.choice(values))
+        lines.append(f"{label if emojis else plain}: {value}")
+    return "\n".join(lines)
+
+
+def presentation(kind: str, rng: random.Random) -> str:
+    if kind == "complete":
+        return template(rng)
+    if kind == "no_emoji":
+        return template(rng, emojis=False)
+    if kind == "incomplete":
+        return template(rng, skip=rng.randint(1, 2))
+    if kind == "minor":
+        return template(rng, age=str(rng.randint(14, 17)))
+    if kind == "age_in_words":
+        return template(rng, age=rng.choice(["veintisiete", "treinta y pico", "muchos"]))
+    if kind == "birth_year":
+        return template(rng, age=str(rng.randint(1980, 2004)))
+    return rng.choice(FREE_FORM).format(
+        name=rng.choice(LABELS[0][2]), age=rng.choice(LABELS[2][2]), city=rng.choice(LABELS[1][2]),
+        found=rng.choice(LABELS[3][2]), likes=rng.choice(LABELS[4][2]),
+    )
+
+
+def p95(values: list[float]) -> float:
+    return statistics.quantiles(values, n=20)[-1]
+
+
+def main() -> None:
+    rng = random.Random(22)
+    kinds = rng.choices(list(MIX), weights=list(MIX.values()), k=PRESENTATIONS)
+    corpus = [presentation(kind, rng) for kind in kinds]
+    round_trips = [rng.lognormvariate(0, LLM_SIGMA) * LLM_MEDIAN for _ in corpus]
+
+    parser = PresentationParser()
+    parser_first, local_times = [], []
+    for text, round_trip in zip(corpus, round_trips):
+        start = time.perf_counter()
+        decided = parser.parse(text)
+        elapsed = time.perf_counter() - start
+        if decided is not None:
+            local_times.append(elapsed)
+            parser_first.append(elapsed)
+        else:
+            parser_first.append(elapsed + round_trip)
+
+    local = parser.resolved / len(corpus)
+    print(f"{len(corpus)} presentations, LLM round-trip median {LLM_MEDIAN:.1f} s")
+    print(f"decided locally: {parser.resolved} ({local:.1%}), sent to the LLM: {parser.escalated}")
+    for kind in MIX:
+        share = sum(PresentationParser().parse(text) is not None
+                    for text, k in zip(corpus, kinds) if k == kind) / kinds.count(kind)
+        print(f"  {kind:<13} {share:6.1%} local")
+    print(f"LLM only:      mean {statistics.fmean(round_trips):.3f} s, p95 {p95(round_trips):.3f} s")
+    print(f"parser first:  mean {statistics.fmean(parser_first):.3f} s, p95 {p95(parser_first):.3f} s")
+    print(f"local decision: mean {statistics.fmean(local_times) * 1e6:.0f} µs")
+    print(f"mean latency reduction: {1 - statistics.fmean(parser_first) / statistics.fmean(round_trips):.1%}, "
+          f"API calls saved: {local:.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Benchmark: QueueBuffer staging operations, list scan vs (team, link) index.
+
+Run from the repository root:
+
+    python -m benchmarks.queue_buffer_bench
+
+For every size the buffer is pre-filled with that many pending songs spread
+over a few dozen teams, then add/delete/replace are timed on a song that is
+staged last, which is the worst case for the old list scan.
+"""
+
+import random
+import time
+from typing import Any, Dict, List
+
+from services.queue.queue_buffer import QueueBuffer
+
+
+class ListQueueBuffer:
+    """The previous QueueBuffer staging logic: one list of dicts, scanned per call."""
+
+    def __init__(self) -> None:
+        self.pending: List[Dict[str, str]] = []
+
+    def add_song(self, team: str, link: str) -> Dict[str, Any]:
+        for entry in self.pending:
+            if entry["team"] == team and entry["link"] == link:
+                return {"success": False, "warning_type": "repeated_song"}
+        self.pending.append({"team": team, "link": link})
+        return {"success": True, "warning_type": ""}
+
+    def delete_song(self, team: str, link: str) -> Dict[str, Any]:
+        for i, entry in enumerate(self.pending):
+            if entry["team"] == team and entry["link"] == link:
+                del self.pending[i]
+                return {"success": True, "warning_type": ""}
+        return {"success": False, "warning_type": "delete_dispatched_song"}
+
+    def replace_song(self, team: str, old_link: str, new_link: str) -> Dict[str, Any]:
+        for entry in self.pending:
+            if entry["team"] == team and entry["link"] == old_link:
+                entry["link"] = new_link
+                return {"success": True, "warning_type": ""}
+        return {"success": False, "warning_type": "edit_dispatched_song"}
+
+
+TEAMS = [f"🎤equipo︱{n}︱test" for n in range(40)]
+SIZES = [10_000, 100_000]
+ROUNDS = 50
+
+
+def fill(buffer, size: int) -> None:
+    rng = random.Random(size)
+    for i in range(size):
+        buffer.add_song(rng.choice(TEAMS), f"https://youtu.be/{i:011d}")
+
+
+def time_ops(buffer) -> Dict[str, float]:
+    """Average microseconds per add/replace/delete cycle on a freshly staged song."""
+    team = TEAMS[-1]
+    timings = {"add": 0.0, "replace": 0.0, "delete": 0.0}
+    for r in range(ROUNDS):
+        link, new_link = f"https://youtu.be/new{r:08d}", f"https://youtu.be/rep{r:08d}"
+
+        start = time.perf_counter()
+        buffer.add_song(team, link)
+        timings["add"] += time.perf_counter() - start
+
+        start = time.perf_counter()
+        buffer.replace_song(team, link, new_link)
+        timings["replace"] += time.perf_counter() - start
+
+        start = time.perf_counter()
+        buffer.delete_song(team, new_link)
+        timings["delete"] += time.perf_counter() - start
+    return {op: total / ROUNDS * 1e6 for op, total in timings.items()}
+
+
+def main() -> None:
+    print(f"{'pending':>8} | {'impl':<8} | {'add µs':>10} | {'replace µs':>10} | {'delete µs':>10}")
+    for size in SIZES:
+        for name, factory in (("list", ListQueueBuffer), ("indexed", QueueBuffer)):
+            buffer = factory()
+            fill(buffer, size)
+            t = time_ops(buffer)
+            print(f"{size:>8} | {name:<8} | {t['add']:>10.2f} | {t['replace']:>10.2f} | {t['delete']:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Benchmark: QueueManager add_link/get_link cost as the number of teams grows.
+
+Run from the repository root:
+
+    python -m benchmarks.queue_manager_bench
+
+Every team gets a few songs, then the whole queue is drained. The previous
+rotation check (``team not in team_order`` on the deque) is timed alongside
+for comparison. The queue logger is raised to WARNING so the numbers measure
+the scheduler itself rather than the log handlers.
+"""
+
+import logging
+import time
+from collections import deque
+
+from services.queue.queue_manager import QueueManager, logger
+from services.queue.song_entry import SongEntry
+
+TEAM_COUNTS = [10, 100, 1_000, 10_000]
+SONGS_PER_TEAM = 3
+NOW = 1745940600  # 2025-04-29 15:30 UTC
+
+
+class DequeScanQueueManager(QueueManager):
+    """QueueManager with the previous linear rotation membership check."""
+
+    def add_link(self, video_id, team, *, timestamp=None, duration=None):
+        if team not in self.queues:
+            self.queues[team] = deque()
+        if team not in self.team_order:
+            self.team_order.append(team)
+        self.queues[team].append(SongEntry(team, video_id, timestamp or int(time.time()), duration))
+
+
+def run(factory, teams: int) -> tuple[float, float]:
+    """Return (µs per add_link, µs per get_link)."""
+    queue = factory()
+    names = [f"🎤equipo︱{n}︱" for n in range(teams)]
+    ops = teams * SONGS_PER_TEAM
+
+    start = time.perf_counter()
+    for song in range(SONGS_PER_TEAM):
+        for team in names:
+            queue.add_link(f"https://youtu.be/{song:011d}", team, timestamp=NOW)
+    add_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    while queue.get_link() is not None:
+        pass
+    get_time = time.perf_counter() - start
+    return add_time / ops * 1e6, get_time / ops * 1e6
+
+
+def main() -> None:
+    logger.setLevel(logging.WARNING)
+    print(f"{'teams':>6} | {'impl':<10} | {'add µs':>8} | {'get µs':>8}")
+    for teams in TEAM_COUNTS:
+        for name, factory in (("deque scan", DequeScanQueueManager), ("set", QueueManager)):
+            add_us, get_us = run(factory, teams)
+            print(f"{teams:>6} | {name:<10} | {add_us:>8.2f} | {get_us:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
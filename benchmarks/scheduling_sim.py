@@ -0,0 +1,75 @@
+"""
+Simulation: airtime fairness of the QueueManager scheduling policies.
+
+Run from the repository root:
+
+    python -m benchmarks.scheduling_sim
+
+Every team keeps its queue full for an 8 hour night and songs are played back
+to back in dispatch order. For each policy the report shows each team's share
+of the total airtime, the longest a team waited between two of its songs, and
+the average cost of a get_link call.
+"""
+
+import logging
+import random
+import time
+from collections import defaultdict
+
+from services.queue.queue_manager import QueueManager, logger
+from services.queue.scheduling import make_policy
+
+NIGHT = 8 * 3600
+BACKLOG = 400
+NOW = 1745960400  # 2025-04-29 21:00 UTC
+
+# team ➜ (min, max) song duration in seconds
+TEAMS = {
+    "short songs": (110, 150),
+    "normal songs": (200, 280),
+    "long songs": (480, 560),
+    "mixed songs": (110, 560),
+}
+
+
+def simulate(policy_name: str, seed: int = 7) -> None:
+    rng = random.Random(seed)
+    queue = QueueManager(make_policy(policy_name, {"quantum": 300, "default_song_duration": 240}))
+    for n in range(BACKLOG):
+        for team, (low, high) in TEAMS.items():
+            queue.add_link(f"https://youtu.be/{team[:4]}{n:07d}", team,
+                           timestamp=NOW, duration=rng.uniform(low, high))
+
+    clock = 0.0
+    airtime = defaultdict(float)
+    last_end: dict[str, float] = {}
+    max_wait = defaultdict(float)
+    calls, spent = 0, 0.0
+    while clock < NIGHT:
+        start = time.perf_counter()
+        song = queue.get_link()
+        spent += time.perf_counter() - start
+        calls += 1
+        if song is None:
+            break
+        team = song.team
+        max_wait[team] = max(max_wait[team], clock - last_end.get(team, 0.0))
+        clock += song.duration
+        airtime[team] += song.duration
+        last_end[team] = clock
+
+    total = sum(airtime.values())
+    print(f"\n== {policy_name} ({calls / (clock / 3600):.1f} songs/hour, {spent / calls * 1e6:.2f} µs per get_link)")
+    print(f"{'team':<14} | {'airtime share':>13} | {'max wait (min)':>14}")
+    for team in TEAMS:
+        print(f"{team:<14} | {airtime[team] / total:>12.1%} | {max_wait[team] / 60:>14.1f}")
+
+
+def main() -> None:
+    logger.setLevel(logging.WARNING)
+    for policy_name in ("round_robin", "fair"):
+        simulate(policy_name)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Benchmark: per-song cost of the queue entries, ad-hoc dicts vs SongEntry.
+
+Run from the repository root:
+
+    python -m benchmarks.song_entry_bench
+
+1. Building one entry the way QueueManager.add_link does (the old dict with a
+   strftime'd timestamp and a formatted link versus a slotted SongEntry).
+2. Memory held by 100k queued entries, measured with tracemalloc.
+3. Encoding and decoding them as JSON (dispatched_songs.json / kai_api).
+"""
+
+import json
+import time
+import tracemalloc
+from datetime import datetime
+
+from services.queue.song_entry import SongEntry, decode_songs, encode_songs
+from services.video_id import unpack_video_id, video_url
+
+ENTRIES = 100_000
+TEAMS = [f"🎤equipo︱{n}︱test" for n in range(30)]
+VIDEO_IDS = [unpack_video_id(n * 7919) for n in range(ENTRIES)]
+
+
+def legacy_entry(team: str, video_id: str) -> dict:
+    return {
+        "team": team,
+        "video_id": video_id,
+        "link": video_url(video_id),
+        "timestamp": datetime.utcnow().strftime("%Y-%m-%d %H:%M"),
+    }
+
+
+def slotted_entry(team: str, video_id: str) -> SongEntry:
+    return SongEntry(team, video_id, int(time.time()))
+
+
+def build(factory) -> tuple[list, float]:
+    start = time.perf_counter()
+    entries = [factory(TEAMS[n % len(TEAMS)], video_id) for n, video_id in enumerate(VIDEO_IDS)]
+    return entries, (time.perf_counter() - start) / ENTRIES * 1e6
+
+
+def held_bytes(factory) -> int:
+    tracemalloc.start()
+    entries, _ = build(factory)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del entries
+    return size
+
+
+def main() -> None:
+    print(f"{'entry':<10} | {'build µs':>8} | {'bytes/entry':>11} | {'encode ms':>9} | {'decode ms':>9}")
+    for name, factory in (("dict", legacy_entry), ("SongEntry", slotted_entry)):
+        entries, build_us = build(factory)
+        per_entry = held_bytes(factory) / ENTRIES
+
+        start = time.perf_counter()
+        if name == "dict":
+            text = json.dumps(entries, ensure_ascii=False, separators=(",", ":"))
+        else:
+            text = encode_songs(entries)
+        encode_ms = (time.perf_counter() - start) * 1e3
+
+        start = time.perf_counter()
+        if name == "dict":
+            json.loads(text)
+        else:
+            decode_songs(text)
+        decode_ms = (time.perf_counter() - start) * 1e3
+        print(f"{name:<10} | {build_us:>8.2f} | {per_entry:>11.0f} | {encode_ms:>9.1f} | {decode_ms:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Benchmark: raw URL strings vs canonical (interned) video IDs.
+
+Run from the repository root:
+
+    python -m benchmarks.video_id_bench
+
+1. Matching the next playlist video against the dispatched songs, the way
+   playlist_player.find_team_for_song did it (urlparse/parse_qs on every entry,
+   three times) versus comparing cached video IDs, versus one dict lookup.
+2. Memory held by 100k dispatched-guard keys, as (team, URL) tuples with a
+   URL string per message versus (team, interned ID) and (team, packed ID).
+"""
+
+import random
+import re
+import time
+import tracemalloc
+from urllib.parse import urlparse, parse_qs
+
+from services.video_id import pack_video_id, video_id_from_url
+
+DISPATCHED = 2_000
+KEYS = 100_000
+TEAMS = [f"🎤equipo︱{n}︱test" for n in range(30)]
+
+
+def legacy_normalize(link):
+    """playlist_player.normalize_youtube_link before the video ID layer."""
+    parsed = urlparse(link)
+    query = parse_qs(parsed.query)
+    if parsed.netloc in ['youtu.be']:
+        video_id = parsed.path.lstrip('/')
+    elif 'watch' in parsed.path:
+        video_id = query.get('v', [None])[0]
+    else:
+        raise ValueError(link)
+    return f"https://www.youtube.com/watch?v={video_id}"
+
+
+def corpus_ids() -> list[str]:
+    with open("dispatched_songs.json", encoding="utf-8") as fh:
+        text = fh.read()
+    with open("notebooks/bot_dj.ipynb", encoding="utf-8") as fh:
+        text += fh.read()
+    return sorted(set(re.findall(r"(?:v=|youtu\.be/)([A-Za-z0-9_-]{11})", text)))
+
+
+def url_forms(video_id: str, rng: random.Random) -> str:
+    return rng.choice([
+        f"https://www.youtube.com/watch?v={video_id}",
+        f"https://youtu.be/{video_id}?si={rng.getrandbits(40):x}",
+        f"https://www.youtube.com/watch?v={video_id}&list=PL{rng.getrandbits(40):x}",
+    ])
+
+
+def bench_lookup(ids: list[str]) -> None:
+    rng = random.Random(5)
+    songs = [{"team": rng.choice(TEAMS), "link": url_forms(rng.choice(ids), rng)} for _ in range(DISPATCHED)]
+    for song in songs:
+        song["video_id"] = video_id_from_url(song["link"])
+    targets = [url_forms(rng.choice(ids), rng) for _ in range(200)]
+
+    start = time.perf_counter()
+    for target in targets:
+        for song in songs:
+            if legacy_normalize(song["link"]) == legacy_normalize(target):
+                break
+    legacy = (time.perf_counter() - start) / len(targets)
+
+    start = time.perf_counter()
+    for target in targets:
+        target_id = video_id_from_url(target)
+        for song in songs:
+            if song["video_id"] == target_id:
+                break
+    scan = (time.perf_counter() - start) / len(targets)
+
+    index: dict[str, list] = {}
+    for song in songs:
+        index.setdefault(song["video_id"], []).append(song)
+    start = time.perf_counter()
+    for target in targets:
+        index.get(video_id_from_url(target))
+    lookup = (time.perf_counter() - start) / len(targets)
+
+    print(f"match next video among {DISPATCHED} dispatched songs:")
+    print(f"  urlparse per entry : {legacy * 1e6:10.1f} µs")
+    print(f"  video ID scan      : {scan * 1e6:10.1f} µs")
+    print(f"  video ID dict hit  : {lookup * 1e6:10.1f} µs")
+
+
+def measure(build) -> float:
+    """Bytes allocated per key by *build*, which returns a list of KEYS keys."""
+    tracemalloc.start()
+    keys = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    assert len(keys) == KEYS
+    return size / KEYS
+
+
+def bench_memory(ids: list[str]) -> None:
+    rng = random.Random(6)
+    # Every Discord message brings its own URL string
+    urls = [(rng.choice(TEAMS), url_forms(rng.choice(ids), rng)) for _ in range(KEYS)]
+    extract = video_id_from_url.__wrapped__      # bypass the URL cache, it is not part of the key
+
+    print(f"memory per dispatched key ({KEYS} keys):")
+    print(f"  (team, raw URL)    : {measure(lambda: [(team, ''.join(url)) for team, url in urls]):6.1f} B")
+    print(f"  (team, interned ID): {measure(lambda: [(team, extract(url)) for team, url in urls]):6.1f} B")
+    print(f"  (team, packed ID)  : {measure(lambda: [(team, pack_video_id(extract(url))) for team, url in urls]):6.1f} B")
+
+
+def main() -> None:
+    ids = corpus_ids()
+    bench_lookup(ids)
+    bench_memory(ids)
+
+
+if __name__ == "__main__":
+    main()
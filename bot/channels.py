@@ -0,0 +1,124 @@
+from enum import Enum
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Optional
+
+if TYPE_CHECKING:
+    import discord
+    from discord.ext import commands
+
+SEPARATOR = "︱"
+
+
+class ChannelKind(Enum):
+    """What the cogs do with the messages of a channel."""
+
+    MONITORED = "monitored"         # team channel: song requests
+    FREE_TALK = "free_talk"         # allowed in the karaoke category, not monitored
+    GUARDED = "guarded"             # anything else in the karaoke category: messages are deleted
+    PRESENTATION = "presentation"   # new members introduce themselves
+    MANAGEMENT = "management"       # admin commands
+    IGNORED = "ignored"
+
+
+def channel_key(name: str) -> str:
+    """
+    Name a channel is configured under.
+
+    Team channels are configured by their prefix, so ``🎤equipo︱13︱los_gatos``
+    matches ``🎤equipo︱13︱`` whatever the team called it; any other channel
+    by its full name.
+
+    Args:
+        name (str): The channel name.
+
+    Returns:
+        str: The prefix up to the second separator for team channels
+        (``<something>︱<number>︱...``), otherwise *name* itself.
+    """
+    parts = name.split(SEPARATOR, 2)
+    if len(parts) == 3 and parts[1].isdigit():
+        return parts[0] + SEPARATOR + parts[1] + SEPARATOR
+    return name
+
+
+class ChannelClassifier:
+    """
+    Per-channel classification shared by the cogs' message handlers.
+
+    The kind of a channel depends only on its name, its category's name and
+    the ``bot`` section of config.yaml, so it is worked out the first time a
+    message arrives from it and cached by channel ID. A channel update drops
+    its entry (a category update drops them all, since the channels under it
+    may change kind); deleted channels are forgotten.
+    """
+
+    def __init__(self, config: Dict[str, Any]) -> None:
+        """
+        Args:
+            config (dict): The ``bot`` section of config.yaml.
+        """
+        self.category: str = config["monitored_category"]
+        self.monitored = frozenset(config.get("monitored_channels") or ())
+        self.free_talk = frozenset(config.get("free_talk_channels") or ())
+        self.presentation: Optional[str] = config.get("presentation_channel")
+        self.management: Optional[str] = config.get("managment")     # sic → config spelling kept
+        self._kinds: Dict[int, ChannelKind] = {}
+
+    def register(self, bot: "commands.Bot") -> None:
+        """Subscribe to the channel events that invalidate the cache."""
+        bot.add_listener(self.on_guild_channel_update, "on_guild_channel_update")
+        bot.add_listener(self.on_guild_channel_delete, "on_guild_channel_delete")
+
+    def kind(self, channel: Any) -> ChannelKind:
+        """
+        Kind of *channel* (cached by ID).
+
+        Args:
+            channel (discord.abc.Messageable): The channel of a message.
+
+        Returns:
+            ChannelKind: How the cogs treat its messages.
+        """
+        kind = self._kinds.get(channel.id)
+        if kind is None:
+            kind = self._kinds[channel.id] = self._classify(channel)
+        return kind
+
+    def _classify(self, channel: Any) -> ChannelKind:
+        name = getattr(channel, "name", None)
+        if name is None:                                    # DMs
+            return ChannelKind.IGNORED
+        category = getattr(channel, "category", None)
+        if name == self.management:
+            return ChannelKind.MANAGEMENT
+        if name == self.presentation and category is not None:
+            return ChannelKind.PRESENTATION
+        if category is not None and category.name == self.category:
+            key = channel_key(name)
+            if key in self.monitored:
+                return ChannelKind.MONITORED
+            if key in self.free_talk:
+                return ChannelKind.FREE_TALK
+            return ChannelKind.GUARDED
+        return ChannelKind.IGNORED
+
+    def forget(self, channel_ids: Iterable[int]) -> None:
+        """Drop the cached kinds of *channel_ids*."""
+        for channel_id in channel_ids:
+            self._kinds.pop(channel_id, None)
+
+    # ────────────────────────────────────────────────
+    #  gateway events
+    # ────────────────────────────────────────────────
+    async def on_guild_channel_update(
+        self, before: "discord.abc.GuildChannel", after: "discord.abc.GuildChannel"
+    ) -> None:
+        self._invalidate(after)
+
+    async def on_guild_channel_delete(self, channel: "discord.abc.GuildChannel") -> None:
+        self._invalidate(channel)
+
+    def _invalidate(self, channel: "discord.abc.GuildChannel") -> None:
+        if str(channel.type) == "category":
+            self._kinds.clear()
+        else:
+            self.forget((channel.id,))
@@ -5,6 +5,14 @@ import yaml
 from utils.error_reporter import report_error
 from services.queue.queue_manager import QueueManager
 from services.queue.queue_buffer import QueueBuffer
+from services.queue.scheduling import make_policy
+from services.queue.dispatched_guard import DispatchedGuard
+from services.queue.journal import QueueJournal
+from bot.resolver import GuildResolver
+from bot.channels import ChannelClassifier
+from bot.router import MessageRouter
+from bot.flood import FloodGuard
+import utils.warning_reporter as warning
 
 
 class KarapartyBot(commands.Bot):
@@ -32,9 +40,21 @@ class KarapartyBot(commands.Bot):
             raise e  # Stop startup if config cannot be loaded
 
         # Initialize the shared queue and queue buffer
-        self.queue: QueueManager = QueueManager()
+        queue_conf = self.config.get("queue") or {}
+        policy = make_policy(queue_conf.get("scheduling") or "round_robin", queue_conf)
+        guard = DispatchedGuard.from_config(queue_conf.get("dispatched_guard"))
+        self.queue: QueueManager = QueueManager(policy, guard)
         self.queue_buffer: QueueBuffer = QueueBuffer()
 
+        # Restore the queue state of a previous run and journal it from now on
+        self.journal: QueueJournal = QueueJournal(
+            directory=queue_conf.get("state_dir") or "state",
+            snapshot_every=queue_conf.get("snapshot_every") or 2000,
+        )
+        self.journal.recover(self.queue_buffer, self.queue)
+        if queue_conf.get("reset_dispatched_on_start"):
+            self.queue.reset_dispatched()
+
         # Setup Discord intents: enable what we need (message content, guilds, messages)
         intents = discord.Intents.default()
         intents.message_content = True
@@ -42,7 +62,26 @@ class KarapartyBot(commands.Bot):
         intents.messages = True
 
         # Initialize the base commands.Bot class
-        super().__init__(command_prefix="!", intents=intents)
+        # Song deletes/edits are handled from raw events (EventCog's message index),
+        # so discord.py's own message cache can stay small
+        super().__init__(
+            command_prefix="!", intents=intents, max_messages=self.config["bot"].get("message_cache") or 100
+        )
+
+        # Name → channel/role lookups for the cogs, kept current from the gateway events
+        self.resolver: GuildResolver = GuildResolver(self)
+        self.resolver.register()
+        # What each channel is for (team channel, free talk, ...), cached by channel ID
+        self.channel_kinds: ChannelClassifier = ChannelClassifier(self.config["bot"])
+        self.channel_kinds.register(self)
+        # One on_message for all cogs: each routes the kind of channel it owns;
+        # users flooding a team/guarded channel get one bulk delete and one warning
+        self.flood_guard: FloodGuard = FloodGuard(
+            warn=lambda user, channel: warning.warn_user(user, channel, "flooding", delete_after=20),
+            rate=self.config["bot"].get("flood_rate") or 0.2,
+            burst=self.config["bot"].get("flood_burst") or 5,
+        )
+        self.router: MessageRouter = MessageRouter(self.channel_kinds, self.flood_guard)
 
     async def setup_hook(self) -> None:
         """
@@ -53,6 +92,24 @@ class KarapartyBot(commands.Bot):
         await self.load_extension("cogs.message_guard")
         await self.load_extension("cogs.presentation_manager")
         
+    async def on_message(self, message: discord.Message) -> None:
+        """
+        Routes the message to the cog that owns its channel, then processes commands.
+
+        Args:
+            message (discord.Message): The incoming message.
+        """
+        await self.router.dispatch(message)
+        await self.process_commands(message)
+
+    async def close(self) -> None:
+        """
+        Closes the Discord connection and writes a final queue snapshot.
+        """
+        await self.flood_guard.close()
+        await super().close()
+        self.journal.close()
+
     def run_bot(self) -> None:
         """
         Starts the bot using the Discord token from the configuration file.
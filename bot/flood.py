@@ -0,0 +1,134 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from utils.rate_limit import TokenBucket
+
+# Project‑wide logger helper
+from utils.logger import get_logger
+
+if TYPE_CHECKING:
+    import discord
+
+logger = get_logger(__name__)
+
+# (author ID, channel ID)
+FloodKey = Tuple[int, int]
+
+# Discord bulk-deletes at most 100 messages per call
+BULK_DELETE_MAX = 100
+
+
+class FloodGuard:
+    """
+    Per-user, per-channel flood protection in front of the message handlers.
+
+    Each (author, channel) pair has a token bucket (``burst`` messages, then
+    ``rate`` per second). A message that finds its bucket empty is not handled
+    at all: it is held, and ``flush_after`` seconds later everything held in
+    that channel for that user is removed with one bulk delete, plus a single
+    warning per flood, instead of one delete and one warning per message.
+
+    ``admit`` is O(1): one dict lookup and a bucket update. Buckets are kept
+    in least-recently-used order, so the ones idle for ``idle_after`` seconds
+    are dropped from the front as new messages come in (a user flooding again
+    after that is warned again).
+    """
+
+    def __init__(
+        self,
+        warn: Callable[["discord.abc.User", "discord.abc.Messageable"], Awaitable[Any]],
+        rate: float = 0.2,
+        burst: int = 5,
+        flush_after: float = 2.0,
+        idle_after: float = 300.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Args:
+            warn (Callable): ``async warn(user, channel)``, sends the flood warning.
+            rate (float): Messages per second a user can keep sending in a channel.
+            burst (int): Messages a user can send back to back.
+            flush_after (float): Seconds held messages wait for their bulk delete.
+            idle_after (float): Seconds after which an unused bucket is dropped.
+            clock (Callable): Monotonic time source.
+        """
+        self.warn = warn
+        self.rate = rate
+        self.burst = burst
+        self.flush_after = flush_after
+        self.idle_after = idle_after
+        self._clock = clock
+        # least recently used first: key ➜ (bucket, last message time)
+        self._buckets: "OrderedDict[FloodKey, Tuple[TokenBucket, float]]" = OrderedDict()
+        self._held: Dict[FloodKey, List["discord.Message"]] = {}
+        self._warned: Set[FloodKey] = set()
+        self._flusher: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def admit(self, message: "discord.Message") -> bool:
+        """
+        Whether *message* may be handled; if not, it is held for the bulk delete.
+
+        Args:
+            message (discord.Message): The incoming message.
+
+        Returns:
+            bool: False when the author is flooding the channel.
+        """
+        key = (message.author.id, message.channel.id)
+        now = self._clock()
+        entry = self._buckets.get(key)
+        if entry is None:
+            bucket = TokenBucket(self.rate, self.burst, clock=self._clock)
+        else:
+            bucket = entry[0]
+            self._buckets.move_to_end(key)
+        self._buckets[key] = (bucket, now)
+        self._drop_idle(now)
+
+        if bucket.try_acquire():
+            return True
+        self._held.setdefault(key, []).append(message)
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._flush_later())
+        return False
+
+    async def flush(self) -> None:
+        """Bulk-delete the held messages now and warn their authors."""
+        held, self._held = self._held, {}
+        for key, messages in held.items():
+            channel = messages[0].channel
+            try:
+                for start in range(0, len(messages), BULK_DELETE_MAX):
+                    await channel.delete_messages(messages[start:start + BULK_DELETE_MAX])
+            except Exception as exc:
+                logger.warning("Could not delete %d flood message(s) in #%s: %s",
+                               len(messages), getattr(channel, "name", channel.id), exc)
+            if key not in self._warned:
+                self._warned.add(key)
+                await self.warn(messages[0].author, channel)
+            logger.info("Flood from %s in #%s: %d message(s) removed",
+                        messages[0].author, getattr(channel, "name", channel.id), len(messages))
+
+    async def close(self) -> None:
+        """Stop the pending flush (held messages are flushed right away)."""
+        if self._flusher is not None and not self._flusher.done():
+            self._flusher.cancel()
+        self._flusher = None
+        await self.flush()
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self.flush_after)
+        await self.flush()
+
+    def _drop_idle(self, now: float) -> None:
+        while self._buckets:
+            key, (_, last_seen) = next(iter(self._buckets.items()))
+            if now - last_seen < self.idle_after:
+                return
+            del self._buckets[key]
+            self._warned.discard(key)
@@ -0,0 +1,176 @@
+from typing import TYPE_CHECKING, Dict, Iterable, Optional, Set
+
+if TYPE_CHECKING:
+    import discord
+    from discord.ext import commands
+
+# name ➜ IDs with that name, in discovery order (the first one wins, like discord.utils.get)
+_Index = Dict[str, Dict[int, None]]
+
+
+class GuildResolver:
+    """
+    Name → channel / role lookups shared by all cogs.
+
+    Channels and roles are indexed by name once per guild (on first use, or
+    when the guild becomes available) and kept current from the channel and
+    role create/update/delete events, so a lookup is a dict access instead
+    of a scan over ``bot.get_all_channels()`` or ``guild.roles``. Only IDs are
+    stored; the objects are fetched from discord.py's own ID caches, so they
+    are always the live ones.
+    """
+
+    def __init__(self, bot: "commands.Bot") -> None:
+        """
+        Args:
+            bot (commands.Bot): The bot whose guilds are indexed.
+        """
+        self.bot = bot
+        self._indexed: Set[int] = set()
+        self._channels: _Index = {}                       # all guilds
+        self._guild_channels: Dict[int, _Index] = {}      # per guild
+        self._roles: Dict[int, _Index] = {}               # per guild
+
+    def register(self) -> None:
+        """Subscribe the resolver to the gateway events that keep it current."""
+        for name in (
+            "on_guild_available", "on_guild_join", "on_guild_remove",
+            "on_guild_channel_create", "on_guild_channel_delete", "on_guild_channel_update",
+            "on_guild_role_create", "on_guild_role_delete", "on_guild_role_update",
+        ):
+            self.bot.add_listener(getattr(self, name), name)
+
+    # ────────────────────────────────────────────────
+    #  lookups
+    # ────────────────────────────────────────────────
+    def channel(
+        self, name: str, guild: Optional["discord.Guild"] = None, text_only: bool = False
+    ) -> Optional["discord.abc.GuildChannel"]:
+        """
+        Channel called *name*, in *guild* or in any guild.
+
+        Args:
+            name (str): Channel name.
+            guild (discord.Guild, optional): Restrict the lookup to this guild.
+            text_only (bool): Only consider text channels.
+
+        Returns:
+            The channel, or None if there is none with that name.
+        """
+        if guild is None:
+            for known in self.bot.guilds:
+                self._ensure_indexed(known)
+            ids: Iterable[int] = self._channels.get(name, ())
+        else:
+            self._ensure_indexed(guild)
+            ids = self._guild_channels[guild.id].get(name, ())
+        for channel_id in ids:
+            channel = self.bot.get_channel(channel_id)
+            if channel is not None and (not text_only or str(channel.type) == "text"):
+                return channel
+        return None
+
+    def role(self, guild: "discord.Guild", name: str) -> Optional["discord.Role"]:
+        """
+        Role called *name* in *guild*.
+
+        Args:
+            guild (discord.Guild): The guild the role belongs to.
+            name (str): Role name.
+
+        Returns:
+            The role, or None if there is none with that name.
+        """
+        self._ensure_indexed(guild)
+        for role_id in self._roles[guild.id].get(name, ()):
+            role = guild.get_role(role_id)
+            if role is not None:
+                return role
+        return None
+
+    # ────────────────────────────────────────────────
+    #  indexing
+    # ────────────────────────────────────────────────
+    def _ensure_indexed(self, guild: "discord.Guild") -> None:
+        if guild.id in self._indexed:
+            return
+        self._indexed.add(guild.id)
+        self._guild_channels[guild.id] = {}
+        self._roles[guild.id] = {}
+        for channel in guild.channels:
+            self._add_channel(channel)
+        for role in guild.roles:
+            self._add(self._roles[guild.id], role.name, role.id)
+
+    def _drop_guild(self, guild: "discord.Guild") -> None:
+        if guild.id not in self._indexed:
+            return
+        for name, ids in self._guild_channels.pop(guild.id).items():
+            for channel_id in ids:
+                self._remove(self._channels, name, channel_id)
+        self._roles.pop(guild.id)
+        self._indexed.discard(guild.id)
+
+    def _add_channel(self, channel: "discord.abc.GuildChannel") -> None:
+        self._add(self._guild_channels[channel.guild.id], channel.name, channel.id)
+        self._add(self._channels, channel.name, channel.id)
+
+    def _remove_channel(self, channel: "discord.abc.GuildChannel") -> None:
+        self._remove(self._guild_channels[channel.guild.id], channel.name, channel.id)
+        self._remove(self._channels, channel.name, channel.id)
+
+    @staticmethod
+    def _add(index: _Index, name: str, object_id: int) -> None:
+        index.setdefault(name, {})[object_id] = None
+
+    @staticmethod
+    def _remove(index: _Index, name: str, object_id: int) -> None:
+        ids = index.get(name)
+        if ids is None:
+            return
+        ids.pop(object_id, None)
+        if not ids:
+            del index[name]
+
+    # ────────────────────────────────────────────────
+    #  gateway events
+    # ────────────────────────────────────────────────
+    async def on_guild_available(self, guild: "discord.Guild") -> None:
+        # (re)connected: the cached objects were rebuilt, so is the index
+        self._drop_guild(guild)
+        self._ensure_indexed(guild)
+
+    async def on_guild_join(self, guild: "discord.Guild") -> None:
+        self._ensure_indexed(guild)
+
+    async def on_guild_remove(self, guild: "discord.Guild") -> None:
+        self._drop_guild(guild)
+
+    async def on_guild_channel_create(self, channel: "discord.abc.GuildChannel") -> None:
+        if channel.guild.id in self._indexed:
+            self._add_channel(channel)
+
+    async def on_guild_channel_delete(self, channel: "discord.abc.GuildChannel") -> None:
+        if channel.guild.id in self._indexed:
+            self._remove_channel(channel)
+
+    async def on_guild_channel_update(
+        self, before: "discord.abc.GuildChannel", after: "discord.abc.GuildChannel"
+    ) -> None:
+        if after.guild.id in self._indexed and before.name != after.name:
+            self._remove_channel(before)
+            self._add_channel(after)
+
+    async def on_guild_role_create(self, role: "discord.Role") -> None:
+        if role.guild.id in self._indexed:
+            self._add(self._roles[role.guild.id], role.name, role.id)
+
+    async def on_guild_role_delete(self, role: "discord.Role") -> None:
+        if role.guild.id in self._indexed:
+            self._remove(self._roles[role.guild.id], role.name, role.id)
+
+    async def on_guild_role_update(self, before: "discord.Role", after: "discord.Role") -> None:
+        if after.guild.id in self._indexed and before.name != after.name:
+            self._remove(self._roles[after.guild.id], before.name, before.id)
+            self._add(self._roles[after.guild.id], after.name, after.id)
+
@@ -0,0 +1,119 @@
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, FrozenSet, List, Optional
+
+from bot.channels import ChannelClassifier, ChannelKind
+from bot.flood import FloodGuard
+
+# Project‑wide logger helper
+from utils.logger import get_logger
+
+if TYPE_CHECKING:
+    import discord
+
+logger = get_logger(__name__)
+
+Handler = Callable[["discord.Message"], Awaitable[Any]]
+
+
+@dataclass(slots=True)
+class RouteStats:
+    """Time spent in one route's handler."""
+
+    calls: int = 0
+    errors: int = 0
+    flooded: int = 0        # messages held back by the flood guard
+    total: float = 0.0      # seconds
+    slowest: float = 0.0    # seconds
+
+    def record(self, elapsed: float, failed: bool) -> None:
+        self.calls += 1
+        self.errors += failed
+        self.total += elapsed
+        self.slowest = max(self.slowest, elapsed)
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.calls if self.calls else 0.0
+
+
+class MessageRouter:
+    """
+    Single ``on_message`` entry point for the cogs.
+
+    Each cog routes the kind of channel it owns (see :class:`ChannelKind`)
+    to its handler; a message is classified once and only that handler
+    runs, instead of every cog's listener re-checking author, category and
+    channel. Messages from bots and from channels nobody owns are dropped
+    here. Handler time is recorded per route.
+
+    In the channels where the cogs delete messages (team and guarded
+    channels), messages first go through the flood guard, if any: a user
+    flooding a channel is not handled message by message (see FloodGuard).
+    """
+
+    def __init__(
+        self,
+        channel_kinds: ChannelClassifier,
+        flood_guard: Optional[FloodGuard] = None,
+        flood_kinds: FrozenSet[ChannelKind] = frozenset({ChannelKind.MONITORED, ChannelKind.GUARDED}),
+    ) -> None:
+        """
+        Args:
+            channel_kinds (ChannelClassifier): Classifies the message channels.
+            flood_guard (FloodGuard, optional): Holds back users flooding a channel.
+            flood_kinds (frozenset): Kinds of channel the flood guard watches.
+        """
+        self.channel_kinds = channel_kinds
+        self.flood_guard = flood_guard
+        self.flood_kinds = flood_kinds
+        self._routes: Dict[ChannelKind, Handler] = {}
+        self.stats: Dict[ChannelKind, RouteStats] = {}
+
+    def route(self, kind: ChannelKind, handler: Handler) -> None:
+        """
+        Send the messages of channels of *kind* to *handler* (replacing any previous one).
+
+        Args:
+            kind (ChannelKind): The kind of channel.
+            handler (Callable): ``async handler(message)``.
+        """
+        self._routes[kind] = handler
+        self.stats.setdefault(kind, RouteStats())
+
+    def unroute(self, kind: ChannelKind) -> None:
+        """Stop routing the messages of channels of *kind*."""
+        self._routes.pop(kind, None)
+
+    async def dispatch(self, message: "discord.Message") -> None:
+        """
+        Hand *message* to the handler of its channel's kind, if any.
+
+        Args:
+            message (discord.Message): The incoming message.
+        """
+        if message.author.bot:
+            return
+        kind = self.channel_kinds.kind(message.channel)
+        handler = self._routes.get(kind)
+        if handler is None:
+            return
+        if self.flood_guard is not None and kind in self.flood_kinds and not self.flood_guard.admit(message):
+            self.stats[kind].flooded += 1
+            return
+
+        failed = True
+        start = time.perf_counter()
+        try:
+            await handler(message)
+            failed = False
+        finally:
+            self.stats[kind].record(time.perf_counter() - start, failed)
+
+    def describe(self) -> List[str]:
+        """One line of timings per route, for the admin channel."""
+        return [
+            f"{kind.value}: {stats.calls} msg, {stats.errors} errors, {stats.flooded} flooded, "
+            f"mean {stats.mean * 1e3:.1f} ms, slowest {stats.slowest * 1e3:.1f} ms"
+            for kind, stats in self.stats.items()
+        ]
@@ -1,18 +1,25 @@
-from typing import Any
+import functools
+import os
+import time
+from typing import Any, Set, Tuple
 import discord
 from discord.ext import commands
 from services.link_manager import LinkManager
 from services.queue.queue_buffer import QueueBuffer  # Our new buffer
 from services.queue.queue_manager import QueueManager       # Our new live queue manager
+from services.message_index import MessageIndex
+from services.backfill import BackfillResult, HistoryBackfill
+from bot.channels import ChannelKind
 
 import utils.warning_reporter as warning 
 
 class EventCog(commands.Cog):
     """
     Cog responsible for handling core Discord events:
-      - on_message: when a message is sent, validate and stage an "add" operation.
-      - on_message_delete: when a message is deleted, stage a "delete" operation.
-      - on_message_edit: when a message is edited, stage a "replace" operation.
+      - on_ready: stage the songs posted in team channels while the bot was offline.
+      - team channel messages (routed by the bot): validate and stage an "add" operation.
+      - on_raw_message_delete: when a song message is deleted, stage a "delete" operation.
+      - on_raw_message_edit: when a song message is edited, stage a "replace" operation.
     All actions are sent to QueueBuffer so that they can be applied in batch later.
     """
 
@@ -33,10 +40,23 @@ class EventCog(commands.Cog):
         # Link manager to validate YouTube links
         self.link_manager: LinkManager = LinkManager()
 
-        # Configuration details
-        self.category_name: str = self.config["bot"]["monitored_category"]
-        self.monitored_channels: list[str] = self.config["bot"]["monitored_channels"]
-        self.free_talk_channels: list[str] = self.config["bot"]["free_talk_channels"]
+        # Team channel messages (monitored category + monitored_channels)
+        bot.router.route(ChannelKind.MONITORED, self.handle_team_message)
+
+        # Message ID ➜ staged song, so deletes/edits don't depend on discord.py's message cache
+        state_dir: str = (self.config.get("queue") or {}).get("state_dir") or "state"
+        self.message_index: MessageIndex = MessageIndex(
+            max_entries=self.config["bot"].get("message_index_size") or 20_000,
+            path=os.path.join(state_dir, "message_index.json"),
+        )
+
+        # Startup walk of the team channels' history, from where the last run stopped
+        self.backfill: HistoryBackfill = HistoryBackfill(
+            path=os.path.join(state_dir, "backfill_marks.json"),
+            concurrency=self.config["bot"].get("backfill_concurrency") or 5,
+            first_run_limit=self.config["bot"].get("backfill_first_run_limit", 200),
+        )
+        self._backfilling: bool = False
         
         self.output_channel: str = self.config["bot"]["output_channel"]
         self.notification_channel: str = self.config["bot"]["notification_channel"]
@@ -45,157 +65,215 @@ class EventCog(commands.Cog):
     async def on_ready(self) -> None:
         """
         Runs when the bot is fully connected and ready.
-        Announces readiness in the configured notification channel.
+        Announces readiness in the configured notification channel, then stages
+        the songs posted in the team channels while the bot was away.
         """
         print(f'Logged in as {self.bot.user}')
         for guild in self.bot.guilds:
             print(f'Connected to server: {guild.name}')
-            default_channel: discord.TextChannel | None = discord.utils.get(
-                guild.text_channels,
-                name=self.notification_channel
+            default_channel: discord.TextChannel | None = self.bot.resolver.channel(
+                self.notification_channel, guild, text_only=True
             )
             if default_channel:
                 await default_channel.send(
                     f"KaraParty bot está listo para operar en el servidor **{guild.name}**!"
                 )
 
-    @commands.Cog.listener()
-    async def on_message(self, message: discord.Message) -> None:
+        # on_ready fires again after a reconnect; one walk at a time
+        if self._backfilling:
+            return
+        self._backfilling = True
+        try:
+            for guild in self.bot.guilds:
+                await self._backfill_guild(guild)
+        finally:
+            self._backfilling = False
+
+    async def cog_unload(self) -> None:
+        self.bot.router.unroute(ChannelKind.MONITORED)
+        await self.message_index.close()
+        await self.backfill.close()
+
+    async def _backfill_guild(self, guild: discord.Guild) -> None:
         """
-        When a message is sent in a monitored channel (within the monitored category),
-        validates its content. If it's a valid YouTube link and not a duplicate (as
-        determined by checking the live queue), the operation is staged as an "add" 
-        in the QueueBuffer.
-        
+        Walks the history of the guild's team channels, staging the songs found,
+        and reports progress in the notification channel.
+
         Args:
-            message (discord.Message): The received message.
+            guild (discord.Guild): The guild to backfill.
         """
-        if message.author.bot:
+        channels = [channel for channel in guild.text_channels
+                    if self.bot.channel_kinds.kind(channel) is ChannelKind.MONITORED]
+        if not channels:
             return
+        notification: discord.TextChannel | None = self.bot.resolver.channel(
+            self.notification_channel, guild, text_only=True
+        )
+        report: discord.Message | None = None
+        if notification:
+            report = await notification.send(f"⏳ Recuperando canciones de {len(channels)} canales de equipo…")
+        last_report = time.monotonic()
 
-        # Get the part of the channel name up to the last separator (including it)
-        def get_channel_prefix(channel_name):
-            last_sep_index = channel_name.rfind('︱')
-            if last_sep_index != -1:
-                return channel_name[:last_sep_index + 1]
-            return channel_name  # fallback, unlikely but safe
+        async def progress(result: BackfillResult) -> None:
+            nonlocal last_report
+            # edit at most every 2 s; the final summary is sent below
+            if report is None or result.done == result.channels or time.monotonic() - last_report < 2:
+                return
+            last_report = time.monotonic()
+            await report.edit(content=f"⏳ Recuperando canciones: {result.done}/{result.channels} canales, "
+                                      f"{result.staged} canciones en fila…")
 
-        channel_prefix = get_channel_prefix(message.channel.name)
+        # songs already in the live queue (e.g. recovered from the journal) are not staged again
+        queued = {(song.team, song.video_id) for songs in self.queue.queues.values() for song in songs}
+        start = time.monotonic()
+        result = await self.backfill.run(channels, functools.partial(self._stage_backlog, queued), progress)
+        summary = (f"✅ Recuperadas {result.staged} canciones de {result.channels} canales "
+                   f"({result.messages} mensajes) en {time.monotonic() - start:.1f} s")
+        if result.failed:
+            summary += f"; {result.failed} canales no se pudieron leer"
+        print(f"[EventCog] {summary}")
+        if report is not None:
+            await report.edit(content=summary)
 
+    async def _stage_backlog(self, queued: Set[Tuple[str, str]], message: discord.Message) -> bool:
+        """
+        Stages the song of a message posted while the bot was offline, through the
+        same checks as a live message (but silently: old messages are not deleted).
 
+        Args:
+            queued (set): (team, video ID) pairs already in the live queue.
+            message (discord.Message): A message from a team channel's history.
 
-        # Check that the message is in the correct category and channel.
-        in_karaoke_category = (message.channel.category and 
-                               message.channel.category.name == self.category_name)
-        in_monitored_channel = channel_prefix in self.monitored_channels
+        Returns:
+            bool: True if a song was staged.
+        """
+        if message.id in self.message_index:
+            return False
         team_name = message.channel.name
+        valid, video_id = self.link_manager.validate_message(message.content)
+        if not valid or (team_name, video_id) in queued or self.queue.is_dispatched(video_id, team_name):
+            return False
+        if not self.buffer.add_song(team_name, video_id)["success"]:
+            return False
+        self.message_index.add(message.id, team_name, video_id, message.author.id)
+        return True
 
-        if in_karaoke_category and in_monitored_channel:
-            valid, link = self.link_manager.validate_message(message.content)
-            if not valid:
-                await message.delete()
-                await warning.discord_invalid_message(
-                                                user=message.author,
-                                                channel=message.channel,
-                                                delete_after=20)                
-                return
+    async def handle_team_message(self, message: discord.Message) -> None:
+        """
+        When a message is sent in a monitored channel (within the monitored category),
+        validates its content. If it's a valid YouTube link and not a duplicate (as
+        determined by checking the live queue), the operation is staged as an "add" 
+        in the QueueBuffer.
+        
+        Args:
+            message (discord.Message): The received message (from a team channel,
+                                       see MessageRouter).
+        """
+        team_name = message.channel.name
+        self.backfill.advance(message.channel.id, message.id)
+        valid, video_id = self.link_manager.validate_message(message.content)
+        if not valid:
+            await message.delete()
+            await warning.discord_invalid_message(
+                                            user=message.author,
+                                            channel=message.channel,
+                                            delete_after=20)                
+            return
 
 
-            if self.queue.is_dispatched(link, team_name):
+        if self.queue.is_dispatched(video_id, team_name):
+            await message.delete()
+            await warning.discord_repeated_song( user=message.author,
+                                                 channel=message.channel,
+                                                 delete_after=20)                
+        else:
+            # Stage the addition operation to the buffer.
+            status_message  = self.buffer.add_song(team_name, video_id)
+            if not status_message["success"]:
                 await message.delete()
                 await warning.discord_repeated_song( user=message.author,
-                                                     channel=message.channel,
-                                                     delete_after=20)                
+                                                    channel=message.channel,
+                                                    delete_after=20)  
             else:
-                # Stage the addition operation to the buffer.
-                status_message  = self.buffer.add_song(team_name, link)
-                if not status_message["success"]:
-                    await message.delete()
-                    await warning.discord_repeated_song( user=message.author,
-                                                        channel=message.channel,
-                                                        delete_after=20)  
-                else:
-                    print(f"[EventCog] Staged add song {link} for team {team_name}.")
+                self.message_index.add(message.id, team_name, video_id, message.author.id)
+                print(f"[EventCog] Staged add song {video_id} for team {team_name}.")
 
     @commands.Cog.listener()
-    async def on_message_delete(self, message: discord.Message) -> None:
+    async def on_raw_message_delete(self, payload: discord.RawMessageDeleteEvent) -> None:
         """
-        When a message is deleted from a monitored channel within the monitored category,
-        if the message contained a valid YouTube link, stage a delete operation in the
-        QueueBuffer. 
+        When a message that staged a song is deleted, stage a delete operation in
+        the QueueBuffer. Works whether or not discord.py still caches the message:
+        the song is found through the cog's message index.
 
         Args:
-            message (discord.Message): The deleted message.
+            payload (discord.RawMessageDeleteEvent): The deletion event.
         """
-        if message.author.bot:
+        song = self.message_index.pop(payload.message_id)
+        if song is None:
             return
 
-        in_karaoke_category = (message.channel.category and 
-                               message.channel.category.name == self.category_name)
-        in_monitored_channel = message.channel.name in self.monitored_channels
-
-        if in_karaoke_category and in_monitored_channel:
-            team_name = message.channel.name
-            valid, link = self.link_manager.validate_message(message.content)
-            if valid:
-                # Stage a delete operation in the buffer.
-                status_message  =self.buffer.delete_song(team_name, link)
-                if not status_message["success"]:
-                    await warning.discord_delete_dispatched( user=message.author,
-                                                        channel=message.channel,
-                                                        delete_after=20)                
-                else:
-                    print(f"[EventCog] Staged deletion of song {link} for team {team_name}.")
+        # Stage a delete operation in the buffer.
+        status_message = self.buffer.delete_song(song.team, song.video_id)
+        if not status_message["success"]:
+            channel = self.bot.get_channel(payload.channel_id)
+            if channel is not None:
+                await warning.discord_delete_dispatched( user=await self._author(song.author_id),
+                                                         channel=channel,
+                                                         delete_after=20)
+        else:
+            print(f"[EventCog] Staged deletion of song {song.video_id} for team {song.team}.")
 
     @commands.Cog.listener()
-    async def on_message_edit(self, before: discord.Message, after: discord.Message) -> None:
+    async def on_raw_message_edit(self, payload: discord.RawMessageUpdateEvent) -> None:
         """
-        When a message is edited in a monitored channel, if the content changes from a
-        valid YouTube link to another valid YouTube link, stage a replacement operation
-        in the QueueBuffer.
-        
+        When a message that staged a song is edited to another valid YouTube link,
+        stage a replacement operation in the QueueBuffer; if the new content is not
+        a valid link, delete the message and un-stage its song.
+
         Args:
-            before (discord.Message): The original message.
-            after (discord.Message): The edited message.
+            payload (discord.RawMessageUpdateEvent): The edit event.
         """
-        if before.author.bot:
+        song = self.message_index.get(payload.message_id)
+        # Only messages that staged a song, and only content changes (not embeds loading).
+        if song is None or "content" not in payload.data:
             return
 
-        if (before.channel.category and 
-            before.channel.category.name == self.category_name and 
-            before.channel.name in self.monitored_channels):
-            # Only consider edits if the content has changed.
-            if before.content == after.content:
-                return
-
-            # Validate both the old and new content.
-            valid_before, old_link = self.link_manager.validate_message(before.content)
-            valid_after, new_link = self.link_manager.validate_message(after.content)
-            team_name = before.channel.name
-
-            if not (valid_before and valid_after):
-                await after.delete()
-                await warning.discord_invalid_message(
-                                                user=after.author,
-                                                channel=after.channel,
-                                                delete_after=20)                
-                if valid_before:
-                    status_message  =self.buffer.delete_song(team_name, old_link)
-                    if not status_message["success"]:
-                        print("[EventCog]  Failed to delete song from buffer.")                        
-                    else:
-                        print(f"[EventCog] Staged deletion of song {old_link} for team {team_name} due to wrong edit.")
-
-                return
+        valid_after, new_video_id = self.link_manager.validate_message(payload.data["content"])
+        if valid_after and new_video_id == song.video_id:
+            return
+        channel = self.bot.get_channel(payload.channel_id)
+        if channel is None:
+            return
+        author = await self._author(song.author_id)
 
-            # If both are valid YouTube links, stage a replacement.
-            status_message = self.buffer.replace_song(team_name, old_link, new_link)
+        if not valid_after:
+            self.message_index.pop(payload.message_id)
+            await channel.get_partial_message(payload.message_id).delete()
+            await warning.discord_invalid_message(
+                                            user=author,
+                                            channel=channel,
+                                            delete_after=20)
+            status_message = self.buffer.delete_song(song.team, song.video_id)
             if not status_message["success"]:
-                await warning.discord_edit_dispatched( user=after.author,
-                                                         channel=after.channel,
-                                                         delete_after=20)                
+                print("[EventCog]  Failed to delete song from buffer.")
             else:
-                print(f"[EventCog] Staged replacement in team {team_name}: {old_link} -> {new_link} ")
+                print(f"[EventCog] Staged deletion of song {song.video_id} for team {song.team} due to wrong edit.")
+            return
+
+        # If both are valid YouTube links, stage a replacement.
+        status_message = self.buffer.replace_song(song.team, song.video_id, new_video_id)
+        if not status_message["success"]:
+            await warning.warn_user( user=author,
+                                     channel=channel,
+                                     warning_key=status_message["warning_type"],
+                                     delete_after=20)
+        else:
+            self.message_index.replace(payload.message_id, new_video_id)
+            print(f"[EventCog] Staged replacement in team {song.team}: {song.video_id} -> {new_video_id} ")
+
+    async def _author(self, author_id: int) -> discord.abc.User:
+        """The author of an indexed message (from the cache, or fetched)."""
+        return self.bot.get_user(author_id) or await self.bot.fetch_user(author_id)
 
 async def setup(bot: commands.Bot) -> None:
     """
@@ -1,6 +1,7 @@
 from typing import Any
 import discord
 from discord.ext import commands
+from bot.channels import ChannelKind
 
 
 class MessageGuardCog(commands.Cog):
@@ -18,56 +19,33 @@ class MessageGuardCog(commands.Cog):
             bot (commands.Bot): The bot instance this cog is attached to.
         """
         self.bot = bot
-
-        # Read configuration values
-        self.allowed_channels: list[str]= bot.config["bot"]["monitored_channels"] + bot.config["bot"]["free_talk_channels"]
-        self.monitored_category: str = bot.config["bot"]["monitored_category"]
         self.warning_message: str = "Cant write here"
 
-    @commands.Cog.listener()
-    async def on_message(self, message: discord.Message) -> None:
+        # Messages of the monitored category outside monitored_channels + free_talk_channels
+        bot.router.route(ChannelKind.GUARDED, self.handle_guarded_message)
+
+    async def cog_unload(self) -> None:
+        self.bot.router.unroute(ChannelKind.GUARDED)
+
+    async def handle_guarded_message(self, message: discord.Message) -> None:
         """
-        Event handler that deletes messages not in allowed channels inside the
-        monitored category and sends a warning to the user.
+        Deletes a message posted in the monitored category outside the allowed
+        channels (routed here by the bot) and sends a warning to the user.
 
         Args:
             message (discord.Message): The incoming message event from Discord.
         """
-        if message.author.bot:
-            return  # Ignore bot messages
-
-        # Ignore messages outside the target category
-        if not message.channel.category:
-            return
-
-        if message.channel.category.name != self.monitored_category:
-            return
-
-
-        # Get the part of the channel name up to the last separator (including it)
-        def get_channel_prefix(channel_name):
-            parts = channel_name.split('︱')
-            # Check if there are at least 3 parts: something like 🎤equipo︱number︱
-            if len(parts) >= 3 and parts[1].isdigit():
-                # Rebuild the prefix up to and including the second separator
-                return '︱'.join(parts[:2]) + '︱'
-            return channel_name  # Return as is if the structure is not matched
-        formated_channel_name = get_channel_prefix(message.channel.name)
-
-
-        # Check if channel is NOT in the allowed list
-        if formated_channel_name not in self.allowed_channels:
-            try:
-                await message.delete()
-                await message.channel.send(
-                    f"{message.author.mention} {self.warning_message}",
-                    delete_after=30
-                )
-                print(f"[Guard] Deleted message from {message.author} in #{message.channel.name}")
-            except discord.Forbidden:
-                print(f"[Guard] Missing permissions to delete/warn in #{message.channel.name}")
-            except discord.HTTPException as e:
-                print(f"[Guard] Failed to delete or warn: {e}")
+        try:
+            await message.delete()
+            await message.channel.send(
+                f"{message.author.mention} {self.warning_message}",
+                delete_after=30
+            )
+            print(f"[Guard] Deleted message from {message.author} in #{message.channel.name}")
+        except discord.Forbidden:
+            print(f"[Guard] Missing permissions to delete/warn in #{message.channel.name}")
+        except discord.HTTPException as e:
+            print(f"[Guard] Failed to delete or warn: {e}")
 
 
 async def setup(bot: commands.Bot) -> None:
@@ -1,15 +1,20 @@
 from __future__ import annotations
 
-import json
 from typing import Any, List
 
-import aiofiles
 import discord
 from discord.ext import commands, tasks
 
 from utils.logger import get_logger                     # ← your central logger helper
-from services.youtube_service import YouTubeService
+from services.youtube_service import QuotaAccountant, YouTubeService, is_transient_error
+from services.dispatch_worker import DispatchWorker
+from services.retry_queue import RetryQueue
+from services.ledger import SongLedger
+from services.queue.song_entry import SongEntry
+from bot.channels import ChannelKind
+from utils.rate_limit import TokenBucket
 from services.queue.queue_manager import QueueManager
+from services.queue.scheduling import POLICIES, make_policy
 
 logger = get_logger(__name__)                           # one logger for the whole cog
 
@@ -35,10 +40,18 @@ class MusicDispatcherCog(commands.Cog):
         self.notification_channel: str = bot.config["bot"]["notification_channel"]
         self.management_channel: str = bot.config["bot"]["managment"]             # sic → config spelling kept
         self.output_channel: str = bot.config["bot"]["output_channel"]
+        self.queue_config: dict[str, Any] = bot.config.get("queue") or {}
 
         self.command_list = {
             "dispatch_frequency": "Defines the time between dispatch cycles (seconds).",
             "dispatch_number": "Defines how many songs are dispatched each cycle.",
+            "scheduling": f"Shows or sets how teams take turns ({' | '.join(POLICIES)}).",
+            "new_session": "Forgets the songs dispatched so far, so they can be requested again.",
+            "quota": "Shows the YouTube API quota left today and whether dispatch is being slowed down.",
+            "dead_letters": "Lists the songs that could not be added to the playlist.",
+            "redrive": "Retries dead-lettered songs: `!kai redrive all` or `!kai redrive 1 3`.",
+            "routes": "Shows how long each kind of channel's message handler takes.",
+            "validation_cache": "Shows how many presentations were decided locally or answered from the cache.",
         }
 
         # user-tweakable parameters
@@ -54,25 +67,54 @@ class MusicDispatcherCog(commands.Cog):
             client_secret_file=yt_conf["client_secret_file"],
             credentials_file=yt_conf["credentials_file"],
             playlist_id=yt_conf["playlist_id"],
+            quota=QuotaAccountant(
+                daily_limit=yt_conf.get("daily_quota") or 10_000,
+                state_file=yt_conf.get("quota_state_file"),
+            ),
         )
+        # spread what is left of the quota over at least this long (or until the reset)
+        self.quota_pacing_seconds: float = (yt_conf.get("quota_pacing_hours") or 4) * 3600
+        self.quota_paced: bool = False
+
+        # playlist inserts run off the event loop, paced by a token bucket
+        self.dispatch_worker = DispatchWorker(
+            self.youtube_service.add_video_to_playlist,
+            limiter=TokenBucket(
+                rate=yt_conf.get("insert_rate") or 1.0,
+                capacity=yt_conf.get("insert_burst") or 1,
+            ),
+            on_result=self._on_song_sent,
+            insert_many=self.youtube_service.add_videos_to_playlist,
+            reinsert=self.youtube_service.add_video_to_playlist_once,
+        )
+        # songs on their way to the playlist, retried on failure, then dead-lettered
+        self.retry_queue = RetryQueue.from_config(
+            yt_conf.get("retry"), self.queue_config.get("state_dir") or "state"
+        )
+
+        # append-only record of everything dispatched (read by kai_api)
+        self.ledger = SongLedger(self.queue_config.get("dispatched_ledger") or "dispatched_songs.jsonl")
+
+        # admin commands
+        bot.router.route(ChannelKind.MANAGEMENT, self.handle_admin_message)
 
-        # start background task
+        # start background tasks
+        self.dispatch_worker.start()
         self.dispatch_songs.start()
+        self.retry_failed.start()
 
-    def cog_unload(self):
+    async def cog_unload(self):
+        self.bot.router.unroute(ChannelKind.MANAGEMENT)
         self.dispatch_songs.cancel()
+        self.retry_failed.cancel()
+        await self.dispatch_worker.stop()
+        await self.retry_queue.close()
+        self.ledger.close()
 
     # ────────────────────────────────────────────────
-    #  message listener (admin commands)
+    #  admin commands (management channel, routed by the bot)
     # ────────────────────────────────────────────────
-    @commands.Cog.listener()
-    async def on_message(self, message: discord.Message):
-        if message.author.bot:
-            return
-
-        if message.channel.name != self.management_channel:
-            return
-
+    async def handle_admin_message(self, message: discord.Message):
         required_role = "KaraParty Admin"
         if not any(role.name == required_role for role in message.author.roles):
             return
@@ -127,6 +169,90 @@ class MusicDispatcherCog(commands.Cog):
             self._say(f"Dispatch number changed to {new_num}")
             return
 
+        # ---- scheduling -----------------------------------------------------
+        if command == "scheduling":
+            if value is None:
+                await message.channel.send(f"🔀 Current scheduling: **{self.queue.policy.describe()}**.")
+                return
+            try:
+                policy = make_policy(value.strip(), self.queue_config)
+            except ValueError as exc:
+                await message.channel.send(f"⚠️ {exc}")
+                return
+
+            self.queue.set_policy(policy)
+            await message.channel.send(f"🔀 Scheduling set to **{policy.describe()}**.")
+            self._say(f"Scheduling changed to {policy.describe()}")
+            return
+
+        # ---- new_session ----------------------------------------------------
+        if command == "new_session":
+            forgotten = len(self.queue.dispatched)
+            self.queue.reset_dispatched()
+            await message.channel.send(f"🆕 New session: {forgotten} dispatched song(s) forgotten.")
+            self._say(f"Dispatched guard reset by {message.author}")
+            return
+
+        # ---- quota ----------------------------------------------------------
+        if command == "quota":
+            pacing = (f"slowed down to every **{self.dispatch_songs.seconds:.0f} s** to make it last"
+                      if self.quota_paced else "not slowed down")
+            await message.channel.send(
+                f"📊 YouTube quota: {self.youtube_service.quota.describe()}.\n"
+                f"Dispatch is {pacing}."
+            )
+            return
+
+        # ---- dead_letters ---------------------------------------------------
+        if command == "dead_letters":
+            letters = self.retry_queue.dead_letters()
+            if not letters:
+                await message.channel.send("📭 No dead-lettered songs.")
+                return
+            lines = [f"📬 {len(letters)} song(s) could not be added to the playlist:"]
+            for index, letter in enumerate(letters[:20]):
+                song = letter["song"]
+                lines.append(f"`{index}` {song.link} (team #{song.team}, {letter['attempts']} attempt(s)): "
+                             f"{letter.get('error') or 'unknown error'}")
+            if len(letters) > 20:
+                lines.append(f"… and {len(letters) - 20} more.")
+            await message.channel.send("\n".join(lines))
+            return
+
+        # ---- redrive --------------------------------------------------------
+        if command == "redrive":
+            if value is None:
+                await message.channel.send("⚠️ Uso: `!kai redrive all` o `!kai redrive 0 2 …`")
+                return
+            try:
+                indexes = None if value.strip() == "all" else [int(v) for v in value.split()]
+            except ValueError:
+                await message.channel.send("⚠️ Values must be dead letter numbers or `all`.")
+                return
+            redriven = self.retry_queue.redrive(indexes)
+            await message.channel.send(f"🔁 {len(redriven)} song(s) queued again for the playlist.")
+            self._say(f"{len(redriven)} dead-lettered song(s) re-driven by {message.author}")
+            return
+
+        # ---- validation_cache -----------------------------------------------
+        if command == "validation_cache":
+            presentations = self.bot.get_cog("PresentationManagerCog")
+            if presentations is None:
+                await message.channel.send("⚠️ Presentations are not being validated.")
+                return
+            lines = [f"🗂️ Presentation validation cache: {presentations.validation_cache.describe()}",
+                     f"📝 Template parser: {presentations.parser.describe()}"]
+            if presentations.batcher is not None:
+                lines.append(f"📦 LLM batches: {presentations.batcher.describe()}")
+            await message.channel.send("\n".join(lines))
+            return
+
+        # ---- routes ---------------------------------------------------------
+        if command == "routes":
+            lines = self.bot.router.describe() or ["no messages routed yet"]
+            await message.channel.send("⏱️ Message handlers:\n" + "\n".join(f"• {line}" for line in lines))
+            return
+
     # ────────────────────────────────────────────────
     #  background task
     # ────────────────────────────────────────────────
@@ -134,58 +260,114 @@ class MusicDispatcherCog(commands.Cog):
     async def dispatch_songs(self):
         self._say(f"Dispatch cycle started; frequency = {self.dispatch_frequency}s")
 
-        dispatched_songs = self.buffer.apply_to(self.queue)
+        if not self._pace_for_quota():
+            self._say("YouTube quota exhausted; songs stay queued until the reset", level="warning")
+            return
+
+        durations = await self._fetch_durations()
+        dispatched_songs = self.buffer.apply_to(self.queue, durations)
         if not dispatched_songs:
             self._say("No songs to dispatch this cycle", level="debug")
             return
 
-        send_channel = discord.utils.get(self.bot.get_all_channels(), name=self.output_channel)
-
-        # iterate over songs
+        # hand the songs to the YouTube worker; it reports back in _on_song_sent
         for song in dispatched_songs:
-            self._say(f"Attempting to queue {song['link']} (team #{song['team']}) on YouTube")
+            self._say(f"Attempting to queue {song.link} (team #{song.team}) on YouTube")
+            self.retry_queue.track(song)
+            self.dispatch_worker.submit(song)
 
-            try:
-                self.youtube_service.add_video_to_playlist(song["link"])
-                content = (
-                    f"🎶 **Canción en fila**\n"
-                    f"**Link**: {song['link']}\n"
-                    f"**Del equipo**: #{song['team']}\n"
-                    f"**A las**: {song['timestamp']} UTC"
-                )
-                if send_channel:
-                    await send_channel.send(content)
+        self.ledger.append(dispatched_songs)
+
+    @dispatch_songs.before_loop
+    async def before_dispatch_songs(self):
+        await self.bot.wait_until_ready()
 
-            except Exception as exc:
-                self._say(f"Error adding video: {exc}", level="error")
+    @tasks.loop(seconds=15)
+    async def retry_failed(self):
+        """Hand the songs whose retry time has come back to the worker."""
+        if self.youtube_service.quota.remaining() < self.youtube_service.quota.cost("playlistItems.insert"):
+            return
+        for song, first_attempt in self.retry_queue.due():
+            self._say(f"Retrying {song.link} (team #{song.team}) on YouTube")
+            self.dispatch_worker.submit(song, first_attempt)
 
-                management_ch = discord.utils.get(
-                    self.bot.get_all_channels(), name=self.management_channel
+    @retry_failed.before_loop
+    async def before_retry_failed(self):
+        await self.bot.wait_until_ready()
+
+    async def _on_song_sent(self, song: SongEntry, response: Any, error: BaseException | None):
+        """Announce a song once the worker has added it to the playlist (or failed to)."""
+        if error is not None:
+            self._say(f"Error adding video: {error}", level="error")
+            if self.retry_queue.fail(song, error, retryable=is_transient_error(error)) is not None:
+                return
+            management_ch = self.bot.resolver.channel(self.management_channel)
+            if management_ch:
+                await management_ch.send(
+                    f"⚠️ Error adding video {song.link} (team #{song.team}): {error!s}\n"
+                    f"Moved to dead letters; see `!kai dead_letters`."
                 )
-                if management_ch:
-                    await management_ch.send(f"⚠️ Error adding video: {exc!s}")
+            return
 
-        await self._write_dispatched_songs(dispatched_songs)
+        self.retry_queue.resolve(song)
 
-    @dispatch_songs.before_loop
-    async def before_dispatch_songs(self):
-        await self.bot.wait_until_ready()
+        send_channel = self.bot.resolver.channel(self.output_channel)
+        if send_channel:
+            await send_channel.send(
+                f"🎶 **Canción en fila**\n"
+                f"**Link**: {song.link}\n"
+                f"**Del equipo**: #{song.team}\n"
+                f"**A las**: {song.display_time()} UTC"
+            )
 
     # ────────────────────────────────────────────────
     #  helpers
     # ────────────────────────────────────────────────
-    async def _write_dispatched_songs(self, dispatched_songs):
-        file_name = "dispatched_songs.json"
+    def _pace_for_quota(self) -> bool:
+        """
+        Lengthen the dispatch interval when the quota left would not last
+        ``quota_pacing_seconds`` (or until the reset) at the current pace,
+        and restore ``dispatch_frequency`` once it would.
+
+        Returns:
+            bool: False when not even one more song can be inserted today.
+        """
+        quota = self.youtube_service.quota
+        songs_left = quota.remaining() // quota.cost("playlistItems.insert") - self.dispatch_worker.pending()
+        until_reset = quota.seconds_until_reset()
+
+        if songs_left > 0:
+            needed = min(self.quota_pacing_seconds, until_reset) * self.dispatch_number / songs_left
+        else:
+            needed = until_reset
+
+        if needed > self.dispatch_frequency:
+            interval = round(needed)
+            # only retune on a real change, not on every cycle's rounding
+            if not self.quota_paced or abs(interval - self.dispatch_songs.seconds) > 0.1 * interval:
+                self.dispatch_songs.change_interval(seconds=interval)
+                self._say(f"YouTube quota: {quota.describe()}; dispatch slowed to every {interval}s",
+                          level="warning")
+            self.quota_paced = True
+        elif self.quota_paced:
+            self.dispatch_songs.change_interval(seconds=self.dispatch_frequency)
+            self.quota_paced = False
+            self._say(f"YouTube quota: {quota.describe()}; dispatch back to every {self.dispatch_frequency}s")
+
+        return songs_left > 0
+
+    async def _fetch_durations(self) -> dict[str, float]:
+        """Durations of the staged songs, only when the scheduling policy uses them."""
+        if not self.queue.policy.needs_durations:
+            return {}
+        video_ids = self.buffer.pending_video_ids()
+        if not video_ids:
+            return {}
         try:
-            async with aiofiles.open(file_name, "r") as f:
-                data = json.loads(await f.read())
-        except (FileNotFoundError, json.JSONDecodeError):
-            data = []
-
-        data.extend(dispatched_songs)
-        async with aiofiles.open(file_name, "w") as f:
-            await f.write(json.dumps(data, indent=4))
-        self._say(f"Wrote {len(dispatched_songs)} dispatched song(s) to {file_name}", level="debug")
+            return await self.dispatch_worker.call(self.youtube_service.get_video_durations, video_ids)
+        except Exception as exc:
+            self._say(f"Could not fetch song durations, using defaults: {exc}", level="warning")
+            return {}
 
     def _say(self, msg: str, *, level: str = "info"):
         """
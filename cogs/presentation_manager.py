@@ -1,7 +1,12 @@
+import os
 from typing import Any
 import discord
 from discord.ext import commands
+from bot.channels import ChannelKind
+from services.presentation_parser import PresentationParser
 from services.smartbot_service import SmartBotService
+from services.validation_batcher import ValidationBatcher
+from services.validation_cache import ValidationCache
 from pydantic import BaseModel
 from typing import Optional
 from pydantic import BaseModel
@@ -36,50 +41,105 @@ class PresentationManagerCog(commands.Cog):
         """
         self.bot = bot
         # Read configuration values from bot.config
-        self.target_channel: str = bot.config["bot"]["presentation_channel"]  # e.g., "presentation"
         self.assign_role: str = bot.config["bot"]["starting_role"]  # Role to assign if validated
-        self.previous_role: str = "Kai Oculto"
+        self.previous_role: str = bot.config["bot"].get("hidden_role") or "Kai Oculto"
         self.instruction: str = bot.config["smart_bot"]["presentation_instruction"]
-        self.smart_bot_key: str = bot.config["smart_bot"]["deepseek_key"]
+        smart_bot_conf: dict[str, Any] = bot.config["smart_bot"]
+
+        # One async client for the life of the cog (its login is checked on first use)
+        self.smart_bot: Optional[SmartBotService] = None
+        try:
+            self.smart_bot = SmartBotService(
+                smart_bot_conf["deepseek_key"],
+                base_url=smart_bot_conf.get("base_url") or "https://api.deepseek.com",
+                model=smart_bot_conf.get("model") or "deepseek-chat",
+                max_concurrency=smart_bot_conf.get("max_concurrency") or 2,
+                timeout=smart_bot_conf.get("timeout") or 30,
+            )
+        except ValueError as e:
+            print(f"[RoleAssigner] Presentations will not be validated: {e}")
+
+        # Presentations arriving together (e.g. after an event is announced) share one request
+        self.batcher: Optional[ValidationBatcher] = None
+        if self.smart_bot is not None and (smart_bot_conf.get("batch_size") or 1) > 1:
+            self.batcher = ValidationBatcher(
+                lambda texts: self.smart_bot.validate_texts(self.instruction, texts, ValidationFormat),
+                max_batch=smart_bot_conf["batch_size"],
+                max_wait=smart_bot_conf.get("batch_wait") or 2.0,
+            )
+
+        # Presentations that clearly follow the template are decided without the API
+        self.parser: PresentationParser = PresentationParser(
+            self.assign_role,
+            self.previous_role,
+            community=bot.config["bot"].get("community_name") or "BcnNoKai",
+            hidden_channel=bot.config["bot"].get("hidden_channel") or "jungla",
+        )
+
+        # Results of texts already validated (re-posts skip the API call)
+        self.validation_cache: ValidationCache = ValidationCache(
+            path=os.path.join((bot.config.get("queue") or {}).get("state_dir") or "state", "validation_cache.json"),
+            max_entries=smart_bot_conf.get("cache_size") or 1000,
+            ttl=(smart_bot_conf.get("cache_ttl_hours") or 168) * 3600,
+        )
+        bot.router.route(ChannelKind.PRESENTATION, self.handle_presentation)
+
+    async def cog_unload(self) -> None:
+        self.bot.router.unroute(ChannelKind.PRESENTATION)
+        if self.batcher is not None:
+            await self.batcher.close()
+        if self.smart_bot is not None:
+            await self.smart_bot.close()
+        await self.validation_cache.close()
         
-    def validator(self, message: discord.Message) -> bool:
-        smart_bot_agent  = SmartBotService(self.smart_bot_key)
+    async def validator(self, message: discord.Message) -> Optional[tuple[bool, str]]:
+        """
+        Decides whether a presentation is valid: locally if it clearly follows the
+        template, otherwise from the cache or the API.
+
+        Args:
+            message (discord.Message): The presentation.
+
+        Returns:
+            tuple: (is valid, message for the user), or None if it cannot be checked (no API key).
+        """
         print(message.content)
-        response = smart_bot_agent.validate_text(self.instruction, message.content, ValidationFormat)
+        response = self.parser.parse(message.content)
+        if response is None:
+            response = self.validation_cache.get(self.instruction, message.content)
+        if response is None:
+            if self.smart_bot is None:
+                return None
+            if self.batcher is not None:
+                response = await self.batcher.validate(message.content)
+            else:
+                response = await self.smart_bot.validate_text(self.instruction, message.content, ValidationFormat)
+            if "error" in response:
+                print(response)
+                return (False, "Ahora mismo no puedo revisar tu presentación, vuelve a enviarla en unos minutos.")
+            self.validation_cache.put(self.instruction, message.content, response)
         print(response)
 
         return (response["is_valid"], response["output_message"])
 
-    @commands.Cog.listener()
-    async def on_message(self, message: discord.Message) -> None:
+    async def handle_presentation(self, message: discord.Message) -> None:
         """
-        Event handler that processes messages from the target channel within the target category.
+        Processes messages from the presentation channel (routed here by the bot).
         If the message passes the validator check, assigns a role to the user and sends a confirmation message.
 
         Args:
             message (discord.Message): The incoming message event from Discord.
         """
-        # Ignore messages from bots.
-        if message.author.bot:
-            return
-
-        # Ensure the message is from a channel that belongs to a category.
-        if not message.channel.category:
-            return
-
-        # Check if the message is in the designated target channel and category.
-        if (message.channel.name != self.target_channel):
-            return
-
         # Validate the message using the validator function.
-        is_valid = False 
-        output_message = ""
-        is_valid, output_message = self.validator(message)
+        validation = await self.validator(message)
+        if validation is None:
+            return
+        is_valid, output_message = validation
         
         if is_valid:
             # Find the role in the guild by name.
-            new_role = discord.utils.get(message.guild.roles, name=self.assign_role)
-            old_role = discord.utils.get(message.guild.roles, name=self.previous_role)
+            new_role = self.bot.resolver.role(message.guild, self.assign_role)
+            old_role = self.bot.resolver.role(message.guild, self.previous_role)
             if new_role is None:
                 print(f"[RoleAssigner] Role '{self.assign_role}' not found in guild '{message.guild.name}'.")
                 return
@@ -89,10 +149,10 @@ class PresentationManagerCog(commands.Cog):
                 await message.author.add_roles(new_role)
                 # Send a confirmation message that auto-deletes after 30 seconds.
                 await message.channel.send(f"{message.author.mention} {output_message}")
-                print(f"[RoleAssigner] Assigned role '{role.name}' to user {message.author} and sent confirmation.")
+                print(f"[RoleAssigner] Assigned role '{new_role.name}' to user {message.author} and sent confirmation.")
                 return 
             except discord.Forbidden:
-                print(f"[RoleAssigner] Missing permissions to assign role '{role.name}' to user {message.author}.")
+                print(f"[RoleAssigner] Missing permissions to assign role '{new_role.name}' to user {message.author}.")
             except discord.HTTPException as e:
                 print(f"[RoleAssigner] Failed to assign role or send message: {e}")
         if not is_valid:
@@ -1,23 +1,38 @@
+from typing import Optional
+
 from fastapi import FastAPI
 from fastapi.responses import JSONResponse
-import os
-import json
+import yaml
+
+from services.ledger import LedgerReader
+from utils.error_reporter import report_error
 
 app = FastAPI()
 
-# Path to the JSON file
-json_file_path = os.path.join(os.path.dirname(__file__), "dispatched_songs.json")
+# Path to the YAML file (shared with the bot, started from the same directory)
+config_path = "configs/config.yaml"
+try:
+    with open(config_path, "r", encoding="utf-8") as f:
+        config = yaml.safe_load(f)
+except Exception as e:
+    report_error(e, context="Please, remember to fill your configs/config.yaml file. Template is at config.yaml.template")
+    raise e
+
+# Path to the dispatched songs ledger (JSON lines, appended by the bot): the bot's own setting
+ledger_path = (config.get("queue") or {}).get("dispatched_ledger") or "dispatched_songs.jsonl"
+# Reads only what was appended since the previous request
+ledger = LedgerReader(ledger_path)
 
 @app.get("/songs")
-async def get_dispatched_songs():
-    if os.path.isfile(json_file_path):
-        try:
-            with open(json_file_path, "r", encoding="utf-8") as f:
-                dispatched_songs = json.load(f)
-        except json.JSONDecodeError:
-            # If the file is corrupted or not proper JSON
-            dispatched_songs = []
-    else:
-        dispatched_songs = []
-    
-    return JSONResponse(content=dispatched_songs)
+async def get_dispatched_songs(since: Optional[int] = None):
+    """
+    All dispatched songs, or with ``since=n`` only those after the first n,
+    as ``{"songs": [...], "next": <value of since for the next call>}``.
+    """
+    ledger.refresh()
+    if since is None:
+        return JSONResponse(content=[song.to_dict() for song in ledger.songs])
+    return JSONResponse(content={
+        "songs": [song.to_dict() for song in ledger.songs[since:]],
+        "next": len(ledger.songs),
+    })
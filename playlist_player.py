@@ -11,7 +11,6 @@ Author: Updated Version
 import asyncio
 import os
 import platform
-import json
 import aiofiles
 from typing import Optional, Dict
 from selenium.webdriver import Chrome
@@ -24,8 +23,9 @@ import requests
 import os
 import yaml
 from utils.error_reporter import report_error
-import re
-from urllib.parse import urlparse, parse_qs, urlencode
+from services.video_id import video_id_from_url, to_video_id, video_url
+from services.queue.played_index import PlayedIndex
+from services.queue.song_entry import SongEntry, decode_songs, encode_songs
 
 
 
@@ -34,28 +34,14 @@ def normalize_youtube_link(link):
     Normalize any YouTube link to the simplest desktop format:
     https://www.youtube.com/watch?v=VIDEO_ID
     """
-    parsed = urlparse(link)
-    query = parse_qs(parsed.query)
-    
-    video_id = None
-    
-    if parsed.netloc in ['youtu.be']:
-        # Short links like youtu.be/VIDEO_ID
-        video_id = parsed.path.lstrip('/')
-    elif 'watch' in parsed.path:
-        # Normal or mobile watch links
-        video_id = query.get('v', [None])[0]
-    else:
-        raise ValueError(f"Unsupported YouTube URL format: {link}")
+    return video_url(to_video_id(link))
 
-    if not video_id:
-        raise ValueError(f"Could not extract video ID from link: {link}")
-
-    # Rebuild the simplest link
-    return f"https://www.youtube.com/watch?v={video_id}"
 
 PLAYED_SONGS_FILE ="played_song.json"
 
+# Dispatched songs fetched so far; each call only asks the server for newer ones
+_known_songs = []
+
 def get_current_songs():
     """Fetches the current songs from the configured FastAPI server."""
     config_path = "configs/config.yaml"
@@ -74,9 +60,19 @@ def get_current_songs():
         raise e
 
     try:
-        response = requests.get(url)
+        response = requests.get(url, params={"since": len(_known_songs)})
         response.raise_for_status()  # Raises HTTPError for bad status codes
-        return response.json()
+        data = response.json()
+        if isinstance(data, list):
+            # Server without incremental reads: it sent everything
+            _known_songs[:] = [SongEntry.from_dict(item) for item in data]
+        elif data["next"] < len(_known_songs):
+            # The server's ledger is shorter than what we have (a new one): start over
+            _known_songs.clear()
+            return get_current_songs()
+        else:
+            _known_songs.extend(SongEntry.from_dict(item) for item in data["songs"])
+        return _known_songs
     except requests.exceptions.RequestException as e:
         report_error(e, context=f"Error connecting to the server at {url}")
         raise e
@@ -160,32 +156,33 @@ async def extract_next_video(driver: Chrome) -> Optional[Dict[str, str]]:
         return None
 
 
-async def load_json_async(file_name: str):
+async def load_songs_async(file_name: str):
+    def skip(entry, error):
+        # one unreadable entry (e.g. a legacy non-YouTube link) must not cost the rest of the history
+        print(f"⚠️ Skipping unreadable song in {file_name}: {entry} ({error})")
+
     try:
         async with aiofiles.open(file_name, 'r') as f:
-            return json.loads(await f.read())
-    except (FileNotFoundError, json.JSONDecodeError):
+            return decode_songs(await f.read(), on_invalid=skip)
+    except (FileNotFoundError, ValueError):
         return []
 
 
-async def save_json_async(file_name: str, data):
+async def save_songs_async(file_name: str, songs):
     async with aiofiles.open(file_name, 'w') as f:
-        await f.write(json.dumps(data, indent=4))
+        await f.write(encode_songs(songs))
 
 
-async def find_team_for_song(next_video_link: str, played_songs):
+async def find_team_for_song(next_video_link: str, played_index: PlayedIndex):
     print(f"Getting the current songs")
-    dispatched_songs = get_current_songs()
-    #print(f"⚠️ disatched_songs : {dispatched_songs}")
-        
-    
-    
-    for song in dispatched_songs:
-        print(normalize_youtube_link(song["link"]) , normalize_youtube_link(next_video_link), normalize_youtube_link(song["link"]) == normalize_youtube_link(next_video_link) )
-        if normalize_youtube_link(song["link"]) == normalize_youtube_link(next_video_link) and song not in played_songs:
-            return song["team"], song
+    played_index.update(get_current_songs())
+    next_video_id = video_id_from_url(next_video_link)
+
+    song = played_index.take(next_video_id)
+    if song is not None:
+        return song.team, song
 
-    print(f"⚠️ Song not found in dispatched_songs.json: {normalize_youtube_link(next_video_link)}")
+    print(f"⚠️ Song not found in dispatched_songs.json: {next_video_id}")
 
     return None, None
 
@@ -209,6 +206,10 @@ async def on_youtube_playlist_page(driver: Chrome) -> bool:
 
 async def monitor_video(driver: Chrome) -> None:
     notified = False
+    # Played songs are read once; the index then matches each next video in O(1)
+    played_songs = await load_songs_async(PLAYED_SONGS_FILE)
+    played_index = PlayedIndex(played_songs)
+    print(f"Loaded {len(played_songs)} played song(s)")
     while True:
         if not await on_youtube_playlist_page(driver):
             notified = False
@@ -224,16 +225,14 @@ async def monitor_video(driver: Chrome) -> None:
             )
             if duration - current_time <= 10 and not notified:
                 next_video = await extract_next_video(driver)
-                print("Evaluating next video", next_video['link'],"\n",next_video['title'])
                 if next_video:
-                    played_songs = await load_json_async(PLAYED_SONGS_FILE)
-                    print("loaded played_songs", played_songs)
-                    team, matched_song = await find_team_for_song(next_video['link'],  played_songs)
+                    print("Evaluating next video", next_video['link'],"\n",next_video['title'])
+                    team, matched_song = await find_team_for_song(next_video['link'], played_index)
 
                     if team:
                         message = f"🎤 Next team is #{team} → singing: {next_video['title']}"
                         played_songs.append(matched_song)
-                        await save_json_async(PLAYED_SONGS_FILE, played_songs)
+                        await save_songs_async(PLAYED_SONGS_FILE, played_songs)
                     else:
                         message = f"🎶 Next song: {next_video['title']} (No team matched)"
                     
@@ -0,0 +1,171 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, NamedTuple, Optional
+
+# Project‑wide logger helper
+from utils.logger import get_logger
+from utils.state_file import DebouncedSave, load_json
+
+logger = get_logger(__name__)
+
+# Discord snowflakes count milliseconds from 2015-01-01
+DISCORD_EPOCH_MS = 1420070400000
+
+
+class Snowflake(NamedTuple):
+    """Anything with an ``id`` can bound ``channel.history``."""
+
+    id: int
+
+
+def snowflake_at(timestamp: float) -> Snowflake:
+    """Smallest message ID Discord could assign at *timestamp* (epoch seconds)."""
+    return Snowflake((int(timestamp * 1000) - DISCORD_EPOCH_MS) << 22)
+
+
+@dataclass(slots=True)
+class BackfillResult:
+    channels: int = 0
+    done: int = 0
+    failed: int = 0
+    messages: int = 0
+    staged: int = 0
+
+
+class HistoryBackfill:
+    """Stages the songs posted in team channels while the bot was offline.
+
+    ``run`` walks the history of the given channels concurrently (at most
+    ``concurrency`` channels at a time; discord.py waits out the per-route
+    rate limits itself), oldest message first, from each channel's
+    high-water mark up to the moment the walk started, so it never overlaps
+    with the live ``on_message`` handling.
+
+    A channel without a mark is not walked from its beginning: its history
+    may hold requests from past events that were already played. If an
+    earlier walk went through (``checked``, where it stopped), only messages
+    newer than that are read, at most the last ``first_run_limit`` (0: none);
+    on the very first run nothing is. Either way the channel is then marked
+    where this walk stopped.
+
+    The mark of a channel is the newest message handled in it, by the walk
+    or live (``advance``); marks are written to *path* after every walk,
+    a few seconds (``save_delay``) after they move, off the event loop, and
+    on shutdown (``close``).
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = "state/backfill_marks.json",
+        concurrency: int = 5,
+        first_run_limit: int = 200,
+        clock: Callable[[], float] = time.time,
+        save_delay: float = 5.0,
+    ) -> None:
+        self.path = Path(path) if path else None
+        self.concurrency = concurrency
+        self.first_run_limit = first_run_limit
+        self._clock = clock
+        self.marks: Dict[int, int] = {}             # channel ID ➜ newest handled message ID
+        self.checked: Optional[int] = None          # where the last walk without failures stopped
+        self._saver = DebouncedSave(self.path, self._snapshot, delay=save_delay) if self.path else None
+        self._load()
+
+    def advance(self, channel_id: int, message_id: int) -> None:
+        """*message_id* of *channel_id* has been handled."""
+        if message_id > self.marks.get(channel_id, 0):
+            self.marks[channel_id] = message_id
+            self.save()
+
+    async def run(
+        self,
+        channels: Iterable[Any],
+        stage: Callable[[Any], Awaitable[bool]],
+        progress: Optional[Callable[[BackfillResult], Awaitable[None]]] = None,
+    ) -> BackfillResult:
+        """Walk the history of *channels* and hand each message to *stage*.
+
+        Args:
+            channels: Text channels (anything with ``id``, ``name`` and ``history``).
+            stage: ``async stage(message) -> bool``; True if the message staged a song.
+            progress: Optional ``async progress(result)``, awaited whenever a channel is done.
+
+        Returns:
+            BackfillResult: Channels walked (and failed), messages read, songs staged.
+        """
+        channels = list(channels)
+        result = BackfillResult(channels=len(channels))
+        until = snowflake_at(self._clock())
+        # live messages move the marks on while we walk; start from where they were
+        marks = dict(self.marks)
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def walk(channel: Any) -> None:
+            async with semaphore:
+                try:
+                    async for message in self._history(channel, marks.get(channel.id), until):
+                        result.messages += 1
+                        if not message.author.bot and await stage(message):
+                            result.staged += 1
+                        self.advance(channel.id, message.id)
+                    # everything before the walk started is handled (or left alone) now
+                    self.advance(channel.id, until.id - 1)
+                except Exception as exc:
+                    result.failed += 1
+                    logger.error("Backfill of #%s failed: %s", channel.name, exc)
+            result.done += 1
+            if progress is not None:
+                await progress(result)
+
+        await asyncio.gather(*(walk(channel) for channel in channels))
+        if not result.failed:
+            self.checked = until.id - 1
+        self.save()
+        await self.close()
+        logger.info("Backfill: %d channel(s) (%d failed), %d message(s) read, %d song(s) staged",
+                    result.channels, result.failed, result.messages, result.staged)
+        return result
+
+    async def _history(self, channel: Any, mark: Optional[int], until: Snowflake) -> AsyncIterator[Any]:
+        """Messages of *channel* after *mark* and before *until*, oldest first."""
+        if mark is not None:
+            async for message in channel.history(limit=None, after=Snowflake(mark), before=until, oldest_first=True):
+                yield message
+            return
+        if self.checked is None or not self.first_run_limit:
+            return
+        # a channel new since the last walk: the most recent messages it got since then only
+        recent = [message async for message in
+                  channel.history(limit=self.first_run_limit, after=Snowflake(self.checked), before=until,
+                                  oldest_first=False)]
+        for message in reversed(recent):
+            yield message
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def save(self) -> None:
+        """Write the marks to their file (atomically, within ``save_delay`` seconds when on the event loop)."""
+        if self._saver is not None:
+            self._saver.request()
+
+    async def close(self) -> None:
+        """Write the marks not saved yet."""
+        if self._saver is not None:
+            await self._saver.flush()
+
+    def _snapshot(self) -> Dict[str, Any]:
+        return {"checked": self.checked, "marks": {str(channel_id): mark for channel_id, mark in self.marks.items()}}
+
+    def _load(self) -> None:
+        stored = load_json(self.path, "Backfill marks")
+        if stored is None:
+            return
+        if "marks" not in stored:
+            # marks saved before "checked" existed: the last walk got at least as far as the newest one
+            stored = {"checked": max(stored.values(), default=None), "marks": stored}
+        self.marks = {int(channel_id): mark for channel_id, mark in stored["marks"].items()}
+        self.checked = stored.get("checked")
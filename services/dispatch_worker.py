@@ -0,0 +1,162 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from itertools import groupby
+from typing import Any, Awaitable, Callable, List, Optional, Sequence, Tuple, TypeVar
+
+from services.queue.song_entry import SongEntry
+from utils.rate_limit import TokenBucket
+
+# Project‑wide logger helper
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+# Called once per song with the API response, or with the exception that made it fail
+ResultCallback = Callable[[SongEntry, Any, Optional[BaseException]], Awaitable[None]]
+# Inserts several videos in one call; one (response, error) pair per video, in order
+BatchInsert = Callable[[Sequence[str]], List[Tuple[Any, Optional[BaseException]]]]
+
+
+class DispatchWorker:
+    """Async stage that sends dispatched songs to the YouTube playlist.
+
+    ``submit`` only queues the song; a background task takes songs in order,
+    waits for the rate limiter and runs the blocking Google client call
+    (*insert*, e.g. ``YouTubeService.add_video_to_playlist``) on a dedicated
+    executor, so the Discord event loop is never blocked by HTTP or pacing.
+
+    With *insert_many* (e.g. ``YouTubeService.add_videos_to_playlist``), the
+    songs already waiting when the worker picks up work (up to *batch_size*)
+    go out in one call, which counts as a single request for the limiter.
+
+    Retries (songs submitted with the time of their ``first_attempt``) go
+    through *reinsert* (e.g. ``YouTubeService.add_video_to_playlist_once``)
+    one at a time, so an earlier attempt that did reach the playlist is not
+    inserted twice. They share the queue, the thread and the limiter with
+    new songs.
+
+    The executor has a single thread: the playlist must receive songs in
+    dispatch order, and the Google API client is not thread-safe. Other calls
+    on the same client (see :meth:`call`) go through that thread too.
+    """
+
+    def __init__(
+        self,
+        insert: Callable[[str], Any],
+        limiter: Optional[TokenBucket] = None,
+        on_result: Optional[ResultCallback] = None,
+        insert_many: Optional[BatchInsert] = None,
+        batch_size: int = 50,
+        reinsert: Optional[Callable[[str, float], Any]] = None,
+    ) -> None:
+        self.insert = insert
+        self.reinsert = reinsert
+        self.limiter = limiter
+        self.on_result = on_result
+        self.insert_many = insert_many
+        self.batch_size = batch_size if insert_many else 1
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="youtube-dispatch")
+        self._pending: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    # ------------------------------------------------------------------
+
+    def start(self) -> None:
+        """Start the background task (must be called from the event loop)."""
+        if self._task is not None:
+            return
+        self._pending = asyncio.Queue()
+        self._task = asyncio.get_running_loop().create_task(self._run(), name="youtube-dispatch")
+
+    async def stop(self, timeout: Optional[float] = 30) -> None:
+        """Let queued songs go out (up to *timeout* seconds), then stop."""
+        if self._task is None:
+            return
+        try:
+            await asyncio.wait_for(self._pending.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Dispatch worker stopped with %d song(s) not sent", self._pending.qsize())
+        self._task.cancel()
+        self._task = None
+        self._executor.shutdown(wait=False)
+
+    def submit(self, song: SongEntry, first_attempt: Optional[float] = None) -> None:
+        """Queue *song* for the playlist; returns immediately.
+
+        *first_attempt* (epoch seconds) marks a retry of an earlier insert.
+        """
+        self._pending.put_nowait((song, first_attempt))
+
+    def pending(self) -> int:
+        """Number of songs waiting to be sent."""
+        return self._pending.qsize() if self._pending is not None else 0
+
+    async def call(self, func: Callable[..., T], *args: Any) -> T:
+        """Run another blocking client call on the worker's thread."""
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    # ------------------------------------------------------------------
+
+    async def _run(self) -> None:
+        while True:
+            items = [await self._pending.get()]
+            while len(items) < self.batch_size and not self._pending.empty():
+                items.append(self._pending.get_nowait())
+            songs = [song for song, _ in items]
+            try:
+                results = await self._send(items)
+                for song, (response, error) in zip(songs, results):
+                    await self._report(song, response, error)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.error("Dispatch worker failed on %s: %s", songs, exc)
+            finally:
+                for _ in items:
+                    self._pending.task_done()
+
+    async def _report(self, song: SongEntry, response: Any, error: Optional[BaseException]) -> None:
+        """Hand one song's result to ``on_result``; a failing callback does not stop the others."""
+        if self.on_result is None:
+            if error is not None:
+                logger.error("Could not add %s to the playlist: %s", song.video_id, error)
+            return
+        try:
+            await self.on_result(song, response, error)
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            logger.error("Result callback failed for %s: %s", song.video_id, exc)
+
+    async def _send(self, items: List[Tuple[SongEntry, Optional[float]]]) -> List[Tuple[Any, Optional[BaseException]]]:
+        """Send the items in order: runs of new songs batched, retries one by one."""
+        results: List[Tuple[Any, Optional[BaseException]]] = []
+        for is_retry, group in groupby(items, key=lambda item: item[1] is not None):
+            if not is_retry:
+                results.extend(await self._send_fresh([song for song, _ in group]))
+                continue
+            for song, first_attempt in group:
+                results.append(await self._send_retry(song, first_attempt))
+        return results
+
+    async def _send_retry(self, song: SongEntry, first_attempt: float) -> Tuple[Any, Optional[BaseException]]:
+        if self.limiter is not None:
+            await self.limiter.acquire()
+        try:
+            if self.reinsert is not None:
+                return await self.call(self.reinsert, song.video_id, first_attempt), None
+            return await self.call(self.insert, song.video_id), None
+        except Exception as exc:
+            return None, exc
+
+    async def _send_fresh(self, songs: List[SongEntry]) -> List[Tuple[Any, Optional[BaseException]]]:
+        if self.limiter is not None:
+            await self.limiter.acquire()
+        try:
+            if len(songs) > 1:
+                return await self.call(self.insert_many, [song.video_id for song in songs])
+            return [(await self.call(self.insert, songs[0].video_id), None)]
+        except Exception as exc:
+            return [(None, exc)] * len(songs)
@@ -0,0 +1,244 @@
+import json
+import os
+import queue as thread_queue
+import threading
+from pathlib import Path
+from typing import Iterable, List, Optional, Set, Tuple
+
+from services.queue.song_entry import SongEntry, decode_songs
+
+# Project‑wide logger helper
+from utils.logger import get_logger
+from utils.state_file import write_atomic
+
+logger = get_logger(__name__)
+
+_STOP = object()
+_COMPACT = object()
+
+# Identity of a ledger record; a record seen twice (e.g. re-written after a crash) counts once
+LedgerKey = Tuple[str, str, int]
+
+
+def _key(song: SongEntry) -> LedgerKey:
+    return song.team, song.video_id, song.timestamp
+
+
+def _encode(song: SongEntry) -> str:
+    return json.dumps(song.to_dict(), ensure_ascii=False, separators=(",", ":"))
+
+
+class SongLedger:
+    """Append-only JSON-lines log of the dispatched songs.
+
+    ``append`` hands the songs to a writer thread, which writes one line per
+    song and fsyncs once per batch, so a dispatch cycle costs O(songs
+    dispatched) whatever the size of the history, and never blocks the event
+    loop.
+
+    Lines that readers skip (a torn last line after a crash, a song written
+    twice) are counted; once ``compact_after`` of them pile up, or at start-up
+    after a crash, the writer rewrites the file without them and atomically
+    swaps it in. Readers (:class:`LedgerReader`) notice the swap and keep their
+    positions, because compaction only drops records they never counted.
+
+    On first use, the entries of the old ``dispatched_songs.json`` (*legacy_path*)
+    are copied into the ledger.
+    """
+
+    def __init__(
+        self,
+        path: str = "dispatched_songs.jsonl",
+        legacy_path: Optional[str] = "dispatched_songs.json",
+        fsync: bool = True,
+        compact_after: int = 1000,
+    ) -> None:
+        self.path = Path(path)
+        self.fsync = fsync
+        self.compact_after = compact_after
+
+        self._keys: Set[LedgerKey] = set()
+        self._garbage = 0
+        self._writes: "thread_queue.SimpleQueue[object]" = thread_queue.SimpleQueue()
+
+        if not self.path.exists() and legacy_path and Path(legacy_path).exists():
+            self._migrate(Path(legacy_path))
+        self._scan()
+        if self._garbage:
+            # e.g. a torn last line: clean up before anything is appended after it
+            self._compact()
+        self._thread: Optional[threading.Thread] = threading.Thread(
+            target=self._writer, name="song-ledger", daemon=True
+        )
+        self._thread.start()
+
+    # ------------------------------------------------------------------
+
+    def append(self, songs: Iterable[SongEntry]) -> None:
+        """Queue *songs* to be appended (non-blocking)."""
+        for song in songs:
+            self._writes.put(song)
+
+    def compact(self) -> None:
+        """Ask the writer to rewrite the file without skipped lines."""
+        self._writes.put(_COMPACT)
+
+    def close(self) -> None:
+        """Write what is queued and stop the writer thread."""
+        if self._thread is None:
+            return
+        self._writes.put(_STOP)
+        self._thread.join()
+        self._thread = None
+
+    # ------------------------------------------------------------------
+
+    def _migrate(self, legacy_path: Path) -> None:
+        try:
+            songs = decode_songs(legacy_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError, KeyError) as exc:
+            logger.error("Could not migrate %s to %s: %s", legacy_path, self.path, exc)
+            return
+        self._rewrite(songs)
+        logger.info("Migrated %d dispatched song(s) from %s to %s", len(songs), legacy_path, self.path)
+
+    def _scan(self) -> None:
+        """Load the keys of the existing records and count the lines readers skip."""
+        if not self.path.exists():
+            return
+        with self.path.open("r", encoding="utf-8") as fh:
+            for song in _parse_lines(fh, self._keys):
+                if song is None:
+                    self._garbage += 1
+        with self.path.open("rb") as fh:
+            size = fh.seek(0, os.SEEK_END)
+            if size:
+                fh.seek(size - 1)
+                if fh.read(1) != b"\n":
+                    # the last write was cut short; the next append would be glued to it
+                    self._garbage = max(self._garbage, 1)
+        if self._garbage:
+            logger.warning("Dispatched songs ledger %s has %d unreadable or repeated line(s)",
+                           self.path, self._garbage)
+
+    def _rewrite(self, songs: Iterable[SongEntry]) -> None:
+        def write(fh) -> None:
+            seen: Set[LedgerKey] = set()
+            for song in songs:
+                if _key(song) in seen:
+                    continue
+                seen.add(_key(song))
+                fh.write(_encode(song))
+                fh.write("\n")
+
+        write_atomic(self.path, write, self.fsync)
+
+    def _compact(self) -> None:
+        """Rewrite the file from its readable records (the writer's handle must be closed)."""
+        with self.path.open("r", encoding="utf-8") as fh:
+            songs = [song for song in _parse_lines(fh, set()) if song is not None]
+        self._rewrite(songs)
+        logger.info("Compacted %s: %d record(s), %d line(s) dropped", self.path, len(songs), self._garbage)
+        self._garbage = 0
+
+    def _writer(self) -> None:
+        ledger = self.path.open("a", encoding="utf-8")
+        try:
+            while True:
+                batch = [self._writes.get()]
+                while True:
+                    try:
+                        batch.append(self._writes.get_nowait())
+                    except thread_queue.Empty:
+                        break
+
+                stop = compact = False
+                for item in batch:
+                    if item is _STOP:
+                        stop = True
+                    elif item is _COMPACT:
+                        compact = True
+                    else:
+                        if _key(item) in self._keys:
+                            self._garbage += 1
+                        self._keys.add(_key(item))
+                        ledger.write(_encode(item))
+                        ledger.write("\n")
+                ledger.flush()
+                if self.fsync:
+                    os.fsync(ledger.fileno())
+                if compact or self._garbage >= self.compact_after:
+                    ledger.close()
+                    self._compact()
+                    ledger = self.path.open("a", encoding="utf-8")
+                if stop:
+                    return
+        except Exception as exc:
+            logger.error("Dispatched songs ledger writer stopped: %s", exc)
+        finally:
+            ledger.close()
+
+
+class LedgerReader:
+    """Incremental reader of a :class:`SongLedger` file.
+
+    ``refresh`` only reads the bytes appended since the previous call (a
+    partial last line is left for the next one). ``songs`` holds every record
+    read so far in ledger order, so ``songs[n:]`` is what a client that has
+    already seen *n* songs is missing. If the file is compacted or replaced,
+    it is read again from the start, skipping records already known, so
+    those positions stay valid.
+    """
+
+    def __init__(self, path: str = "dispatched_songs.jsonl") -> None:
+        self.path = Path(path)
+        self.songs: List[SongEntry] = []
+        self._keys: Set[LedgerKey] = set()
+        self._file_id: Optional[Tuple[int, int]] = None
+        self._offset = 0
+
+    def refresh(self) -> int:
+        """Read what was appended since the last call; returns the number of new songs."""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return 0
+        file_id = (stat.st_dev, stat.st_ino)
+        if file_id != self._file_id or stat.st_size < self._offset:
+            self._file_id, self._offset = file_id, 0
+        if stat.st_size == self._offset:
+            return 0
+
+        with self.path.open("rb") as fh:
+            fh.seek(self._offset)
+            data = fh.read()
+        complete = data.rfind(b"\n") + 1
+        self._offset += complete
+
+        before = len(self.songs)
+        lines = data[:complete].decode("utf-8").splitlines()
+        self.songs.extend(song for song in _parse_lines(lines, self._keys) if song is not None)
+        return len(self.songs) - before
+
+    def since(self, position: int) -> List[SongEntry]:
+        """Songs after the first *position* ones (refreshing first)."""
+        self.refresh()
+        return self.songs[position:]
+
+
+def _parse_lines(lines: Iterable[str], keys: Set[LedgerKey]) -> Iterable[Optional[SongEntry]]:
+    """Parse ledger lines; yields ``None`` for each unreadable or repeated record (and adds new keys to *keys*)."""
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            song = SongEntry.from_dict(json.loads(line))
+        except (ValueError, KeyError, TypeError):
+            yield None
+            continue
+        key = _key(song)
+        if key in keys:
+            yield None
+            continue
+        keys.add(key)
+        yield song
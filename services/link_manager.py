@@ -1,11 +1,14 @@
-import re
+from services.video_id import extract_video_ids
 
 class LinkManager:
-    YOUTUBE_REGEX = r'(https?://(?:www\.)?youtube\.com/watch\?v=[\w-]+|https?://youtu\.be/[\w-]+)'
-
     def validate_message(self, message_content):
-        links = re.findall(self.YOUTUBE_REGEX, message_content)
-        if len(links) == 1:
-            return True, links[0]
+        """
+        Returns (True, video_id) when the message holds exactly one YouTube link
+        (any form, see services.video_id.VIDEO_URL_REGEX), where video_id is the
+        canonical (interned) ID shared by every URL form of the same video, and
+        (False, None) otherwise.
+        """
+        video_ids = extract_video_ids(message_content)
+        if len(video_ids) == 1:
+            return True, video_ids[0]
         return False, None
-    
\ No newline at end of file
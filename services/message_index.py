@@ -0,0 +1,96 @@
+import sys
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, List, NamedTuple, Optional
+
+# Project‑wide logger helper
+from utils.logger import get_logger
+from utils.state_file import DebouncedSave, load_json
+
+logger = get_logger(__name__)
+
+
+class IndexedSong(NamedTuple):
+    """The song a team-channel message staged."""
+
+    team: str
+    video_id: str
+    author_id: int
+
+
+class MessageIndex:
+    """Bounded map from Discord message ID to the song that message staged.
+
+    Lets the raw delete/edit events (which only carry message IDs) find the
+    song to un-stage or replace without discord.py's message cache. Once
+    ``max_entries`` messages are indexed the oldest is evicted; by then its
+    song has long been dispatched, so a late delete could not un-stage it
+    anyway. Team names and video IDs are the interned strings the queue
+    already holds, so an entry costs little more than its tuple.
+
+    The index is written to *path* a few seconds (``save_delay``) after it
+    changes, off the event loop, and read back on start, so deletes and
+    edits of songs posted before a restart (or a crash) still work.
+    """
+
+    def __init__(self, max_entries: int = 20_000, path: Optional[str] = None, save_delay: float = 5.0) -> None:
+        self.max_entries = max_entries
+        self.path = Path(path) if path else None
+        self._songs: "OrderedDict[int, IndexedSong]" = OrderedDict()
+        self._saver = DebouncedSave(self.path, self._snapshot, delay=save_delay) if self.path else None
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self._songs)
+
+    def __contains__(self, message_id: int) -> bool:
+        return message_id in self._songs
+
+    def add(self, message_id: int, team: str, video_id: str, author_id: int) -> None:
+        """Remember that *message_id* staged *video_id* for *team*."""
+        self._songs[message_id] = IndexedSong(team, video_id, author_id)
+        self._songs.move_to_end(message_id)
+        while len(self._songs) > self.max_entries:
+            self._songs.popitem(last=False)
+        self.save()
+
+    def get(self, message_id: int) -> Optional[IndexedSong]:
+        return self._songs.get(message_id)
+
+    def pop(self, message_id: int) -> Optional[IndexedSong]:
+        song = self._songs.pop(message_id, None)
+        if song is not None:
+            self.save()
+        return song
+
+    def replace(self, message_id: int, video_id: str) -> None:
+        """The message now stages *video_id* (after an edit)."""
+        song = self._songs.get(message_id)
+        if song is not None:
+            self._songs[message_id] = song._replace(video_id=video_id)
+            self.save()
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def save(self) -> None:
+        """Write the index to its file (atomically, within ``save_delay`` seconds when on the event loop)."""
+        if self._saver is not None:
+            self._saver.request()
+
+    async def close(self) -> None:
+        """Write the changes not saved yet."""
+        if self._saver is not None:
+            await self._saver.flush()
+
+    def _snapshot(self) -> List[List[Any]]:
+        return [[message_id, *song] for message_id, song in self._songs.items()]
+
+    def _load(self) -> None:
+        stored = load_json(self.path, "Message index")
+        if stored is None:
+            return
+        for message_id, team, video_id, author_id in stored[-self.max_entries:]:
+            self._songs[message_id] = IndexedSong(sys.intern(team), sys.intern(video_id), author_id)
+        logger.info("Message index: %d team-channel message(s) restored", len(self._songs))
@@ -0,0 +1,175 @@
+import re
+import unicodedata
+from typing import Any, Dict, List, Optional, Tuple
+
+# Template fields: (field, emoji, words that identify the label without its emoji)
+TEMPLATE_FIELDS: List[Tuple[str, str, Tuple[str, ...]]] = [
+    ("name", "👤", ("nombre", "nickname", "nick")),
+    ("city", "🌍", ("ciudad", "pais")),
+    ("age", "🎂", ("edad",)),
+    ("finding_us", "🔎", ("como conociste", "como nos conociste")),
+    ("interest", "🎮", ("juegos favoritos", "actividades de interes", "aficiones")),
+    ("job", "💼", ("ocupacion",)),
+    ("platform", "🕹", ("plataformas",)),
+    ("anime", "📺", ("anime", "manga")),
+    ("additional", "✨", ("algo mas",)),
+]
+REQUIRED_FIELDS = ("name", "age", "finding_us", "interest")
+FIELD_NAMES_ES = {"name": "nombre", "age": "edad", "finding_us": "cómo nos conociste", "interest": "intereses"}
+
+# Labels recognised before a message counts as following the template
+MIN_TEMPLATE_LABELS = 3
+ADULT_AGE = 18
+OLDEST_AGE = 99
+
+_AGE_REGEX = re.compile(r"\b(\d{1,3})\b")
+# "Algo: valor", "Algo - valor"
+_SEPARATOR_REGEX = re.compile(r"[:：\-–—]")
+
+
+def _plain(text: str) -> str:
+    """Lower-cased *text* without accents or emoji variation selectors."""
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(char for char in decomposed if not unicodedata.combining(char) and char != "️")
+
+
+class PresentationParser:
+    """
+    Local first pass over presentations written with the community template.
+
+    Each line that starts with one of the template's labels (its emoji, or
+    the label words without it) fills that field; lines without a label
+    continue the previous field. When enough labels are found to be sure
+    the template was used, the decision is taken here, in microseconds:
+
+    * all of ``name``, ``age``, ``finding_us`` and ``interest`` filled in and
+      an adult age → valid;
+    * a required field empty or missing, or an age under 18 → not valid,
+      saying what is missing.
+
+    Anything else (free-form text, a label without ":", an age written in
+    words or as a year of birth...) is left to the LLM: ``parse`` returns
+    ``None``.
+    """
+
+    def __init__(
+        self,
+        starting_role: str = "Kai Timido Aprendiz",
+        hidden_role: str = "Kai Oculto",
+        community: str = "BcnNoKai",
+        hidden_channel: str = "jungla",
+    ) -> None:
+        self.starting_role = starting_role
+        self.hidden_role = hidden_role
+        self.community = community
+        self.hidden_channel = hidden_channel
+        self.resolved = 0
+        self.escalated = 0
+
+    def parse(self, text: str) -> Optional[Dict[str, Any]]:
+        """
+        Decide *text* locally if it clearly follows the template.
+
+        Args:
+            text (str): The presentation message.
+
+        Returns:
+            dict: The ``ValidationFormat`` fields (``is_valid``, ``output_message``
+            and the extracted data), or None if the LLM has to decide.
+        """
+        fields, labels = self._fields(text)
+        result = self._decide(fields) if fields is not None and labels >= MIN_TEMPLATE_LABELS else None
+        if result is None:
+            self.escalated += 1
+        else:
+            self.resolved += 1
+        return result
+
+    def describe(self) -> str:
+        """Human-readable summary, e.g. for an admin command."""
+        total = self.resolved + self.escalated
+        share = f"{self.resolved / total:.0%}" if total else "n/a"
+        return f"{self.resolved} presentation(s) decided locally, {self.escalated} sent to the LLM ({share} local)"
+
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _label(line: str) -> Optional[Tuple[str, Optional[str]]]:
+        """(field, value) if *line* starts with a template label; the value is None without a separator."""
+        stripped = line.strip()
+        plain = _plain(stripped)
+        for field, emoji, words in TEMPLATE_FIELDS:
+            if stripped.startswith(emoji):
+                return field, _value(stripped[len(emoji):])
+            for word in words:
+                # "Nombre: Ana", "¿Cómo conociste BCNNokai?: ...", "- Edad 27"
+                position = plain.find(word)
+                if position != -1 and not _plain_has_text(plain[:position]):
+                    return field, _value(stripped)
+        return None
+
+    def _fields(self, text: str) -> Tuple[Optional[Dict[str, str]], int]:
+        """The template fields found in *text* (None if a label could not be split) and how many."""
+        fields: Dict[str, str] = {}
+        labels = 0
+        current: Optional[str] = None
+        for line in text.splitlines():
+            if not line.strip():
+                continue
+            labelled = self._label(line)
+            if labelled is not None:
+                current, value = labelled
+                if value is None:
+                    return None, labels
+                labels += current not in fields
+                fields[current] = value
+            elif current is not None:
+                fields[current] = f"{fields[current]} {line.strip()}".strip()
+        return fields, labels
+
+    def _decide(self, fields: Dict[str, str]) -> Optional[Dict[str, Any]]:
+        age: Optional[int] = None
+        if fields.get("age"):
+            match = _AGE_REGEX.search(fields["age"])
+            if match is None:
+                return None                     # "veintisiete", "treintaytantos": let the LLM read it
+            age = int(match.group(1))
+            if age > OLDEST_AGE:
+                return None
+
+        result: Dict[str, Any] = {field: fields.get(field) or None for field, _, _ in TEMPLATE_FIELDS}
+        result["age"] = age
+        missing = [field for field in REQUIRED_FIELDS if not result[field]]
+        if missing:
+            result["is_valid"] = False
+            result["output_message"] = (
+                f"¡Gracias por presentarte! Aún falta: {', '.join(FIELD_NAMES_ES[field] for field in missing)}. "
+                f"Mientras tanto sigues como {self.hidden_role} y solo puedes usar el canal {self.hidden_channel}; "
+                f"completa la plantilla y vuelve a enviarla."
+            )
+        elif age < ADULT_AGE:
+            result["is_valid"] = False
+            result["output_message"] = (
+                f"¡Gracias por presentarte! La comunidad es solo para mayores de edad, "
+                f"así que sigues como {self.hidden_role}."
+            )
+        else:
+            result["is_valid"] = True
+            result["output_message"] = (
+                f"¡Bienvenido/a a {self.community}, {result['name']}! Ya puedes usar los canales de voz y texto "
+                f"con el rol de {self.starting_role}."
+            )
+        return result
+
+
+def _value(labelled: str) -> Optional[str]:
+    """The value after a label: what follows its first separator (None if there is none)."""
+    match = _SEPARATOR_REGEX.search(labelled)
+    if match is None:
+        return None
+    return labelled[match.end():].strip(" \t*_~`")
+
+
+def _plain_has_text(prefix: str) -> bool:
+    """Whether *prefix* (what comes before a label word) holds letters or digits."""
+    return any(char.isalnum() for char in prefix)
@@ -0,0 +1,175 @@
+import base64
+import hashlib
+import math
+from collections import deque
+from typing import Any, Deque, Dict, Hashable, Iterator, Optional, Set, Tuple
+
+from services.video_id import pack_video_id, unpack_video_id
+
+# Project‑wide logger helper
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over (team, video_id) pairs."""
+
+    def __init__(self, capacity: int, error_rate: float = 0.001) -> None:
+        if capacity <= 0 or not 0 < error_rate < 1:
+            raise ValueError("Bloom filter needs a positive capacity and 0 < error_rate < 1")
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size_bits = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.size_bits + 7) // 8)
+
+    def _positions(self, team: str, video_id: str) -> Iterator[int]:
+        digest = hashlib.blake2b(f"{team}\0{video_id}".encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hashes):
+            yield (h1 + i * h2) % self.size_bits
+
+    def add(self, team: str, video_id: str) -> None:
+        for pos in self._positions(team, video_id):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, item: Tuple[str, str]) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(*item))
+
+
+class DispatchedGuard:
+    """Remembers which (team, video) pairs were already dispatched.
+
+    The exact tier is a single set holding one integer per entry: the team's
+    small index shifted above the 64-bit packed video ID (see
+    services.video_id). With ``recent_window`` set, only that many entries are
+    kept exactly (a deque remembers their order); older ones are evicted
+    oldest first into an optional Bloom filter tier (``bloom_capacity`` /
+    ``bloom_error_rate``), or forgotten if no Bloom tier is configured. A false
+    positive from the Bloom tier makes the bot reject a song as repeated,
+    never accept a repeated one.
+
+    ``reset`` clears everything and is what a new karaoke session uses.
+    """
+
+    def __init__(
+        self,
+        recent_window: Optional[int] = None,
+        bloom_capacity: int = 0,
+        bloom_error_rate: float = 0.001,
+    ) -> None:
+        self.recent_window = recent_window
+        self.bloom_capacity = bloom_capacity
+        self.bloom_error_rate = bloom_error_rate
+        self._teams: Dict[str, int] = {}
+        self._team_names: list[str] = []
+        self._recent: Set[Hashable] = set()
+        self._order: Optional[Deque[Hashable]] = deque() if recent_window else None
+        self._bloom: Optional[BloomFilter] = (
+            BloomFilter(bloom_capacity, bloom_error_rate) if bloom_capacity else None
+        )
+        self.evicted = 0
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]]) -> "DispatchedGuard":
+        """Build a guard from the ``queue.dispatched_guard`` section of config.yaml."""
+        config = config or {}
+        return cls(
+            recent_window=config.get("recent_window"),
+            bloom_capacity=config.get("bloom_capacity") or 0,
+            bloom_error_rate=config.get("bloom_error_rate") or 0.001,
+        )
+
+    # ------------------------------------------------------------------
+
+    def _key(self, team: str, video_id: str, create: bool = False) -> Optional[Hashable]:
+        team_index = self._teams.get(team)
+        if team_index is None:
+            if not create:
+                return None
+            team_index = self._teams[team] = len(self._team_names)
+            self._team_names.append(team)
+        try:
+            return (team_index << 64) | pack_video_id(video_id)
+        except (KeyError, IndexError, ValueError):
+            # Not a real video ID (e.g. test data): keep it exact as a tuple
+            return (team_index, video_id)
+
+    def _split(self, key: Hashable) -> Tuple[str, str]:
+        if isinstance(key, tuple):
+            return self._team_names[key[0]], key[1]
+        return self._team_names[key >> 64], unpack_video_id(key & 0xFFFFFFFFFFFFFFFF)
+
+    def add(self, team: str, video_id: str) -> None:
+        """Remember that *video_id* was dispatched for *team*."""
+        key = self._key(team, video_id, create=True)
+        if key in self._recent:
+            return
+        self._recent.add(key)
+        if self._order is None:
+            return
+        self._order.append(key)
+        if len(self._order) > self.recent_window:
+            oldest = self._order.popleft()
+            self._recent.discard(oldest)
+            self.evicted += 1
+            if self._bloom is not None:
+                self._bloom.add(*self._split(oldest))
+
+    def __contains__(self, item: Tuple[str, str]) -> bool:
+        team, video_id = item
+        key = self._key(team, video_id)
+        if key is not None and key in self._recent:
+            return True
+        return self._bloom is not None and item in self._bloom
+
+    def __len__(self) -> int:
+        """Number of entries held exactly."""
+        return len(self._recent)
+
+    def __iter__(self) -> Iterator[Tuple[str, str]]:
+        """(team, video_id) pairs held exactly (oldest first when windowed)."""
+        keys = self._recent if self._order is None else self._order
+        return (self._split(key) for key in keys)
+
+    def reset(self) -> None:
+        """Forget every dispatched song (start of a new session)."""
+        logger.info("Dispatched guard reset (%d exact entries dropped)", len(self._recent))
+        self._clear()
+
+    def _clear(self) -> None:
+        self._teams.clear()
+        self._team_names.clear()
+        self._recent.clear()
+        if self._order is not None:
+            self._order.clear()
+        self.evicted = 0
+        if self._bloom is not None:
+            self._bloom = BloomFilter(self.bloom_capacity, self.bloom_error_rate)
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def to_state(self) -> Dict[str, Any]:
+        """JSON-serialisable copy of the guard, for journal snapshots."""
+        state: Dict[str, Any] = {"recent": [list(pair) for pair in self], "evicted": self.evicted}
+        if self._bloom is not None:
+            state["bloom"] = base64.b64encode(self._bloom.bits).decode("ascii")
+        return state
+
+    def load_state(self, state: Dict[str, Any]) -> None:
+        """Restore a snapshot made by :meth:`to_state`."""
+        self._clear()
+        for team, video_id in state.get("recent") or []:
+            self.add(team, video_id)
+        self.evicted = state.get("evicted", 0)
+        bloom = state.get("bloom")
+        if bloom and self._bloom is not None:
+            bits = base64.b64decode(bloom)
+            if len(bits) == len(self._bloom.bits):
+                self._bloom.bits = bytearray(bits)
+            else:
+                logger.warning("Dispatched guard Bloom filter size changed; older entries forgotten")
@@ -20,13 +20,3 @@ def replace_song_in_team(self, team: str, old_link: str, new_link: str) -> bool:
                 song["link"] = new_link
                 return True
     return False
-
-# Track dispatched links to lock them
-def is_dispatched(self, link: str, team: str) -> bool:
-    return getattr(self, "_dispatched", {}).get((team, link), False)
-
-def mark_dispatched(self, link: str, team: str) -> None:
-    if not hasattr(self, "_dispatched"):
-        self._dispatched = {}
-    self._dispatched[(team, link)] = True
-
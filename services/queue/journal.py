@@ -0,0 +1,203 @@
+import json
+import os
+import queue as thread_queue
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Any, Optional, TYPE_CHECKING
+
+from services.queue.scheduling import make_policy
+from services.queue.song_entry import SongEntry, json_default
+
+# Project‑wide logger helper
+from utils.logger import get_logger
+from utils.state_file import load_json, save_json
+
+if TYPE_CHECKING:
+    from services.queue.queue_buffer import QueueBuffer
+    from services.queue.queue_manager import QueueManager
+
+logger = get_logger(__name__)
+
+_STOP = object()
+
+
+class QueueJournal:
+    """Write-ahead log and snapshots for the QueueBuffer/QueueManager state.
+
+    Every state change (staged add/delete/replace, buffer clear, enqueue,
+    dispatch, policy switch) is appended to ``queue.wal`` as one JSON line
+    ``[seq, op, *args]``. Every ``snapshot_every`` operations the full state is
+    written to ``queue.snapshot.json`` and the log is truncated, so recovery
+    loads the snapshot and only replays the tail.
+
+    :meth:`record` only hands the operation to a writer thread, which batches
+    the disk writes (and fsyncs them), so the event loop never waits on I/O.
+    """
+
+    WAL_FILE = "queue.wal"
+    SNAPSHOT_FILE = "queue.snapshot.json"
+
+    def __init__(self, directory: str = "state", snapshot_every: int = 2000, fsync: bool = True) -> None:
+        self.directory = Path(directory)
+        self.wal_path = self.directory / self.WAL_FILE
+        self.snapshot_path = self.directory / self.SNAPSHOT_FILE
+        self.snapshot_every = snapshot_every
+        self.fsync = fsync
+
+        self._seq = 0
+        self._since_snapshot = 0
+        self._buffer: Optional["QueueBuffer"] = None
+        self._queue: Optional["QueueManager"] = None
+        self._writes: "thread_queue.SimpleQueue[Any]" = thread_queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+
+    # ------------------------------------------------------------------
+    # Recovery
+    # ------------------------------------------------------------------
+
+    def recover(self, buffer: "QueueBuffer", queue: "QueueManager") -> int:
+        """Restore *buffer* and *queue* from disk, then start journaling them.
+
+        Returns the number of log operations replayed on top of the snapshot.
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        snapshot = load_json(self.snapshot_path, "Queue snapshot")
+        if snapshot is not None:
+            try:
+                buffer.load_state(snapshot["buffer"])
+                queue.load_state(snapshot["queue"])
+                self._seq = snapshot["seq"]
+            except (ValueError, KeyError) as exc:
+                logger.error("Queue snapshot %s incomplete, ignoring it: %s", self.snapshot_path, exc)
+
+        replayed = 0
+        if self.wal_path.exists():
+            with self.wal_path.open("r", encoding="utf-8") as fh:
+                for line in fh:
+                    try:
+                        seq, op, *args = json.loads(line)
+                    except ValueError:
+                        # A torn write can only be the last line
+                        logger.warning("Stopping queue log replay at a truncated record")
+                        break
+                    if seq <= self._seq:
+                        continue
+                    self._apply(buffer, queue, op, args)
+                    self._seq = seq
+                    replayed += 1
+
+        logger.info(
+            "Queue state recovered: %d staged, %d queued, %d log operation(s) replayed",
+            len(buffer), sum(len(q) for q in queue.queues.values()), replayed,
+        )
+
+        self._buffer, self._queue = buffer, queue
+        buffer.journal = queue.journal = self
+        self._thread = threading.Thread(target=self._writer, name="queue-journal", daemon=True)
+        self._thread.start()
+        # Start from a compact snapshot so the next recovery is fast too
+        if replayed:
+            self.checkpoint()
+        return replayed
+
+    @staticmethod
+    def _apply(buffer: "QueueBuffer", queue: "QueueManager", op: str, args: list) -> None:
+        if op == "add":
+            buffer.add_song(*args)
+        elif op == "delete":
+            buffer.delete_song(*args)
+        elif op == "replace":
+            buffer.replace_song(*args)
+        elif op == "clear":
+            buffer.clear()
+        elif op == "enqueue":
+            entry = SongEntry.from_dict(args[0])
+            queue.queues.setdefault(entry.team, deque()).append(entry)
+            queue.policy.activate(entry.team)
+        elif op == "get":
+            song = queue.policy.select(queue.queues)
+            if song is None or [song.team, song.video_id] != args:
+                logger.warning("Queue log replay diverged: expected %s, got %s", args, song)
+        elif op == "dispatched":
+            queue.mark_dispatched(args[1], args[0])
+        elif op == "reset_dispatched":
+            queue.dispatched.reset()
+        elif op == "policy":
+            queue.set_policy(make_policy(args[0]["scheduling"], args[0]))
+        else:
+            logger.warning("Unknown queue log operation '%s' skipped", op)
+
+    # ------------------------------------------------------------------
+    # Recording
+    # ------------------------------------------------------------------
+
+    def record(self, op: str, *args: Any) -> None:
+        """Append an operation to the log (non-blocking)."""
+        self._seq += 1
+        self._writes.put((self._seq, op, args))
+        self._since_snapshot += 1
+        if self._since_snapshot >= self.snapshot_every:
+            self.checkpoint()
+
+    def checkpoint(self) -> None:
+        """Snapshot the current state; the log is truncated once it is on disk."""
+        if self._buffer is None or self._queue is None:
+            return
+        state = {"seq": self._seq, "buffer": self._buffer.to_state(), "queue": self._queue.to_state()}
+        self._writes.put(state)
+        self._since_snapshot = 0
+
+    def close(self) -> None:
+        """Write a final snapshot and wait for the writer thread to finish."""
+        if self._thread is None:
+            return
+        self.checkpoint()
+        self._writes.put(_STOP)
+        self._thread.join()
+        self._thread = None
+
+    # ------------------------------------------------------------------
+    # Writer thread
+    # ------------------------------------------------------------------
+
+    def _writer(self) -> None:
+        wal = self.wal_path.open("a", encoding="utf-8")
+        try:
+            while True:
+                batch = [self._writes.get()]
+                while True:
+                    try:
+                        batch.append(self._writes.get_nowait())
+                    except thread_queue.Empty:
+                        break
+
+                stop = False
+                for item in batch:
+                    if item is _STOP:
+                        stop = True
+                    elif isinstance(item, dict):
+                        self._sync(wal)
+                        self._write_snapshot(item)
+                        wal.truncate(0)
+                    else:
+                        seq, op, args = item
+                        wal.write(json.dumps([seq, op, *args], ensure_ascii=False, separators=(",", ":"),
+                                             default=json_default))
+                        wal.write("\n")
+                self._sync(wal)
+                if stop:
+                    return
+        except Exception as exc:
+            logger.error("Queue journal writer stopped: %s", exc)
+        finally:
+            wal.close()
+
+    def _sync(self, wal) -> None:
+        wal.flush()
+        if self.fsync:
+            os.fsync(wal.fileno())
+
+    def _write_snapshot(self, state: dict) -> None:
+        save_json(self.snapshot_path, state, self.fsync, separators=(",", ":"), default=json_default)
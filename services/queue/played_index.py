@@ -0,0 +1,60 @@
+from collections import deque
+from typing import Deque, Dict, Iterable, Optional, Sequence, Set, Tuple
+
+from services.queue.song_entry import SongEntry
+
+# (team, video_id, timestamp): one dispatch of a song
+SongKey = Tuple[str, str, int]
+
+
+def song_key(song: SongEntry) -> SongKey:
+    return song.team, song.video_id, song.timestamp
+
+
+class PlayedIndex:
+    """Dispatched songs not played yet, by video ID, for the playlist player.
+
+    Each video ID maps to the FIFO of its unplayed dispatches (a video sent
+    by two teams plays twice, first for the team that sent it first), so
+    matching the next video in the playlist is a dict lookup and a
+    ``popleft`` instead of a scan of the whole dispatched list against the
+    whole played list. The set of played keys is only consulted while
+    indexing.
+
+    ``update`` is given the dispatched list as the player knows it (growing
+    by appends, see ``get_current_songs``) and indexes only the songs past
+    the ones it has already seen; a list shorter than that means a new
+    ledger, and the index is rebuilt from it.
+    """
+
+    def __init__(self, played: Iterable[SongEntry] = ()) -> None:
+        self._unplayed: Dict[str, Deque[SongEntry]] = {}
+        self._played: Set[SongKey] = {song_key(song) for song in played}
+        self.seen = 0       # dispatched songs indexed so far
+
+    def __len__(self) -> int:
+        return sum(len(queue) for queue in self._unplayed.values())
+
+    def update(self, dispatched: Sequence[SongEntry]) -> int:
+        """Index the dispatched songs not seen yet; returns how many were new."""
+        if len(dispatched) < self.seen:
+            self._unplayed.clear()
+            self.seen = 0
+        new = 0
+        for song in dispatched[self.seen:]:
+            if song_key(song) not in self._played:
+                self._unplayed.setdefault(song.video_id, deque()).append(song)
+                new += 1
+        self.seen = len(dispatched)
+        return new
+
+    def take(self, video_id: str) -> Optional[SongEntry]:
+        """The oldest unplayed dispatch of *video_id*, now marked played (None if there is none)."""
+        queue = self._unplayed.get(video_id)
+        if not queue:
+            return None
+        song = queue.popleft()
+        if not queue:
+            del self._unplayed[video_id]
+        self._played.add(song_key(song))
+        return song
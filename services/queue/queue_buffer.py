@@ -1,125 +1,181 @@
 # services/queue_buffer.py
 
-from datetime import datetime
-from typing import List, Dict, Any
+import heapq
+import time
+from itertools import count, repeat
+from typing import List, Dict, Any, Tuple, Iterator, Mapping, Optional, Set, TYPE_CHECKING
 from services.queue.queue_manager import QueueManager       # Our new live queue manager
+from services.queue.song_entry import SongEntry
+
+if TYPE_CHECKING:
+    from services.queue.journal import QueueJournal
 
 class QueueBuffer:
     """
-    A buffer layer that stages pending song operations in a single list.
+    A buffer layer that stages pending song operations.
     
     Each pending song is identified by a combination of a team (e.g., channel name)
-    and a song link. This buffer supports three operations:
+    and a canonical YouTube video ID (see services.video_id). This buffer supports
+    three operations:
       - add_song: Schedules a new song to be added.
       - delete_song: Removes a pending song.
-      - replace_song: Replaces a pending song's link.
+      - replace_song: Replaces a pending song's video.
+
+    Pending songs are kept per team in insertion-ordered dicts keyed by an
+    arrival sequence number, and a (team, video_id) index points at that sequence
+    number. Every staging operation is therefore a couple of dict operations,
+    no matter how many songs are waiting, while apply_to can still drain them
+    in the order they arrived.
     
     Each method returns a status object with:
       - "success": (bool) True if the operation was accepted.
       - "warning_type": (str) A code indicating the reason for rejection (empty string if successful).
     
     The apply_to method applies all pending songs to a live QueueManager,
-    dispatching up to 3 songs for further processing, and then clears the buffer.
+    dispatching up to `dispatch_number` songs for further processing, and then clears the buffer.
     """
 
     def __init__(self) -> None:
-        # List of pending song operations; each is a dict with "team" and "link".
-        self.pending: List[Dict[str, str]] = []
+        # Map «team» ➜ {arrival sequence number: video_id}, in arrival order.
+        self.pending: Dict[str, Dict[int, str]] = {}
+        # Map (team, video_id) ➜ arrival sequence number of the pending entry.
+        self._index: Dict[Tuple[str, str], int] = {}
+        self._sequence = count()
         self.dispatch_number = 3
+        # Write-ahead log of every staged operation (attached by QueueJournal.recover)
+        self.journal: Optional["QueueJournal"] = None
         
     def set_dispatch_number(self, _dispatch_number):
         if _dispatch_number > 0 :
            self.dispatch_number = _dispatch_number
-        
 
-    def add_song(self, team: str, link: str) -> Dict[str, Any]:
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def add_song(self, team: str, video_id: str) -> Dict[str, Any]:
         """
         Schedules a song to be added for the specified team.
         
         Args:
             team (str): The team (channel) identifier.
-            link (str): The YouTube link to be added.
+            video_id (str): The video ID to be added.
         
         Returns:
             dict: A status object with:
                   - "success" (bool): True if the song was successfully scheduled.
                   - "warning_type" (str): A code indicating the issue if not successful.
-                  In this case, "duplicate_song" indicates the same addition is already scheduled.
+                  In this case, "repeated_song" indicates the same addition is already scheduled.
         """
+        key = (team, video_id)
         # Check if the song is already pending.
-        for entry in self.pending:
-            if entry["team"] == team and entry["link"] == link:
-                return {"success": False, "warning_type": "repeated_song"}
-        self.pending.append({"team": team, "link": link})
+        if key in self._index:
+            return {"success": False, "warning_type": "repeated_song"}
+        seq = next(self._sequence)
+        self._index[key] = seq
+        self.pending.setdefault(team, {})[seq] = video_id
+        if self.journal:
+            self.journal.record("add", team, video_id)
         return {"success": True, "warning_type": ""}
 
-    def delete_song(self, team: str, link: str) -> Dict[str, Any]:
+    def delete_song(self, team: str, video_id: str) -> Dict[str, Any]:
         """
         Schedules deletion of a pending song.
         
-        This operation removes the song from the pending list if present.
+        This operation removes the song from the pending songs if present.
         
         Args:
             team (str): The team identifier.
-            link (str): The YouTube link to be deleted.
+            video_id (str): The video ID to be deleted.
         
         Returns:
-            dict: A status object. If the song is not found in the pending list,
-                  "warning_type" is set to "song_not_found".
+            dict: A status object. If the song is not pending anymore,
+                  "warning_type" is set to "delete_dispatched_song".
         """
-        for i, entry in enumerate(self.pending):
-            if entry["team"] == team and entry["link"] == link:
-                del self.pending[i]
-                return {"success": True, "warning_type": ""}
-        return {"success": False, "warning_type": "delete_dispatched_song"}
+        seq = self._index.pop((team, video_id), None)
+        if seq is None:
+            return {"success": False, "warning_type": "delete_dispatched_song"}
+        team_pending = self.pending[team]
+        del team_pending[seq]
+        if not team_pending:
+            del self.pending[team]
+        if self.journal:
+            self.journal.record("delete", team, video_id)
+        return {"success": True, "warning_type": ""}
 
-    def replace_song(self, team: str, old_link: str, new_link: str) -> Dict[str, Any]:
+    def replace_song(self, team: str, old_video_id: str, new_video_id: str) -> Dict[str, Any]:
         """
-        Schedules a replacement: changes an existing pending song's link to a new link.
+        Schedules a replacement: changes an existing pending song's video to a new one.
+        The song keeps its original arrival position.
         
         Args:
             team (str): The team identifier.
-            old_link (str): The YouTube link to be replaced.
-            new_link (str): The new YouTube link.
+            old_video_id (str): The video ID to be replaced.
+            new_video_id (str): The new video ID.
         
         Returns:
             dict: A status object. If the pending song is found, it is updated.
-                  If not found, "warning_type" is set to "song_not_found".
+                  If it is not pending anymore, "warning_type" is set to
+                  "edit_dispatched_song"; if the new video is already pending for
+                  the team, it is set to "repeated_song".
         """
-        for entry in self.pending:
-            if entry["team"] == team and entry["link"] == old_link:
-                entry["link"] = new_link
-                return {"success": True, "warning_type": ""}
-        return {"success": False, "warning_type": "edit_dispatched_song"}
+        old_key = (team, old_video_id)
+        if old_key not in self._index:
+            return {"success": False, "warning_type": "edit_dispatched_song"}
+        if old_video_id == new_video_id:
+            return {"success": True, "warning_type": ""}
+        new_key = (team, new_video_id)
+        if new_key in self._index:
+            return {"success": False, "warning_type": "repeated_song"}
+        seq = self._index.pop(old_key)
+        self._index[new_key] = seq
+        self.pending[team][seq] = new_video_id
+        if self.journal:
+            self.journal.record("replace", team, old_video_id, new_video_id)
+        return {"success": True, "warning_type": ""}
+
+    def pending_video_ids(self) -> Set[str]:
+        """Return the distinct video IDs currently waiting in the buffer."""
+        return {video_id for songs in self.pending.values() for video_id in songs.values()}
 
-    def apply_to(self, queue: QueueManager) -> List[dict]:
+    def _in_arrival_order(self) -> Iterator[Tuple[int, str, str]]:
+        """Yield (sequence, team, video_id) for every pending song, oldest first."""
+        # Each team's dict is already sorted by sequence number.
+        return heapq.merge(*(
+            zip(songs.keys(), repeat(team), songs.values())
+            for team, songs in self.pending.items()
+        ))
+
+    def apply_to(self, queue: QueueManager, durations: Optional[Mapping[str, float]] = None) -> List[SongEntry]:
         """
-        Applies all pending song additions to the live queue, then dispatches up to 3 songs.
+        Applies all pending song additions to the live queue, then dispatches up to
+        `dispatch_number` songs.
         
         The live queue (an instance of QueueManager) is expected to handle the round-robin 
         organization, dispatch operations, and marking of dispatched songs.
         
         Process:
-          1. For each pending song, if it isn't already present in the live queue, add it.
-          2. Dispatch up to 3 songs from the live queue.
-          3. Clear the pending list.
+          1. Add every pending song to the live queue, in arrival order.
+          2. Dispatch up to `dispatch_number` songs from the live queue.
+          3. Clear the pending songs.
         
         Args:
             queue: The live QueueManager instance.
+            durations: Optional song durations in seconds, keyed by video ID, for
+                       duration-aware scheduling policies.
         
         Returns:
-            List[dict]: A list of song entries that were dispatched.
+            List[SongEntry]: A list of song entries that were dispatched.
         """
-        dispatched_songs: List[dict] = []
+        dispatched_songs: List[SongEntry] = []
 
-        # Add each pending song to the live queue (if not already added).
-        for entry in self.pending:
-            team = entry["team"]
-            link = entry["link"]
-            print("Adding the song to the queue: ", team, link)
-            queue.add_link(link=link, team=team, timestamp=datetime.utcnow())
+        # Add each pending song to the live queue.
+        now = int(time.time())
+        durations = durations or {}
+        for _, team, video_id in self._in_arrival_order():
+            print("Adding the song to the queue: ", team, video_id)
+            queue.add_link(video_id=video_id, team=team, timestamp=now, duration=durations.get(video_id))
 
-        # Dispatch up to 3 songs from the live queue.
+        # Dispatch up to `dispatch_number` songs from the live queue.
         print("\n!------------------------------------!\nTrying to dispatch ", self.dispatch_number, "songs")
         number_of_real_dispatched = 0
         for _ in range(self.dispatch_number):
@@ -127,8 +183,8 @@ class QueueBuffer:
             print("I will try to dispatch following song: ", song)
             if song:
                 dispatched_songs.append(song)
-                queue.mark_dispatched(song["link"], song["team"])
-                print("\t Dispatched: ", song["link"], song["team"])
+                queue.mark_dispatched(song.video_id, song.team)
+                print("\t Dispatched: ", song.video_id, song.team)
                 number_of_real_dispatched+=1
             else:
                 break
@@ -138,6 +194,24 @@ class QueueBuffer:
         print("Dispatch Finished\nx------------------------------------x\n")
 
         # Clear the buffer after applying operations.
-        self.pending.clear()
+        self.clear()
 
         return dispatched_songs
+
+    def clear(self) -> None:
+        """Drop every pending song."""
+        self.pending.clear()
+        self._index.clear()
+        if self.journal:
+            self.journal.record("clear")
+
+    def to_state(self) -> Dict[str, Any]:
+        """JSON-serialisable copy of the pending songs, for journal snapshots."""
+        return {"pending": [[team, video_id] for _, team, video_id in self._in_arrival_order()]}
+
+    def load_state(self, state: Dict[str, Any]) -> None:
+        """Replace the pending songs with a snapshot made by :meth:`to_state`."""
+        self.pending.clear()
+        self._index.clear()
+        for team, video_id in state.get("pending") or []:
+            self.add_song(team, video_id)
@@ -1,6 +1,14 @@
+import logging
+import time
 from collections import deque
-from datetime import datetime
-from typing import Optional, Dict, Deque
+from typing import Any, Optional, Dict, Deque, TYPE_CHECKING
+
+from services.queue.dispatched_guard import DispatchedGuard
+from services.queue.scheduling import SchedulingPolicy, RoundRobinPolicy, make_policy
+from services.queue.song_entry import SongEntry
+
+if TYPE_CHECKING:
+    from services.queue.journal import QueueJournal
 
 # Project‑wide logger helper
 from utils.logger import get_logger
@@ -9,21 +17,51 @@ logger = get_logger(__name__)
 
 
 class QueueManager:
-    """Round‑robin song queue organised per Discord team/channel."""
+    """Song queue organised per Discord team/channel.
+
+    Which team sings next is decided by a pluggable :class:`SchedulingPolicy`
+    (round robin by default). The policy keeps the rotation as a deque plus a
+    set mirroring its membership, so ``add_link`` and ``get_link`` are O(1)
+    (amortised) regardless of the number of teams.
+    """
 
     # ------------------------------------------------------------------
     # Construction
     # ------------------------------------------------------------------
 
-    def __init__(self) -> None:
-        # Map «team» ➜ deque([song‑entry, …])
-        self.queues: Dict[str, Deque[dict]] = {}
-        # Ordered list of teams that currently have at least one pending song
-        self.team_order: Deque[str] = deque()
-        # Set of (team, link) tuples already dispatched (immutability guard)
-        self._dispatched: set[tuple[str, str]] = set()
-
-        logger.info("QueueManager initialised")
+    def __init__(
+        self,
+        policy: Optional[SchedulingPolicy] = None,
+        dispatched: Optional[DispatchedGuard] = None,
+    ) -> None:
+        # Map «team» ➜ deque([SongEntry, …])
+        self.queues: Dict[str, Deque[SongEntry]] = {}
+        # Decides the dispatch order between teams
+        self.policy: SchedulingPolicy = policy or RoundRobinPolicy()
+        # (team, video_id) pairs already dispatched (immutability guard)
+        self.dispatched: DispatchedGuard = dispatched or DispatchedGuard()
+        # Write-ahead log of every state change (attached by QueueJournal.recover)
+        self.journal: Optional["QueueJournal"] = None
+
+        logger.info("QueueManager initialised with '%s' scheduling", self.policy.name)
+
+    @property
+    def team_order(self) -> Deque[str]:
+        """Teams currently in the rotation, next one first."""
+        return self.policy.team_order
+
+    def set_policy(self, policy: SchedulingPolicy) -> None:
+        """Switch scheduling policy, keeping the current rotation order."""
+        for team in self.policy.team_order:
+            if self.queues.get(team):
+                policy.activate(team)
+        for team, queue in self.queues.items():
+            if queue:
+                policy.activate(team)
+        self.policy = policy
+        if self.journal:
+            self.journal.record("policy", policy.to_config())
+        logger.info("Scheduling policy set to %s", policy.describe())
 
     # ------------------------------------------------------------------
     # Public API
@@ -31,68 +69,62 @@ class QueueManager:
 
     def add_link(
         self,
-        link: str,
+        video_id: str,
         team: str,
         *,
-        timestamp: Optional[datetime] = None,
+        timestamp: Optional[int] = None,
+        duration: Optional[float] = None,
     ) -> None:
-        """Enqueue *link* under *team*, ensuring the team is in the rotation."""
+        """Enqueue *video_id* under *team*, ensuring the team is in the rotation.
+
+        *timestamp* is in epoch seconds (defaults to now); *duration* (seconds)
+        is only used by duration-aware policies.
+        """
 
-        logger.info("[add_link] Attempting to add %s for team '%s'", link, team)
+        logger.debug("[add_link] Attempting to add %s for team '%s'", video_id, team)
 
         # Lazily create queue for brand‑new team
-        if team not in self.queues:
-            self.queues[team] = deque()
+        queue = self.queues.get(team)
+        if queue is None:
+            queue = self.queues[team] = deque()
             logger.info("[add_link] Team '%s' initialised", team)
 
-        # Guarantee team participates in the round‑robin exactly once
-        if team not in self.team_order:
-            self.team_order.append(team)
-            logger.info("[add_link] Team '%s' added to rotation → %s", team, list(self.team_order))
+        # Guarantee team participates in the rotation exactly once
+        if self.policy.activate(team) and logger.isEnabledFor(logging.DEBUG):
+            logger.debug("[add_link] Team '%s' added to rotation → %s", team, list(self.team_order))
 
-        entry = {
-            "team": team,
-            "link": link,
-            "timestamp": (timestamp or datetime.utcnow()).strftime("%Y-%m-%d %H:%M"),
-        }
-        self.queues[team].append(entry)
-        logger.info("[add_link] Enqueued %s", entry)
-        logger.debug("[add_link] Current queue for '%s': %s", team, list(self.queues[team]))
+        entry = SongEntry(team, video_id, timestamp or int(time.time()), duration)
+        queue.append(entry)
+        if self.journal:
+            self.journal.record("enqueue", entry)
+        logger.debug("[add_link] Enqueued %s", entry)
 
     # ------------------------------------------------------------------
 
-    def get_link(self) -> Optional[dict]:
-        """Pop and return the next song obeying round‑robin order."""
+    def get_link(self) -> Optional[SongEntry]:
+        """Pop and return the next song according to the scheduling policy."""
 
-        logger.info("[get_link] Starting retrieval. team_order=%s", list(self.team_order))
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("[get_link] Starting retrieval. team_order=%s", list(self.team_order))
 
         # Defensive rebuild: rotation empty but pending songs exist
         if not self.team_order:
             for t, q in self.queues.items():
                 if q:
-                    self.team_order.append(t)
+                    self.policy.activate(t)
             if self.team_order:
                 logger.warning(
-                    "[get_link] team_order was empty; rebuilt → %s", list(self.team_order)
+                    "[get_link] team_order was empty; rebuilt with %d team(s)", len(self.team_order)
                 )
 
-        while self.team_order:
-            team = self.team_order[0]
-            logger.debug("[get_link] Checking team '%s'", team)
-
-            if self.queues[team]:
-                song = self.queues[team].popleft()
-                self.team_order.rotate(-1)
-                logger.info(
-                    "[get_link] Dispatching %s | new rotation=%s", song, list(self.team_order)
-                )
-                return song
-            else:
-                self.team_order.popleft()
-                logger.info("[get_link] Team '%s' empty; removed from rotation", team)
-
-        logger.info("[get_link] No songs left in any team")
-        return None
+        song = self.policy.select(self.queues)
+        if song is None:
+            logger.info("[get_link] No songs left in any team")
+        else:
+            if self.journal:
+                self.journal.record("get", song.team, song.video_id)
+            logger.info("[get_link] Dispatching %s", song)
+        return song
 
     # ------------------------------------------------------------------
     # Helpers / Introspection
@@ -102,10 +134,42 @@ class QueueManager:
         """Return *True* if all team queues are empty."""
         return all(len(q) == 0 for q in self.queues.values())
 
-    def is_dispatched(self, link: str, team: str) -> bool:
-        """Return *True* if (*team*, *link*) has already been dispatched."""
-        return (team, link) in self._dispatched
+    def is_dispatched(self, video_id: str, team: str) -> bool:
+        """Return *True* if (*team*, *video_id*) has already been dispatched."""
+        return (team, video_id) in self.dispatched
+
+    def mark_dispatched(self, video_id: str, team: str) -> None:
+        """Mark (*team*, *video_id*) as dispatched (immutability guard)."""
+        self.dispatched.add(team, video_id)
+        if self.journal:
+            self.journal.record("dispatched", team, video_id)
+
+    def reset_dispatched(self) -> None:
+        """Forget every dispatched song, e.g. when a new karaoke session starts."""
+        self.dispatched.reset()
+        if self.journal:
+            self.journal.record("reset_dispatched")
 
-    def mark_dispatched(self, link: str, team: str) -> None:
-        """Mark (*team*, *link*) as dispatched (immutability guard)."""
-        self._dispatched.add((team, link))
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def to_state(self) -> Dict[str, Any]:
+        """JSON-serialisable copy of the whole queue, for journal snapshots."""
+        return {
+            "policy": self.policy.to_config(),
+            "rotation": self.policy.to_state(),
+            "queues": {team: [song.to_dict() for song in q] for team, q in self.queues.items() if q},
+            "dispatched": self.dispatched.to_state(),
+        }
+
+    def load_state(self, state: Dict[str, Any]) -> None:
+        """Replace the queue contents with a snapshot made by :meth:`to_state`."""
+        policy_config = state.get("policy") or {}
+        self.policy = make_policy(policy_config.get("scheduling") or RoundRobinPolicy.name, policy_config)
+        self.policy.load_state(state.get("rotation") or {})
+        self.queues = {
+            team: deque(SongEntry.from_dict(song) for song in songs)
+            for team, songs in (state.get("queues") or {}).items()
+        }
+        self.dispatched.load_state(state.get("dispatched") or {})
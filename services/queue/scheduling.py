@@ -0,0 +1,208 @@
+from collections import deque
+from typing import Any, Deque, Dict, Mapping, Optional
+
+from services.queue.song_entry import SongEntry
+
+# Project‑wide logger helper
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class SchedulingPolicy:
+    """Decides which team's song is dispatched next.
+
+    A policy owns the rotation of teams that currently have pending songs;
+    the per-team queues themselves stay in :class:`QueueManager` and are
+    handed to :meth:`select`. Policies must be O(1) amortised per call.
+    """
+
+    name: str = ""
+    #: Whether the policy uses song durations (the dispatcher fetches them if so)
+    needs_durations: bool = False
+
+    def __init__(self) -> None:
+        # Ordered list of teams that currently have at least one pending song
+        self.team_order: Deque[str] = deque()
+        # Membership of team_order, kept in sync with it
+        self._active: set[str] = set()
+
+    def activate(self, team: str) -> bool:
+        """Put *team* in the rotation if it is not there yet; return *True* if added."""
+        if team in self._active:
+            return False
+        self._active.add(team)
+        self.team_order.append(team)
+        return True
+
+    def _drop_head(self) -> str:
+        team = self.team_order.popleft()
+        self._active.discard(team)
+        return team
+
+    def select(self, queues: Mapping[str, Deque[SongEntry]]) -> Optional[SongEntry]:
+        """Pop and return the next song from *queues*, or ``None`` if all are empty.
+
+        A team in the rotation may have no entry in *queues* at all (queue
+        snapshots only keep non-empty queues); it counts as empty.
+        """
+        raise NotImplementedError
+
+    def describe(self) -> str:
+        """Short human readable summary, used by the admin commands."""
+        return self.name
+
+    def to_config(self) -> Dict[str, Any]:
+        """Settings that rebuild this policy through :func:`make_policy`."""
+        return {"scheduling": self.name}
+
+    def to_state(self) -> Dict[str, Any]:
+        """JSON-serialisable rotation state, for queue snapshots."""
+        return {"team_order": list(self.team_order)}
+
+    def load_state(self, state: Mapping[str, Any]) -> None:
+        """Restore the rotation saved by :meth:`to_state`."""
+        self.team_order = deque(state.get("team_order", []))
+        self._active = set(self.team_order)
+
+
+class RoundRobinPolicy(SchedulingPolicy):
+    """One song per team per turn, regardless of how long the songs are."""
+
+    name = "round_robin"
+
+    def select(self, queues: Mapping[str, Deque[SongEntry]]) -> Optional[SongEntry]:
+        while self.team_order:
+            team = self.team_order[0]
+            queue = queues.get(team)
+
+            if queue:
+                song = queue.popleft()
+                self.team_order.rotate(-1)
+                return song
+
+            self._drop_head()
+            logger.debug("[round_robin] Team '%s' empty; removed from rotation", team)
+        return None
+
+
+class DeficitRoundRobinPolicy(SchedulingPolicy):
+    """Deficit round robin weighted by song duration (airtime fairness).
+
+    Each time a team reaches the head of the rotation it earns ``quantum``
+    seconds of credit (times its weight). It keeps singing while its next
+    song fits in the credit it has, then the turn moves on and the unused
+    credit is carried over. A team that runs out of songs leaves the rotation
+    and loses its credit, as in classic DRR.
+
+    With ``quantum`` at least as long as a typical song every turn dispatches
+    something, so ``select`` stays O(1) amortised.
+    """
+
+    name = "fair"
+    needs_durations = True
+
+    def __init__(
+        self,
+        quantum: float = 300.0,
+        default_duration: float = 240.0,
+        weights: Optional[Mapping[str, float]] = None,
+    ) -> None:
+        super().__init__()
+        if quantum <= 0 or default_duration <= 0:
+            raise ValueError("quantum and default_duration must be positive")
+        weights = dict(weights or {})
+        if any(w <= 0 for w in weights.values()):
+            raise ValueError("team weights must be positive")
+
+        self.quantum = float(quantum)
+        self.default_duration = float(default_duration)
+        self.weights: Dict[str, float] = weights
+        # Unused airtime credit (seconds) of every team in the rotation
+        self.deficit: Dict[str, float] = {}
+        # Whether the team at the head already got its quantum for this turn
+        self._credited = False
+
+    def activate(self, team: str) -> bool:
+        added = super().activate(team)
+        if added:
+            self.deficit[team] = 0.0
+        return added
+
+    def cost(self, song: SongEntry) -> float:
+        """Airtime of *song* in seconds; unknown durations use the default."""
+        return float(song.duration or self.default_duration)
+
+    def _drop_head(self) -> str:
+        team = super()._drop_head()
+        self.deficit.pop(team, None)
+        self._credited = False
+        return team
+
+    def select(self, queues: Mapping[str, Deque[SongEntry]]) -> Optional[SongEntry]:
+        while self.team_order:
+            team = self.team_order[0]
+            queue = queues.get(team)
+
+            if not queue:
+                self._drop_head()
+                continue
+
+            if not self._credited:
+                self.deficit[team] += self.quantum * self.weights.get(team, 1.0)
+                self._credited = True
+
+            cost = self.cost(queue[0])
+            if cost <= self.deficit[team]:
+                song = queue.popleft()
+                self.deficit[team] -= cost
+                if not queue:
+                    self._drop_head()
+                return song
+
+            # Not enough credit left for the next song: carry it over to the next turn.
+            self.team_order.rotate(-1)
+            self._credited = False
+        return None
+
+    def describe(self) -> str:
+        return f"{self.name} (quantum={self.quantum:g}s, default song={self.default_duration:g}s)"
+
+    def to_config(self) -> Dict[str, Any]:
+        return {
+            "scheduling": self.name,
+            "quantum": self.quantum,
+            "default_song_duration": self.default_duration,
+            "team_weights": dict(self.weights),
+        }
+
+    def to_state(self) -> Dict[str, Any]:
+        state = super().to_state()
+        state["deficit"] = dict(self.deficit)
+        state["credited"] = self._credited
+        return state
+
+    def load_state(self, state: Mapping[str, Any]) -> None:
+        super().load_state(state)
+        self.deficit = {team: float(state.get("deficit", {}).get(team, 0.0)) for team in self.team_order}
+        self._credited = bool(state.get("credited", False))
+
+
+POLICIES = {
+    RoundRobinPolicy.name: RoundRobinPolicy,
+    DeficitRoundRobinPolicy.name: DeficitRoundRobinPolicy,
+}
+
+
+def make_policy(name: str, config: Optional[Mapping[str, Any]] = None) -> SchedulingPolicy:
+    """Build the policy called *name* using the ``queue`` section of config.yaml."""
+    config = config or {}
+    if name == RoundRobinPolicy.name:
+        return RoundRobinPolicy()
+    if name == DeficitRoundRobinPolicy.name:
+        return DeficitRoundRobinPolicy(
+            quantum=config.get("quantum") or 300,
+            default_duration=config.get("default_song_duration") or 240,
+            weights=config.get("team_weights") or {},
+        )
+    raise ValueError(f"Unknown scheduling policy '{name}'. Options: {', '.join(POLICIES)}")
@@ -0,0 +1,92 @@
+import json
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from services.video_id import to_video_id, video_url
+
+# Format of the timestamps written before SongEntry existed
+LEGACY_TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M"
+
+
+@dataclass(slots=True)
+class SongEntry:
+    """One song queued or dispatched for a team.
+
+    Slotted, so there is no per-instance ``__dict__``. Entries are shared
+    between the queue, the journal writer thread and the dispatcher and must
+    be treated as read-only; the class is not ``frozen`` only because frozen
+    dataclasses are about three times slower to construct, and entries are
+    built on every enqueue and every JSON decode.
+    ``timestamp`` is the enqueue time in integer epoch seconds (UTC); it is
+    only formatted when shown to people.
+    """
+
+    team: str
+    video_id: str
+    timestamp: int
+    duration: Optional[float] = None
+
+    @property
+    def link(self) -> str:
+        """Canonical YouTube URL of the song."""
+        return video_url(self.video_id)
+
+    def display_time(self, fmt: str = LEGACY_TIMESTAMP_FORMAT) -> str:
+        """Enqueue time formatted in UTC."""
+        return datetime.fromtimestamp(self.timestamp, timezone.utc).strftime(fmt)
+
+    # ------------------------------------------------------------------
+    # JSON codecs
+    # ------------------------------------------------------------------
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain dict for JSON; ``link`` is included for human readers and old clients."""
+        data = {"team": self.team, "video_id": self.video_id, "link": self.link, "timestamp": self.timestamp}
+        if self.duration is not None:
+            data["duration"] = self.duration
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SongEntry":
+        """Inverse of :meth:`to_dict`; also reads entries written before SongEntry existed."""
+        timestamp = data.get("timestamp")
+        if type(timestamp) is int and "video_id" in data:
+            # Fast path: the current format
+            return cls(data["team"], data["video_id"], timestamp, data.get("duration"))
+        video_id = data.get("video_id") or to_video_id(data["link"])
+        timestamp = timestamp or 0
+        if isinstance(timestamp, str):
+            timestamp = datetime.strptime(timestamp, LEGACY_TIMESTAMP_FORMAT).replace(tzinfo=timezone.utc)
+            timestamp = int(timestamp.timestamp())
+        return cls(data["team"], video_id, int(timestamp), data.get("duration"))
+
+
+def encode_songs(songs: Iterable[SongEntry]) -> str:
+    """Serialise songs as a compact JSON array."""
+    return json.dumps([song.to_dict() for song in songs], ensure_ascii=False, separators=(",", ":"))
+
+
+def decode_songs(text: str, on_invalid: Optional[Callable[[Any, Exception], None]] = None) -> List[SongEntry]:
+    """Parse a JSON array of songs (current or legacy format).
+
+    An entry that cannot be read fails the whole list, unless *on_invalid*
+    is given: it is then called with the entry and the error, and the entry
+    is left out.
+    """
+    if on_invalid is None:
+        return [SongEntry.from_dict(item) for item in json.loads(text)]
+    songs = []
+    for item in json.loads(text):
+        try:
+            songs.append(SongEntry.from_dict(item))
+        except (KeyError, ValueError, TypeError, AttributeError) as exc:
+            on_invalid(item, exc)
+    return songs
+
+
+def json_default(obj: Any) -> Any:
+    """``default=`` hook so ``json.dumps`` can write SongEntry objects directly."""
+    if isinstance(obj, SongEntry):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
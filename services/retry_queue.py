@@ -0,0 +1,229 @@
+import json
+import os
+import random
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from services.queue.song_entry import SongEntry
+
+# Project‑wide logger helper
+from utils.logger import get_logger
+from utils.state_file import DebouncedSave, load_json, write_atomic
+
+logger = get_logger(__name__)
+
+
+class RetryQueue:
+    """Durable outbox for songs on their way to the YouTube playlist.
+
+    Every dispatched song is ``track``-ed before it is handed to the
+    dispatch worker and ``resolve``-d once the playlist has it, so a song
+    is never only in memory for more than ``save_delay`` seconds. A failed insert is retried with exponential
+    backoff and jitter (``base_delay`` doubling up to ``max_delay``); after
+    ``max_attempts`` failures, or at once for errors that retrying cannot
+    fix, the song is moved to the dead-letter file, where admins can list it
+    and re-drive it.
+
+    The outbox is a small JSON file, rewritten atomically off the event
+    loop with the changes of the last ``save_delay`` seconds (see
+    DebouncedSave; ``close`` writes what is left); dead letters are appended to a JSON-lines file. Songs that were in
+    flight when the bot stopped are due again on the next start; the
+    retry insert checks the playlist first (see
+    ``YouTubeService.add_video_to_playlist_once``), so a song whose insert
+    did go through is not added twice.
+    """
+
+    def __init__(
+        self,
+        path: str = "state/dispatch_outbox.json",
+        dead_letter_path: str = "state/dead_letters.jsonl",
+        max_attempts: int = 5,
+        base_delay: float = 30,
+        max_delay: float = 1800,
+        clock: Callable[[], float] = time.time,
+        save_delay: float = 0.5,
+    ) -> None:
+        self.path = Path(path)
+        self.dead_letter_path = Path(dead_letter_path)
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._clock = clock
+        # (team, video_id) ➜ {"song", "attempts", "first_attempt", "next_at", "error"}
+        # next_at is None while the song is in flight
+        self._entries: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        # a burst of tracked/resolved songs costs one write, made off the event loop
+        self._saver = DebouncedSave(self.path, self._snapshot, delay=save_delay)
+        self._load()
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]], state_dir: str = "state") -> "RetryQueue":
+        """Build the queue from the ``youtube.retry`` section of config.yaml."""
+        config = config or {}
+        return cls(
+            path=os.path.join(state_dir, "dispatch_outbox.json"),
+            dead_letter_path=os.path.join(state_dir, "dead_letters.jsonl"),
+            max_attempts=config.get("max_attempts") or 5,
+            base_delay=config.get("base_delay") or 30,
+            max_delay=config.get("max_delay") or 1800,
+        )
+
+    # ------------------------------------------------------------------
+    # Outbox
+    # ------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def track(self, song: SongEntry) -> None:
+        """Record *song* as on its way to the playlist."""
+        self._entries[(song.team, song.video_id)] = {
+            "song": song,
+            "attempts": 0,
+            "first_attempt": self._clock(),
+            "next_at": None,
+            "error": None,
+        }
+        self._save()
+
+    def resolve(self, song: SongEntry) -> None:
+        """*song* is in the playlist: forget it."""
+        if self._entries.pop((song.team, song.video_id), None) is not None:
+            self._save()
+
+    def fail(self, song: SongEntry, error: BaseException, retryable: bool = True) -> Optional[float]:
+        """Record a failed insert of *song*.
+
+        Returns the delay before the next attempt, or ``None`` if the song was
+        moved to the dead letters instead.
+        """
+        key = (song.team, song.video_id)
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = {"song": song, "attempts": 0, "first_attempt": self._clock(), "next_at": None}
+            self._entries[key] = entry
+        entry["attempts"] += 1
+        entry["error"] = str(error)
+
+        if not retryable or entry["attempts"] >= self.max_attempts:
+            del self._entries[key]
+            self._save()
+            self._append_dead_letter(entry)
+            logger.error("Song %s (team %s) moved to dead letters after %d attempt(s): %s",
+                         song.video_id, song.team, entry["attempts"], error)
+            return None
+
+        delay = random.uniform(0.5, 1.0) * min(self.max_delay, self.base_delay * 2 ** (entry["attempts"] - 1))
+        entry["next_at"] = self._clock() + delay
+        self._save()
+        logger.warning("Song %s (team %s) failed (attempt %d/%d), retrying in %.0fs: %s",
+                       song.video_id, song.team, entry["attempts"], self.max_attempts, delay, error)
+        return delay
+
+    def due(self) -> List[Tuple[SongEntry, float]]:
+        """Songs whose retry time has come, with the time of their first attempt.
+
+        They are marked as in flight, so a later call does not return them again.
+        """
+        now = self._clock()
+        ready = [entry for entry in self._entries.values()
+                 if entry["next_at"] is not None and entry["next_at"] <= now]
+        for entry in ready:
+            entry["next_at"] = None
+        if ready:
+            self._save()
+        return [(entry["song"], entry["first_attempt"]) for entry in ready]
+
+    # ------------------------------------------------------------------
+    # Dead letters
+    # ------------------------------------------------------------------
+
+    def dead_letters(self) -> List[Dict[str, Any]]:
+        """Dead-lettered songs, oldest first, as stored (``song`` is a SongEntry)."""
+        if not self.dead_letter_path.exists():
+            return []
+        letters = []
+        with self.dead_letter_path.open("r", encoding="utf-8") as fh:
+            for line in fh:
+                if not line.strip():
+                    continue
+                try:
+                    letter = json.loads(line)
+                    letter["song"] = SongEntry.from_dict(letter["song"])
+                except (ValueError, KeyError) as exc:
+                    logger.warning("Skipping unreadable dead letter: %s", exc)
+                    continue
+                letters.append(letter)
+        return letters
+
+    def redrive(self, indexes: Optional[List[int]] = None) -> List[SongEntry]:
+        """Move dead letters (all, or those at *indexes*) back to the outbox, due now.
+
+        Their attempts start over; the first-attempt time is kept so the
+        playlist check still recognises an insert that did go through.
+        """
+        letters = self.dead_letters()
+        chosen = set(range(len(letters)) if indexes is None else indexes)
+        redriven, kept = [], []
+        for index, letter in enumerate(letters):
+            if index not in chosen:
+                kept.append(letter)
+                continue
+            song = letter["song"]
+            self._entries[(song.team, song.video_id)] = {
+                "song": song,
+                "attempts": 0,
+                "first_attempt": letter.get("first_attempt") or self._clock(),
+                "next_at": self._clock(),
+                "error": letter.get("error"),
+            }
+            redriven.append(song)
+        if redriven:
+            self._save()
+            self._write_dead_letters(kept)
+            logger.info("Re-drove %d dead-lettered song(s)", len(redriven))
+        return redriven
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _encode(entry: Dict[str, Any]) -> Dict[str, Any]:
+        return {**entry, "song": entry["song"].to_dict()}
+
+    def _load(self) -> None:
+        stored = load_json(self.path, "Dispatch outbox")
+        if stored is None:
+            return
+        now = self._clock()
+        for entry in stored:
+            entry["song"] = SongEntry.from_dict(entry["song"])
+            # In flight when the bot stopped: its outcome is unknown, check again now
+            if entry["next_at"] is None:
+                entry["next_at"] = now
+            self._entries[(entry["song"].team, entry["song"].video_id)] = entry
+        if self._entries:
+            logger.info("Dispatch outbox: %d song(s) still to be confirmed in the playlist", len(self._entries))
+
+    def _snapshot(self) -> List[Dict[str, Any]]:
+        return [self._encode(entry) for entry in self._entries.values()]
+
+    def _save(self) -> None:
+        self._saver.request()
+
+    async def close(self) -> None:
+        """Write the outbox changes not saved yet."""
+        await self._saver.flush()
+
+    def _append_dead_letter(self, entry: Dict[str, Any]) -> None:
+        self.dead_letter_path.parent.mkdir(parents=True, exist_ok=True)
+        letter = {**self._encode(entry), "failed_at": self._clock()}
+        letter.pop("next_at", None)
+        with self.dead_letter_path.open("a", encoding="utf-8") as fh:
+            fh.write(json.dumps(letter, ensure_ascii=False) + "\n")
+
+    def _write_dead_letters(self, letters: List[Dict[str, Any]]) -> None:
+        lines = "".join(json.dumps(self._encode(letter), ensure_ascii=False) + "\n" for letter in letters)
+        write_atomic(self.dead_letter_path, lambda fh: fh.write(lines))
@@ -1,64 +1,132 @@
+import asyncio
 import os
-import json
-import re
-from pydantic import BaseModel
-from openai import OpenAI
+from functools import lru_cache
+from typing import List, Optional, Type
+
+from pydantic import BaseModel, Field, create_model
+from openai import AsyncOpenAI
 import instructor
 
+from services.validation_batcher import batch_prompt
 
 
+@lru_cache(maxsize=None)
+def batch_model(validation_format: Type[BaseModel], size: int) -> Type[BaseModel]:
+    """A response model holding exactly *size* results of *validation_format*."""
+    return create_model(
+        f"{validation_format.__name__}Batch",
+        results=(List[validation_format], Field(min_length=size, max_length=size)),
+    )
 
 
 class SmartBotService:
-    def __init__(self, api_key: str):
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str = "https://api.deepseek.com",
+        model: str = "deepseek-chat",
+        max_concurrency: int = 2,
+        timeout: float = 30.0,
+    ):
         """
-        Initializes the SmartBotService using OpenAI's instructor method and validates the API key.
+        Initializes the SmartBotService: one long-lived async client (with its own
+        connection pool) wrapped with OpenAI's instructor method.
+
+        Nothing is sent over the network here; the API key is checked against
+        the API on the first request (see `validate_login`). At most
+        `max_concurrency` requests run at once, each limited to `timeout` seconds.
+        `base_url` may point to any OpenAI-compatible API, such as the local stub
+        in benchmarks/llm_stub.py.
         """
         if not api_key or not api_key.strip() or not api_key.startswith("sk-"):
             raise ValueError("API key is missing or does not correct.")
         os.environ["DEEPSEEK_API_KEY"] = api_key
 
-        try:
-            self.client = instructor.from_openai(
-                OpenAI(
-                    api_key=api_key,
-                    base_url="https://api.deepseek.com"
-                )
-            )
-            self.validate_login()
-        except Exception as e:
-            print(f"[ERROR] Failed to initialize SmartBotService: {str(e)}")
-            raise
+        self.model = model
+        self.timeout = timeout
+        self._openai = AsyncOpenAI(api_key=api_key, base_url=base_url, timeout=timeout)
+        self.client = instructor.from_openai(self._openai)
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._login: Optional[asyncio.Task] = None
 
-    def validate_login(self) -> None:
+    async def validate_login(self) -> None:
         """
-        Validates that the client is properly authenticated.
+        Validates that the client is properly authenticated (once; later calls
+        wait for the first check).
         Raises an exception if the connection fails.
         """
+        if self._login is None or (self._login.done() and (self._login.cancelled() or self._login.exception())):
+            self._login = asyncio.ensure_future(self._check_login())
+        await self._login
+
+    async def _check_login(self) -> None:
         try:
-            self.client.models.list()
+            await self._openai.models.list()
         except Exception as e:
             raise ConnectionError(f"Failed to authenticate with DeepSeek API: {str(e)}")
 
-    def validate_text(self, system_prompt: str, user_input: str, validation_format: BaseModel) -> dict:
+    async def validate_text(self, system_prompt: str, user_input: str, validation_format: Type[BaseModel]) -> dict:
         """
         Validates a text according to a system prompt and user input.
         Returns a structured response or an error message in case of failure.
         """
         try:
-            response = self.client.chat.completions.create(
-                model="deepseek-chat",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_input}
-                ],
-                response_model=validation_format
-            )
+            await self.validate_login()
+            async with self._slots:
+                response = await asyncio.wait_for(
+                    self.client.chat.completions.create(
+                        model=self.model,
+                        messages=[
+                            {"role": "system", "content": system_prompt},
+                            {"role": "user", "content": user_input}
+                        ],
+                        response_model=validation_format
+                    ),
+                    timeout=self.timeout,
+                )
             return response.model_dump()
 
+        except asyncio.TimeoutError:
+            print(f"[ERROR] Text validation timed out after {self.timeout:.0f}s")
+            return {"error": "timeout"}
         except Exception as e:
             print(f"[ERROR] Failed during text validation: {str(e)}")
             return {"error": str(e)}
 
+    async def validate_texts(self, system_prompt: str, user_inputs: List[str], validation_format: Type[BaseModel]) -> List[dict]:
+        """
+        Validates several texts in a single request (see ValidationBatcher).
+        Returns one structured response per text, in order, or one error message
+        per text in case of failure.
+        """
+        if len(user_inputs) == 1:
+            return [await self.validate_text(system_prompt, user_inputs[0], validation_format)]
+        system_prompt, user_input = batch_prompt(system_prompt, user_inputs)
+        try:
+            await self.validate_login()
+            async with self._slots:
+                response = await asyncio.wait_for(
+                    self.client.chat.completions.create(
+                        model=self.model,
+                        messages=[
+                            {"role": "system", "content": system_prompt},
+                            {"role": "user", "content": user_input}
+                        ],
+                        response_model=batch_model(validation_format, len(user_inputs))
+                    ),
+                    timeout=self.timeout,
+                )
+            return [result.model_dump() for result in response.results]
 
+        except asyncio.TimeoutError:
+            print(f"[ERROR] Validation of {len(user_inputs)} texts timed out after {self.timeout:.0f}s")
+            return [{"error": "timeout"}] * len(user_inputs)
+        except Exception as e:
+            print(f"[ERROR] Failed during validation of {len(user_inputs)} texts: {str(e)}")
+            return [{"error": str(e)}] * len(user_inputs)
 
+    async def close(self) -> None:
+        """
+        Closes the client's connection pool.
+        """
+        await self._openai.close()
@@ -0,0 +1,122 @@
+import hashlib
+import time
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Project‑wide logger helper
+from utils.logger import get_logger
+from utils.state_file import DebouncedSave, load_json
+
+logger = get_logger(__name__)
+
+
+def normalize_text(text: str) -> str:
+    """Unicode-normalized, case-folded *text* with its whitespace collapsed."""
+    return " ".join(unicodedata.normalize("NFKC", text).casefold().split())
+
+
+class ValidationCache:
+    """LRU + TTL cache of LLM validation results.
+
+    Keyed by a SHA-256 of the instruction and the normalized message text
+    (case, Unicode form and whitespace do not matter), so a presentation
+    posted again, or re-posted with only those changes, is answered from
+    here instead of by the API. At most ``max_entries`` results are kept,
+    least recently used evicted first, each for at most ``ttl`` seconds (so
+    a change of model eventually shows through; a changed instruction
+    changes the key).
+
+    Only successful results should be ``put``; the cache is rewritten
+    atomically to *path*, off the event loop and with the puts of the last
+    ``save_delay`` seconds together (see DebouncedSave; ``close`` writes
+    what is left), and loaded back (without the expired entries) on start.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = "state/validation_cache.json",
+        max_entries: int = 1000,
+        ttl: float = 7 * 24 * 3600,
+        clock: Callable[[], float] = time.time,
+        save_delay: float = 2.0,
+    ) -> None:
+        self.path = Path(path) if path else None
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._clock = clock
+        self.hits = 0
+        self.misses = 0
+        # key ➜ (expires at, result); least recently used first
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._saver = DebouncedSave(self.path, self._snapshot, delay=save_delay) if self.path else None
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def key(instruction: str, text: str) -> str:
+        digest = hashlib.sha256()
+        digest.update(instruction.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(normalize_text(text).encode("utf-8"))
+        return digest.hexdigest()
+
+    def get(self, instruction: str, text: str) -> Optional[Dict[str, Any]]:
+        """The cached result for (*instruction*, *text*), or None (a miss)."""
+        key = self.key(instruction, text)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] <= self._clock():
+            del self._entries[key]
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, instruction: str, text: str, result: Dict[str, Any]) -> None:
+        """Cache *result* for (*instruction*, *text*) and save the cache."""
+        key = self.key(instruction, text)
+        self._entries[key] = (self._clock() + self.ttl, result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        self.save()
+
+    def describe(self) -> str:
+        """Human-readable summary, e.g. for an admin command."""
+        lookups = self.hits + self.misses
+        rate = f"{self.hits / lookups:.0%}" if lookups else "n/a"
+        return (f"{len(self._entries)}/{self.max_entries} result(s) cached, "
+                f"{self.hits} hit(s), {self.misses} miss(es) since start (hit rate {rate})")
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def save(self) -> None:
+        """Write the cache to its file (atomically, within ``save_delay`` seconds when on the event loop)."""
+        if self._saver is not None:
+            self._saver.request()
+
+    async def close(self) -> None:
+        """Write the results not saved yet."""
+        if self._saver is not None:
+            await self._saver.flush()
+
+    def _snapshot(self) -> List[List[Any]]:
+        return [[key, expires, result] for key, (expires, result) in self._entries.items()]
+
+    def _load(self) -> None:
+        stored = load_json(self.path, "Validation cache")
+        if stored is None:
+            return
+        now = self._clock()
+        for key, expires, result in stored[-self.max_entries:]:
+            if expires > now:
+                self._entries[key] = (expires, result)
+        logger.info("Validation cache: %d result(s) restored", len(self._entries))
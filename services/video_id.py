@@ -0,0 +1,90 @@
+import re
+import sys
+from functools import lru_cache
+from typing import List, Optional
+
+# A YouTube video ID: 11 characters of the URL-safe base64 alphabet
+VIDEO_ID_REGEX = re.compile(r"[A-Za-z0-9_-]{11}")
+# The ID inside every URL form the bot accepts, with or without scheme:
+#   (www.|m.|music.)youtube.com/watch?…v=ID…, /shorts/ID, /live/ID, /embed/ID, youtu.be/ID
+# Extra query parameters (?si=…, &list=…, &t=…) are ignored. The host must
+# start the URL, so "notyoutube.com/…" or "evil.youtube.com/…" do not match.
+# The pattern starts with the literal "youtu", which lets the regex engine
+# skip straight to candidates; the host is then checked looking behind.
+VIDEO_URL_REGEX = re.compile(
+    r"youtu"
+    r"(?:(?<=(?<![\w.-])youtu)|(?<=(?<![\w.-])www\.youtu)|(?<=(?<![\w.-])m\.youtu)|(?<=(?<![\w.-])music\.youtu))"
+    r"(?:be\.com/(?:watch\?(?:[^#\s]*&)?v=|shorts/|live/|embed/)|\.be/)"
+    r"([A-Za-z0-9_-]{11})(?![A-Za-z0-9_-])"
+)
+
+_ALPHABET = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_"
+_VALUES = {char: value for value, char in enumerate(_ALPHABET)}
+
+
+@lru_cache(maxsize=4096)
+def video_id_from_url(url: str) -> Optional[str]:
+    """
+    Return the canonical video ID of a YouTube URL (or bare ID), or ``None``.
+
+    The result is interned, so every entry referring to the same video shares
+    one 11-character string, and cached, so the same URL is only parsed once.
+    """
+    if VIDEO_ID_REGEX.fullmatch(url):
+        return sys.intern(url)
+    match = VIDEO_URL_REGEX.search(url)
+    if match:
+        return sys.intern(match.group(1))
+    return None
+
+
+def extract_video_ids(text: str) -> List[str]:
+    """
+    Canonical (interned) video IDs of every YouTube link in *text*, in order.
+
+    One regex pass over the text; a message with no "youtu" in it is not
+    scanned at all. A video linked twice appears twice.
+    """
+    if "youtu" not in text:
+        return []
+    return list(map(sys.intern, VIDEO_URL_REGEX.findall(text)))
+
+
+def to_video_id(url: str) -> str:
+    """Like :func:`video_id_from_url` but raises ``ValueError`` for non-YouTube links."""
+    video_id = video_id_from_url(url)
+    if video_id is None:
+        raise ValueError(f"Invalid YouTube URL: {url}")
+    return video_id
+
+
+def video_url(video_id: str) -> str:
+    """Canonical desktop URL of a video."""
+    return f"https://www.youtube.com/watch?v={video_id}"
+
+
+def pack_video_id(video_id: str) -> int:
+    """
+    Pack a video ID into a 64-bit integer.
+
+    The first ten characters carry 6 bits each; YouTube only uses 16 of the 64
+    symbols in the last position, so its low 2 bits are always zero and the
+    remaining 4 bits complete the 64.
+    """
+    value = 0
+    for char in video_id[:10]:
+        value = (value << 6) | _VALUES[char]
+    last = _VALUES[video_id[10]]
+    if last & 0b11:
+        raise ValueError(f"Not a YouTube video ID: {video_id}")
+    return (value << 4) | (last >> 2)
+
+
+def unpack_video_id(packed: int) -> str:
+    """Inverse of :func:`pack_video_id`."""
+    chars = [_ALPHABET[(packed & 0b1111) << 2]]
+    packed >>= 4
+    for _ in range(10):
+        chars.append(_ALPHABET[packed & 0b111111])
+        packed >>= 6
+    return sys.intern("".join(reversed(chars)))
@@ -1,11 +1,16 @@
 import json
-import time
+import random
 import re
+import threading
+import time
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Optional
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
 from google.oauth2.credentials import Credentials
 from google.auth.transport.requests import Request
 
@@ -13,9 +18,150 @@ from google.auth.transport.requests import Request
 # 🌟  bring in YOUR logger helper
 #     (assuming it lives next to this file; adjust the import if not)
 # ──────────────────────────────────────────────────────────
+from services.video_id import to_video_id
 from utils.logger import get_logger
+from utils.state_file import load_json, save_json
 logger = get_logger(__name__)                        # one logger for this whole file
 
+# The Data API quota resets at midnight Pacific time
+try:
+    QUOTA_TIMEZONE = ZoneInfo("America/Los_Angeles")
+except ZoneInfoNotFoundError:                        # no tz database (e.g. Windows without tzdata)
+    QUOTA_TIMEZONE = timezone(timedelta(hours=-8))
+
+# Quota units charged per call (https://developers.google.com/youtube/v3/determine_quota_cost)
+QUOTA_COSTS = {
+    "playlistItems.insert": 50,
+    "playlistItems.list": 1,
+    "videos.list": 1,
+}
+
+# Most calls one HTTP batch request may carry for this API
+MAX_BATCH_SIZE = 50
+
+# Transient failures worth retrying with backoff
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+RETRY_REASONS = {"rateLimitExceeded", "userRateLimitExceeded", "backendError"}
+# 403 reasons that mean the daily budget is gone; retrying before the reset is pointless
+QUOTA_REASONS = {"quotaExceeded", "dailyLimitExceeded"}
+# Inserts refused because of their explicit position (the playlist is not sorted
+# manually, or the position is past the end); appending without one works
+POSITION_REASONS = {"manualSortRequired", "invalidPlaylistItemPosition"}
+
+
+class QuotaExhaustedError(RuntimeError):
+    """The daily Data API quota is spent; calls resume after the Pacific midnight reset."""
+
+
+def is_transient_error(exc: BaseException) -> bool:
+    """
+    Whether a failed call is worth trying again later: quota exhaustion,
+    rate limiting, server errors and network problems are; invalid or
+    deleted videos and permission errors are not.
+    """
+    if isinstance(exc, (QuotaExhaustedError, OSError)):
+        return True
+    if isinstance(exc, HttpError):
+        return exc.resp.status in RETRY_STATUSES or YouTubeService._error_reason(exc) in RETRY_REASONS
+    return False
+
+
+class QuotaAccountant:
+    """
+    Keeps track of the Data API quota units spent today.
+
+    Units are counted locally for every request sent (Google charges
+    failed requests too) and the count starts over at midnight Pacific
+    time, when the real quota resets. If the API reports the quota as
+    exceeded before the local count does (e.g. another app shares the
+    project), the budget is marked as spent until the reset.
+
+    Parameters
+    ----------
+    daily_limit : int
+        Units available per day (10 000 for a default Cloud project).
+    state_file : str or Path, optional
+        JSON file the count is saved to, so a restart keeps it.
+    clock : callable
+        Returns the current epoch time (injectable for tests).
+
+    The dispatch worker thread spends units while the event loop reads
+    what is left, so the count and its file are only touched under a lock;
+    the file is replaced atomically (see utils.state_file).
+    """
+
+    def __init__(
+        self,
+        daily_limit: int = 10_000,
+        state_file: Optional[str] = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.daily_limit = daily_limit
+        self.state_file = Path(state_file) if state_file else None
+        self._clock = clock
+        self._lock = threading.RLock()
+        self._day = self._today()
+        self.spent = 0
+        self._load()
+
+    # ───────────────────────────────────────────────
+    def _today(self) -> str:
+        return datetime.fromtimestamp(self._clock(), QUOTA_TIMEZONE).date().isoformat()
+
+    def _roll_over(self) -> None:
+        with self._lock:
+            today = self._today()
+            if today != self._day:
+                logger.info("🔄  YouTube quota reset (%d units spent on %s)", self.spent, self._day)
+                self._day, self.spent = today, 0
+                self._save()
+
+    def _load(self) -> None:
+        state = load_json(self.state_file, "Quota state")
+        if isinstance(state, dict) and state.get("day") == self._day:
+            self.spent = int(state.get("spent", 0))
+
+    def _save(self) -> None:
+        if self.state_file:
+            with self._lock:
+                save_json(self.state_file, {"day": self._day, "spent": self.spent})
+
+    # ───────────────────────────────────────────────
+    @staticmethod
+    def cost(operation: str) -> int:
+        """Units charged for one call of *operation* (e.g. ``playlistItems.insert``)."""
+        return QUOTA_COSTS.get(operation, 1)
+
+    def remaining(self) -> int:
+        """Units left until the next reset."""
+        self._roll_over()
+        return max(0, self.daily_limit - self.spent)
+
+    def can_spend(self, units: int) -> bool:
+        return self.remaining() >= units
+
+    def spend(self, units: int) -> None:
+        with self._lock:
+            self._roll_over()
+            self.spent += units
+            self._save()
+
+    def exhaust(self) -> None:
+        """Mark today's budget as spent (the API said so)."""
+        with self._lock:
+            self._roll_over()
+            self.spent = max(self.spent, self.daily_limit)
+            self._save()
+
+    def seconds_until_reset(self) -> float:
+        now = datetime.fromtimestamp(self._clock(), QUOTA_TIMEZONE)
+        midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time(), QUOTA_TIMEZONE)
+        return midnight.timestamp() - now.timestamp()
+
+    def describe(self) -> str:
+        return (f"{self.remaining()}/{self.daily_limit} units left, "
+                f"reset in {self.seconds_until_reset() / 3600:.1f} h")
+
 
 class YouTubeService:
     """
@@ -40,14 +186,26 @@ class YouTubeService:
         client_secret_file: str,
         credentials_file: str,
         playlist_id: str,
+        quota: Optional[QuotaAccountant] = None,
+        max_retries: int = 5,
+        backoff_base: float = 1.0,
+        backoff_cap: float = 60.0,
+        client: Any = None,
     ) -> None:
 
         self.client_secret_file = client_secret_file
         self.credentials_file = credentials_file
         self.playlist_id = playlist_id
+        self.quota = quota or QuotaAccountant()
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        # False once the playlist refused an explicit position (not sorted manually)
+        self.positions_supported = True
 
         logger.info("🎬  Initialising YouTubeService for playlist %s", playlist_id)
-        self.youtube = self._get_authenticated_service()
+        # an already built client (e.g. pointed at a test server) skips OAuth
+        self.youtube = client or self._get_authenticated_service()
         logger.info("✅  YouTube client ready")
 
     # ───────────────────────────────────────────────
@@ -105,10 +263,14 @@ class YouTubeService:
         """
         Append a video to the end of the playlist (FIFO order).
 
+        Blocking; the dispatcher runs it on its worker thread and paces the
+        calls (see services.dispatch_worker).
+
         Parameters
         ----------
         youtube_video_url : str
-            Full YouTube URL, e.g. https://youtu.be/dQw4w9WgXcQ
+            Full YouTube URL, e.g. https://youtu.be/dQw4w9WgXcQ, or a bare
+            video ID
 
         Returns
         -------
@@ -119,41 +281,295 @@ class YouTubeService:
         logger.info("📥  Queuing video %s (%s) for playlist %s",
                     video_id, youtube_video_url, self.playlist_id)
 
-        request = self.youtube.playlistItems().insert(
-            part="snippet",
-            body={
-                "snippet": {
-                    "playlistId": self.playlist_id,
-                    "resourceId": {
-                        "kind": "youtube#video",
-                        "videoId": video_id,
-                    },
-                },
-            },
-        )
+        request = self._insert_request(video_id)
 
         try:
-            response = request.execute()
+            response = self._execute(request, "playlistItems.insert")
             logger.info("✅  Video %s successfully added (playlistItems id=%s)",
                         video_id, response.get("id"))
         except Exception as exc:
             logger.error("❌  Failed to add video %s to playlist: %s", video_id, exc)
             raise
 
-        # be kind to the API quotas
-        time.sleep(1)
         return response
 
+    def add_video_to_playlist_once(self, youtube_video_url: str, since: float):
+        """
+        Retry-safe :meth:`add_video_to_playlist`: if the video was added to
+        the playlist at or after *since* (an earlier attempt that did go
+        through although it reported an error), nothing is inserted again.
+
+        Parameters
+        ----------
+        youtube_video_url : str
+            URL or bare video ID.
+        since : float
+            Epoch time of the first attempt to insert this song.
+
+        Returns
+        -------
+        dict
+            The existing playlist item, or the playlistItems.insert response.
+        """
+        video_id = self._extract_video_id(youtube_video_url)
+        existing = self._find_playlist_item(video_id, since)
+        if existing is not None:
+            logger.info("♻️  Video %s already in the playlist (playlistItems id=%s); not adding it again",
+                        video_id, existing.get("id"))
+            return existing
+        return self.add_video_to_playlist(video_id)
+
+    def add_videos_to_playlist(
+        self, youtube_video_urls: Sequence[str]
+    ) -> List[Tuple[Optional[dict], Optional[Exception]]]:
+        """
+        Append several videos to the playlist with one HTTP batch request.
+
+        The API may run the calls of a batch in any order, so each insert
+        carries its explicit position after the current end of the playlist
+        (one extra playlistItems.list call, 1 quota unit). Every insert is
+        still charged 50 units; videos the remaining quota cannot pay for
+        are not sent.
+
+        Items refused because of their position (a call that ran before the
+        one ahead of it, a position left past the end by an earlier item
+        that failed) and items that failed with a transient error are then
+        appended one by one, in order, without a position. A playlist that
+        is not sorted manually refuses every position: from then on, and if
+        the batch request itself fails, the videos are appended one by one.
+
+        Parameters
+        ----------
+        youtube_video_urls : Sequence[str]
+            URLs or bare video IDs, in playlist order (at most
+            ``MAX_BATCH_SIZE``).
+
+        Returns
+        -------
+        list of (dict or None, Exception or None)
+            One ``(response, error)`` pair per video, in the input order.
+        """
+        if len(youtube_video_urls) > MAX_BATCH_SIZE:
+            raise ValueError(f"At most {MAX_BATCH_SIZE} videos per batch")
+        video_ids = [self._extract_video_id(url) for url in youtube_video_urls]
+        results: List[Tuple[Optional[dict], Optional[Exception]]] = [
+            (None, QuotaExhaustedError(f"YouTube quota exhausted ({self.quota.describe()})"))
+        ] * len(video_ids)
+        if not video_ids:
+            return results
+
+        insert_cost = self.quota.cost("playlistItems.insert")
+        affordable = min(
+            len(video_ids),
+            (self.quota.remaining() - self.quota.cost("playlistItems.list")) // insert_cost,
+        )
+        if affordable <= 0:
+            return results
+        if not self.positions_supported:
+            results[:affordable] = self._append_in_order(video_ids[:affordable])
+            return results
+        logger.info("📥  Queuing %d video(s) for playlist %s in one batch", affordable, self.playlist_id)
+
+        try:
+            start = self._playlist_length()
+        except Exception as exc:
+            logger.error("❌  Could not read the playlist length: %s", exc)
+            return [(None, exc)] * len(video_ids)
+
+        def on_item(request_id: str, response: Optional[dict], exception: Optional[Exception]) -> None:
+            results[int(request_id)] = (response, exception)
+
+        batch = self.youtube.new_batch_http_request()
+        for index, video_id in enumerate(video_ids[:affordable]):
+            batch.add(self._insert_request(video_id, start + index), callback=on_item, request_id=str(index))
+        try:
+            batch.execute()
+        except HttpError as exc:
+            # The batch itself failed: nothing was inserted (or charged), send the
+            # affordable videos one by one, each charged by its own insert
+            logger.warning("⚠️  Batch insert failed (%s); falling back to single inserts", exc)
+            results[:affordable] = self._append_in_order(video_ids[:affordable])
+            return results
+        self.quota.spend(insert_cost * affordable)
+
+        append: List[int] = []
+        for index in range(affordable):
+            response, error = results[index]
+            if error is None:
+                logger.info("✅  Video %s successfully added (playlistItems id=%s)",
+                            video_ids[index], response.get("id"))
+                continue
+            reason = self._error_reason(error) if isinstance(error, HttpError) else ""
+            if isinstance(error, HttpError) and error.resp.status == 403 and reason in QUOTA_REASONS:
+                self.quota.exhaust()
+                results[index] = (None, QuotaExhaustedError(f"YouTube quota exceeded ({self.quota.describe()})"))
+            elif reason in POSITION_REASONS:
+                if reason == "manualSortRequired" and self.positions_supported:
+                    logger.warning("⚠️  Playlist %s is not sorted manually; appending videos one by one",
+                                   self.playlist_id)
+                    self.positions_supported = False
+                append.append(index)
+                continue
+            elif isinstance(error, HttpError) and (
+                error.resp.status in RETRY_STATUSES or reason in RETRY_REASONS
+            ):
+                append.append(index)
+                continue
+            logger.error("❌  Failed to add video %s to playlist: %s", video_ids[index], results[index][1])
+
+        appended = self._append_in_order([video_ids[index] for index in append])
+        for index, result in zip(append, appended):
+            results[index] = result
+        return results
+
+    def get_video_durations(self, video_ids: Iterable[str]) -> Dict[str, float]:
+        """
+        Look up the duration of several videos (videos.list, 1 quota unit
+        per 50 videos).
+
+        Parameters
+        ----------
+        video_ids : Iterable[str]
+            Canonical video IDs.
+
+        Returns
+        -------
+        dict
+            Duration in seconds keyed by video ID. Unknown videos are left out.
+        """
+        durations: Dict[str, float] = {}
+        ids = list(video_ids)
+        for start in range(0, len(ids), 50):
+            request = self.youtube.videos().list(
+                part="contentDetails",
+                id=",".join(ids[start:start + 50]),
+            )
+            response = self._execute(request, "videos.list")
+            for item in response.get("items", []):
+                seconds = self._parse_duration(item["contentDetails"].get("duration", ""))
+                if seconds:
+                    durations[item["id"]] = seconds
+        logger.debug("Fetched durations for %d/%d video(s)", len(durations), len(ids))
+        return durations
+
     # ───────────────────────────────────────────────
     #  helpers
     # ───────────────────────────────────────────────
+    def _insert_request(self, video_id: str, position: Optional[int] = None):
+        snippet: Dict[str, Any] = {
+            "playlistId": self.playlist_id,
+            "resourceId": {
+                "kind": "youtube#video",
+                "videoId": video_id,
+            },
+        }
+        if position is not None:
+            snippet["position"] = position
+        return self.youtube.playlistItems().insert(part="snippet", body={"snippet": snippet})
+
+    def _try_insert(self, video_id: str, position: Optional[int] = None) -> Tuple[Optional[dict], Optional[Exception]]:
+        """Single insert (with backoff), as a ``(response, error)`` pair."""
+        try:
+            return self._execute(self._insert_request(video_id, position), "playlistItems.insert"), None
+        except Exception as exc:
+            return None, exc
+
+    def _append_in_order(self, video_ids: Sequence[str]) -> List[Tuple[Optional[dict], Optional[Exception]]]:
+        """Single inserts without a position, one after the other, as ``(response, error)`` pairs."""
+        results = []
+        for video_id in video_ids:
+            response, error = self._try_insert(video_id)
+            if error is None:
+                logger.info("✅  Video %s successfully added (playlistItems id=%s)", video_id, response.get("id"))
+            else:
+                logger.error("❌  Failed to add video %s to playlist: %s", video_id, error)
+            results.append((response, error))
+        return results
+
+    def _find_playlist_item(self, video_id: str, since: float) -> Optional[dict]:
+        """The item of *video_id* added to the playlist at or after *since*, if any."""
+        request = self.youtube.playlistItems().list(
+            part="snippet", playlistId=self.playlist_id, videoId=video_id, maxResults=50,
+        )
+        for item in self._execute(request, "playlistItems.list").get("items", []):
+            published = item["snippet"].get("publishedAt", "").replace("Z", "+00:00")
+            try:
+                added_at = datetime.fromisoformat(published).timestamp()
+            except ValueError:
+                continue
+            # a minute of slack for clock differences with Google's servers
+            if added_at >= since - 60:
+                return item
+        return None
+
+    def _playlist_length(self) -> int:
+        request = self.youtube.playlistItems().list(
+            part="id", playlistId=self.playlist_id, maxResults=1,
+        )
+        return int(self._execute(request, "playlistItems.list")["pageInfo"]["totalResults"])
+
+    def _execute(self, request, operation: str) -> dict:
+        """
+        Execute *request*, charging its quota cost, and retry transient
+        failures (429, 5xx, rate-limit 403s) with exponential backoff and
+        full jitter.
+
+        Raises
+        ------
+        QuotaExhaustedError
+            The daily budget is spent, either by our own count (nothing is
+            sent) or according to the API.
+        """
+        units = self.quota.cost(operation)
+        attempt = 0
+        while True:
+            if not self.quota.can_spend(units):
+                raise QuotaExhaustedError(f"YouTube quota exhausted ({self.quota.describe()})")
+            self.quota.spend(units)
+            try:
+                return request.execute()
+            except HttpError as exc:
+                status, reason = exc.resp.status, self._error_reason(exc)
+                if status == 403 and reason in QUOTA_REASONS:
+                    self.quota.exhaust()
+                    logger.error("🚫  YouTube quota exceeded (%s); pausing until the reset", reason)
+                    raise QuotaExhaustedError(f"YouTube quota exceeded ({self.quota.describe()})") from exc
+                retryable = status in RETRY_STATUSES or (status == 403 and reason in RETRY_REASONS)
+                if not retryable or attempt == self.max_retries:
+                    raise
+                delay = random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+                attempt += 1
+                logger.warning("⏳  %s failed with %s %s; retry %d/%d in %.1fs",
+                               operation, status, reason or "", attempt, self.max_retries, delay)
+                time.sleep(delay)
+
+    @staticmethod
+    def _error_reason(exc: HttpError) -> str:
+        """The ``reason`` of a Google API error response, e.g. ``quotaExceeded``."""
+        try:
+            return json.loads(exc.content)["error"]["errors"][0]["reason"]
+        except (ValueError, KeyError, IndexError, TypeError):
+            return ""
+
+    @staticmethod
+    def _parse_duration(iso_duration: str) -> Optional[float]:
+        """
+        Convert an ISO-8601 duration such as ``PT4M13S`` into seconds.
+        """
+        match = re.fullmatch(r"P(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?)?", iso_duration)
+        if not match:
+            return None
+        days, hours, minutes, seconds = (int(g or 0) for g in match.groups())
+        return float(((days * 24 + hours) * 60 + minutes) * 60 + seconds)
+
     @staticmethod
     def _extract_video_id(url: str) -> str:
         """
-        Robust extractor that works for both full URLs and short youtu.be links.
+        Robust extractor that works for every YouTube URL form (see
+        ``services.video_id.VIDEO_URL_REGEX``) and bare video IDs.
         """
-        match = re.search(r"(?:v=|youtu\.be/)([A-Za-z0-9_-]{11})", url)
-        if match:
-            return match.group(1)
-        logger.error("Invalid YouTube URL supplied: %s", url)
-        raise ValueError(f"Invalid YouTube URL: {url}")
+        try:
+            return to_video_id(url)
+        except ValueError:
+            logger.error("Invalid YouTube URL supplied: %s", url)
+            raise
@@ -0,0 +1,126 @@
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+from services.backfill import HistoryBackfill, snowflake_at
+
+LATENCY = 0.05      # seconds per history page
+NOW = 1_760_000_000.0
+path = Path(tempfile.mkdtemp()) / "backfill_marks.json"
+human, bot = SimpleNamespace(bot=False), SimpleNamespace(bot=True)
+
+
+class FakeChannel:
+    """Stand-in for discord.TextChannel: history() pages through its messages with latency."""
+
+    def __init__(self, channel_id, count):
+        self.id = channel_id
+        self.name = f"🎤equipo︱{channel_id}︱test"
+        base = snowflake_at(NOW - 3600).id
+        self.messages = [SimpleNamespace(id=base + n, author=bot if n % 10 == 9 else human, channel=self,
+                                         content=f"song {n}") for n in range(count)]
+
+    def post(self, at):
+        message = SimpleNamespace(id=snowflake_at(at).id, author=human, channel=self, content="live")
+        self.messages.append(message)
+        return message
+
+    async def history(self, limit, before, after=None, oldest_first=True):
+        found = [m for m in self.messages if m.id < before.id and (after is None or m.id > after.id)]
+        if not oldest_first:
+            found.reverse()
+        for page in range(0, min(len(found), limit or len(found)), 100):
+            await asyncio.sleep(LATENCY)
+            for message in found[page:page + 100][:(limit or len(found)) - page]:
+                yield message
+
+
+channels = [FakeChannel(n, 150) for n in range(30)]
+staged = []
+reports = []
+
+
+async def stage(message):
+    staged.append(message)
+    return message.content.endswith("0")
+
+
+async def progress(result):
+    reports.append(result.done)
+
+
+# First run ever: the history holds requests from past events, so nothing is staged;
+# every channel is marked where the walk started.
+backfill = HistoryBackfill(path, concurrency=10, first_run_limit=120, clock=lambda: NOW)
+result = asyncio.run(backfill.run(channels, stage))
+assert (result.done, result.messages) == (30, 0) and staged == []
+assert backfill.marks == {channel.id: snowflake_at(NOW).id - 1 for channel in channels}
+assert backfill.checked == snowflake_at(NOW).id - 1
+
+# Channels new since an earlier run: only what they got since then, at most the last
+# first_run_limit messages of each, oldest first, concurrently.
+backfill = HistoryBackfill(None, concurrency=10, first_run_limit=120, clock=lambda: NOW)
+backfill.checked = channels[0].messages[0].id - 1
+start = time.perf_counter()
+result = asyncio.run(backfill.run(channels, stage, progress))
+elapsed = time.perf_counter() - start
+print(f"{len(channels)} channels backfilled in {elapsed:.2f}s")
+assert (result.channels, result.done, result.failed, result.messages) == (30, 30, 0, 30 * 120)
+assert len(staged) == 30 * 108                      # bot messages are skipped
+assert result.staged == 30 * 12
+first = [message.id for message in staged if message.channel is channels[0]]
+assert first == sorted(first) == [m.id for m in channels[0].messages[30:] if not m.author.bot]
+assert reports == list(range(1, 31))
+assert elapsed < 30 * 2 * LATENCY                   # sequential would take 30 × 2 pages
+assert backfill.marks[0] == snowflake_at(NOW).id - 1
+backfill.checked = channels[0].messages[100].id
+assert asyncio.run(backfill.run([FakeChannel(40, 150)], stage)).messages == 49
+zero = HistoryBackfill(None, first_run_limit=0, clock=lambda: NOW)
+zero.checked = channels[0].messages[0].id - 1
+assert asyncio.run(zero.run([FakeChannel(41, 150)], stage)).messages == 0      # 0 turns it off
+
+# Next start: only what was posted after the mark, and the marks survived the restart.
+posted = channels[3].post(NOW + 10)
+later = channels[3].post(NOW + 30)
+staged.clear()
+backfill = HistoryBackfill(path, concurrency=10, clock=lambda: NOW + 20)
+result = asyncio.run(backfill.run(channels, stage))
+assert staged == [posted] and result.messages == 1       # `later` is newer than the walk
+
+# Marks saved in the old format (no "checked") still load.
+old = Path(tempfile.mkdtemp()) / "backfill_marks.json"
+old.write_text('{"3": 100, "4": 250}', encoding="utf-8")
+restored = HistoryBackfill(old)
+assert restored.marks == {3: 100, 4: 250} and restored.checked == 250
+
+# A live message arriving during the walk does not make it skip what came before.
+backfill = HistoryBackfill(None, concurrency=1, clock=lambda: NOW + 60)
+backfill.marks = {3: posted.id, 4: channels[4].messages[-1].id}
+channels[4].post(NOW + 40)
+live_id = snowflake_at(NOW + 61).id          # live messages are newer than the walk's start
+
+
+async def stage_with_live_message(message):
+    backfill.advance(3, live_id)              # channel 3 gets a live message meanwhile
+    return await stage(message)
+
+staged.clear()
+asyncio.run(backfill.run([channels[4], channels[3]], stage_with_live_message))
+assert staged[-1] is later and backfill.marks[3] == live_id
+
+
+# A channel that cannot be read is counted, the others still go through.
+class Forbidden(FakeChannel):
+    async def history(self, **kwargs):
+        raise RuntimeError("403 Forbidden")
+        yield
+
+backfill = HistoryBackfill(None, clock=lambda: NOW)
+backfill.marks = {99: 1}
+result = asyncio.run(backfill.run([Forbidden(99, 0), Forbidden(98, 0), channels[0]], stage))
+assert (result.done, result.failed) == (3, 1)
+# ...the failed one keeps its mark, and the next run does not take the walk as complete
+assert backfill.marks[99] == 1 and backfill.checked is None and 98 in backfill.marks
+print("backfill OK")
@@ -38,3 +38,29 @@ for t, l in canciones:
 
 buffer.apply_to(queue)
 buffer.apply_to(queue)
+
+
+# Staging operations keep the arrival order, even across teams and replacements.
+buffer = QueueBuffer()
+buffer.set_dispatch_number(10)
+for t, l in [("equipo1", "a"), ("equipo2", "b"), ("equipo1", "c"), ("equipo3", "d")]:
+    assert buffer.add_song(t, l)["success"]
+assert not buffer.add_song("equipo1", "a")["success"]
+assert buffer.replace_song("equipo1", "a", "a2")["success"]
+assert buffer.replace_song("equipo1", "c", "a2")["warning_type"] == "repeated_song"
+assert buffer.delete_song("equipo2", "b")["success"]
+assert buffer.delete_song("equipo2", "b")["warning_type"] == "delete_dispatched_song"
+assert len(buffer) == 3
+
+dispatched = buffer.apply_to(QueueManager())
+assert [(s.team, s.video_id) for s in dispatched] == [("equipo1", "a2"), ("equipo3", "d"), ("equipo1", "c")]
+assert len(buffer) == 0
+
+
+# Song entries round-trip through JSON, and entries written before SongEntry still load.
+from services.queue.song_entry import SongEntry, decode_songs, encode_songs
+
+assert decode_songs(encode_songs(dispatched)) == dispatched
+legacy = SongEntry.from_dict({"team": "equipo1", "link": "https://youtu.be/dQw4w9WgXcQ?si=x", "timestamp": "2025-04-29 15:30"})
+assert legacy == SongEntry("equipo1", "dQw4w9WgXcQ", 1745940600)
+assert legacy.display_time() == "2025-04-29 15:30"
@@ -0,0 +1,52 @@
+import asyncio
+from types import SimpleNamespace
+
+from bot.channels import ChannelClassifier, ChannelKind, channel_key
+
+
+config = {
+    "monitored_category": "KARAPARTY",
+    "monitored_channels": ["🎤equipo︱13︱", "🎤equipo︱14︱"],
+    "free_talk_channels": ["💬︱charla"],
+    "presentation_channel": "✋︱presentación",
+    "managment": "managment",
+}
+karaoke = SimpleNamespace(id=1, name="KARAPARTY", type="category")
+lobby = SimpleNamespace(id=2, name="LOBBY", type="category")
+
+
+def channel(channel_id, name, category=karaoke):
+    return SimpleNamespace(id=channel_id, name=name, category=category, type="text")
+
+
+# One prefix rule: team channels match by "<name>︱<number>︱", the rest by full name.
+assert channel_key("🎤equipo︱13︱los_gatos") == "🎤equipo︱13︱"
+assert channel_key("🎤equipo︱13︱los︱gatos") == "🎤equipo︱13︱"
+assert channel_key("🎤equipo︱13︱") == "🎤equipo︱13︱"
+assert channel_key("💬︱charla") == "💬︱charla"
+assert channel_key("🎤equipo︱trece︱x") == "🎤equipo︱trece︱x"
+
+kinds = ChannelClassifier(config)
+team = channel(10, "🎤equipo︱13︱los︱gatos")
+assert kinds.kind(team) is ChannelKind.MONITORED
+assert kinds.kind(channel(11, "💬︱charla")) is ChannelKind.FREE_TALK
+assert kinds.kind(channel(12, "random")) is ChannelKind.GUARDED
+assert kinds.kind(channel(13, "🎤equipo︱13︱x", category=lobby)) is ChannelKind.IGNORED
+assert kinds.kind(channel(14, "✋︱presentación", category=lobby)) is ChannelKind.PRESENTATION
+assert kinds.kind(channel(15, "✋︱presentación", category=None)) is ChannelKind.IGNORED
+assert kinds.kind(channel(16, "managment", category=None)) is ChannelKind.MANAGEMENT
+assert kinds.kind(SimpleNamespace(id=17)) is ChannelKind.IGNORED          # DM
+
+# Cached by ID: a renamed channel keeps its kind until the update event arrives.
+team.name = "🎤equipo︱99︱los_gatos"
+assert kinds.kind(team) is ChannelKind.MONITORED
+asyncio.run(kinds.on_guild_channel_update(None, team))
+assert kinds.kind(team) is ChannelKind.GUARDED
+
+# Renaming the category changes every channel under it.
+assert kinds.kind(channel(11, "💬︱charla")) is ChannelKind.FREE_TALK
+karaoke.name = "ARCHIVO"
+asyncio.run(kinds.on_guild_channel_update(None, karaoke))
+assert kinds.kind(channel(11, "💬︱charla")) is ChannelKind.IGNORED
+
+print("channel kinds OK")
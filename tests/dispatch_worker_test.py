@@ -0,0 +1,168 @@
+import asyncio
+import threading
+import time
+
+from services.dispatch_worker import DispatchWorker
+from services.queue.queue_buffer import QueueBuffer
+from services.queue.song_entry import SongEntry
+from utils.rate_limit import TokenBucket
+
+
+SONGS = 50
+INSERT_SECONDS = 0.02       # blocking time of one fake playlistItems.insert
+RATE = 100                  # inserts per second allowed by the bucket
+
+
+class FakePlaylist:
+    """Local stand-in for the YouTube playlist: a blocking insert, like the Google client."""
+
+    def __init__(self):
+        self.items = []
+        self.threads = set()
+
+    def add_video_to_playlist(self, video_id):
+        time.sleep(INSERT_SECONDS)
+        self.threads.add(threading.current_thread().name)
+        self.items.append(video_id)
+        return {"id": f"item-{len(self.items)}"}
+
+
+async def on_message_probe(buffer, done, lags):
+    """Stands in for EventCog.on_message: stage a song every 5 ms and record how late it ran."""
+    n = 0
+    while not done.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.005)
+        lags.append(time.perf_counter() - start - 0.005)
+        buffer.add_song("equipo1", f"msg{n}")
+        n += 1
+
+
+async def run(blocking):
+    playlist = FakePlaylist()
+    results = []
+
+    async def on_result(song, response, error):
+        results.append((song.video_id, response, error))
+
+    worker = DispatchWorker(playlist.add_video_to_playlist, TokenBucket(RATE), on_result)
+    worker.start()
+
+    done, lags = asyncio.Event(), []
+    probe = asyncio.create_task(on_message_probe(QueueBuffer(), done, lags))
+    await asyncio.sleep(0.05)
+
+    songs = [SongEntry("equipo1", f"song{n}", 0) for n in range(SONGS)]
+    start = time.perf_counter()
+    if blocking:
+        # What dispatch_songs did before: the insert (and its pacing) on the event loop
+        for song in songs:
+            playlist.add_video_to_playlist(song.video_id)
+            time.sleep(1 / RATE)
+    else:
+        for song in songs:
+            worker.submit(song)
+        while len(results) < SONGS:
+            await asyncio.sleep(0.01)
+    elapsed = time.perf_counter() - start
+
+    done.set()
+    await probe
+    await worker.stop()
+    return playlist, results, lags, elapsed
+
+
+playlist, results, lags, elapsed = asyncio.run(run(blocking=False))
+print(f"worker:   {SONGS} songs in {elapsed:.2f}s, on_message lag max {max(lags) * 1e3:.1f} ms")
+
+# Every song reached the playlist, in dispatch order, off the event loop thread
+assert playlist.items == [f"song{n}" for n in range(SONGS)]
+assert [video_id for video_id, _, _ in results] == playlist.items
+assert all(error is None for _, _, error in results)
+assert playlist.threads and threading.main_thread().name not in playlist.threads
+# The bucket paced the inserts
+assert elapsed >= (SONGS - 1) / RATE
+# ...while the loop kept serving messages with no stall longer than a couple of inserts
+assert max(lags) < 0.1, max(lags)
+
+_, _, blocking_lags, _ = asyncio.run(run(blocking=True))
+print(f"blocking: on_message lag max {max(blocking_lags) * 1e3:.1f} ms")
+assert max(blocking_lags) > SONGS * INSERT_SECONDS
+
+
+# Failures are reported through the callback and do not stop the worker.
+async def failing():
+    calls, results = [], []
+
+    def insert(video_id):
+        calls.append(video_id)
+        if video_id == "bad":
+            raise RuntimeError("quotaExceeded")
+        return {"id": video_id}
+
+    async def on_result(song, response, error):
+        results.append((song.video_id, error))
+
+    worker = DispatchWorker(insert, on_result=on_result)
+    worker.start()
+    for video_id in ("a", "bad", "c"):
+        worker.submit(SongEntry("equipo1", video_id, 0))
+    await worker.stop()
+    return calls, results
+
+calls, results = asyncio.run(failing())
+assert calls == ["a", "bad", "c"]
+assert [(v, type(e).__name__ if e else None) for v, e in results] == [("a", None), ("bad", "RuntimeError"), ("c", None)]
+
+
+# With a batch insert, the songs waiting together go out in one call, in order.
+async def batched():
+    singles, batches, results = [], [], []
+
+    def insert_many(video_ids):
+        batches.append(list(video_ids))
+        return [({"id": video_id}, None) for video_id in video_ids]
+
+    async def on_result(song, response, error):
+        results.append(response["id"])
+
+    worker = DispatchWorker(singles.append, on_result=on_result, insert_many=insert_many, batch_size=4)
+    worker.start()
+    for n in range(6):
+        worker.submit(SongEntry("equipo1", f"s{n}", 0))
+    await worker.stop()
+    return singles, batches, results
+
+singles, batches, results = asyncio.run(batched())
+assert singles == [] and batches == [["s0", "s1", "s2", "s3"], ["s4", "s5"]]
+assert results == [f"s{n}" for n in range(6)]
+
+
+
+# A result callback that raises for one song does not cost the rest of its batch their results.
+async def failing_callback():
+    reported = []
+
+    async def on_result(song, response, error):
+        if song.video_id == "s1":
+            raise RuntimeError("retry queue unavailable")
+        reported.append(song.video_id)
+
+    worker = DispatchWorker(lambda video_id: None, on_result=on_result,
+                            insert_many=lambda video_ids: [({}, None) for _ in video_ids], batch_size=4)
+    worker.start()
+    for n in range(4):
+        worker.submit(SongEntry("equipo1", f"s{n}", 0))
+    await worker.stop()
+    return reported
+
+assert asyncio.run(failing_callback()) == ["s0", "s2", "s3"]
+
+# Token bucket: bursts up to capacity, then the configured rate.
+now = [0.0]
+bucket = TokenBucket(rate=2, capacity=3, clock=lambda: now[0])
+assert [bucket.try_acquire() for _ in range(4)] == [True, True, True, False]
+assert bucket.delay() == 0.5
+now[0] += 0.5
+assert bucket.try_acquire() and not bucket.try_acquire()
+print("dispatch worker OK")
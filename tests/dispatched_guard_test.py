@@ -0,0 +1,75 @@
+import random
+
+from services.queue.dispatched_guard import BloomFilter, DispatchedGuard
+
+ALPHABET = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_"
+LAST = "AEIMQUYcgkosw048"       # a video ID's 11th character only carries 2 bits
+
+rng = random.Random(6)
+
+
+def random_id() -> str:
+    return "".join(rng.choice(ALPHABET) for _ in range(10)) + rng.choice(LAST)
+
+
+# Exact, unbounded: what was added is found, per team; duplicates count once.
+guard = DispatchedGuard()
+guard.add("equipo1", "dQw4w9WgXcQ")
+guard.add("equipo1", "dQw4w9WgXcQ")
+guard.add("equipo2", "cancion1")                  # not a video ID (test data): kept as is
+assert ("equipo1", "dQw4w9WgXcQ") in guard and ("equipo2", "cancion1") in guard
+assert ("equipo2", "dQw4w9WgXcQ") not in guard and ("equipo3", "cancion1") not in guard
+assert len(guard) == 2 and sorted(guard) == [("equipo1", "dQw4w9WgXcQ"), ("equipo2", "cancion1")]
+guard.reset()
+assert len(guard) == 0 and ("equipo1", "dQw4w9WgXcQ") not in guard
+
+# Windowed without a Bloom tier: the oldest entries are evicted and forgotten.
+entries = [(f"equipo{n % 3}", random_id()) for n in range(10)]
+guard = DispatchedGuard(recent_window=4)
+for entry in entries:
+    guard.add(*entry)
+assert len(guard) == 4 and guard.evicted == 6
+assert list(guard) == entries[-4:]                # oldest first
+assert all(entry in guard for entry in entries[-4:])
+assert not any(entry in guard for entry in entries[:6])
+
+# Windowed with a Bloom tier: evicted entries are still found, so no repeated song gets
+# through; songs never dispatched are rarely (false positives) taken for repeated.
+entries = [(f"equipo{n % 20}", random_id()) for n in range(5000)]
+guard = DispatchedGuard(recent_window=500, bloom_capacity=5000, bloom_error_rate=0.01)
+for entry in entries:
+    guard.add(*entry)
+assert len(guard) == 500 and guard.evicted == 4500
+assert all(entry in guard for entry in entries)   # no false negatives, in either tier
+unseen = [(f"equipo{n % 20}", random_id()) for n in range(5000)]
+false_hits = sum(entry in guard for entry in unseen)
+assert false_hits < 5000 * 0.03, false_hits
+
+# The Bloom filter alone: sized from capacity and error rate, never a false negative.
+bloom = BloomFilter(1000, 0.001)
+assert bloom.size_bits >= 14000 and bloom.hashes == 10
+for team, video_id in entries[:1000]:
+    bloom.add(team, video_id)
+assert all(entry in bloom for entry in entries[:1000])
+for bad in ((0, 0.01), (10, 0), (10, 1)):
+    try:
+        BloomFilter(*bad)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError(bad)
+
+# Snapshots keep both tiers; a Bloom tier of another size is not loaded into this one.
+restored = DispatchedGuard.from_config({"recent_window": 500, "bloom_capacity": 5000, "bloom_error_rate": 0.01})
+restored.load_state(guard.to_state())
+assert list(restored) == list(guard) and restored.evicted == 4500
+assert all(entry in restored for entry in entries)
+resized = DispatchedGuard(recent_window=500, bloom_capacity=100)
+resized.load_state(guard.to_state())
+assert list(resized) == list(guard) and not all(entry in resized for entry in entries[:4500])
+
+# reset also empties the Bloom tier.
+guard.reset()
+assert guard.evicted == 0 and not any(entry in guard for entry in entries)
+
+print("dispatched guard OK")
@@ -0,0 +1,76 @@
+import asyncio
+from types import SimpleNamespace
+
+from bot.channels import ChannelClassifier, ChannelKind
+from bot.flood import FloodGuard
+from bot.router import MessageRouter
+
+
+class FakeChannel:
+    def __init__(self, channel_id):
+        self.id = channel_id
+        self.name = f"🎤equipo︱{channel_id}︱test"
+        self.category = SimpleNamespace(name="KARAPARTY")
+        self.bulk_deletes = []
+
+    async def delete_messages(self, messages):
+        self.bulk_deletes.append([message.id for message in messages])
+
+
+now = [0.0]
+warnings = []
+
+
+async def warn(user, channel):
+    warnings.append((user.id, channel.id))
+
+
+guard = FloodGuard(warn, rate=0.5, burst=3, flush_after=0.01, idle_after=60, clock=lambda: now[0])
+router = MessageRouter(ChannelClassifier({"monitored_category": "KARAPARTY", "monitored_channels": ["🎤equipo︱1︱"]}),
+                       guard)
+handled = []
+
+
+async def handle(message):
+    handled.append(message.id)
+
+router.route(ChannelKind.MONITORED, handle)
+channel = FakeChannel(1)
+spammer, other = SimpleNamespace(id=10, bot=False), SimpleNamespace(id=20, bot=False)
+
+
+def message(message_id, author):
+    return SimpleNamespace(id=message_id, author=author, channel=channel, content="x")
+
+
+async def scenario():
+    # A burst of 250 messages: the first 3 are handled, the rest go in bulk deletes of ≤ 100.
+    for n in range(250):
+        await router.dispatch(message(n, spammer))
+    await router.dispatch(message(1000, other))          # someone else is unaffected
+    await asyncio.sleep(0.05)
+    assert handled == [0, 1, 2, 1000]
+    assert [len(batch) for batch in channel.bulk_deletes] == [100, 100, 47]
+    assert warnings == [(10, 1)]
+    assert router.stats[ChannelKind.MONITORED].flooded == 247
+
+    # Tokens come back at `rate`; flooding again in the same episode is not warned twice.
+    now[0] += 2
+    await router.dispatch(message(300, spammer))
+    for n in range(301, 305):
+        await router.dispatch(message(n, spammer))
+    await asyncio.sleep(0.05)
+    assert handled[-1] == 300 and len(warnings) == 1
+    assert channel.bulk_deletes[-1] == [301, 302, 303, 304]
+
+    # Idle buckets are dropped as other traffic comes in; a later flood is warned again.
+    now[0] += 120
+    await router.dispatch(message(400, other))
+    assert len(guard) == 1
+    for n in range(500, 505):
+        await router.dispatch(message(n, spammer))
+    await guard.close()
+    assert len(warnings) == 2
+
+asyncio.run(scenario())
+print("flood guard OK")
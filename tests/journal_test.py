@@ -0,0 +1,113 @@
+import contextlib
+import io
+import json
+import tempfile
+
+from services.queue.journal import QueueJournal, _STOP
+from services.queue.queue_buffer import QueueBuffer
+from services.queue.queue_manager import QueueManager
+from services.queue.scheduling import make_policy
+
+
+def crash(journal):
+    """Stop the writer once everything recorded is on disk, without the final snapshot."""
+    journal._writes.put(_STOP)
+    journal._thread.join()
+
+
+def reopen(directory):
+    buffer, queue = QueueBuffer(), QueueManager()
+    journal = QueueJournal(directory, snapshot_every=10, fsync=False)
+    replayed = journal.recover(buffer, queue)
+    return journal, buffer, queue, replayed
+
+
+def state(buffer, queue):
+    queue_state = queue.to_state()
+    # without a window the guard is a set: its pairs come out in no particular order
+    queue_state["dispatched"]["recent"].sort()
+    return buffer.to_state(), queue_state
+
+
+directory = tempfile.mkdtemp()
+journal, buffer, queue, replayed = reopen(directory)
+assert replayed == 0 and len(buffer) == 0
+
+# A night: staged edits, a policy switch, two dispatch rounds, more staged songs.
+with contextlib.redirect_stdout(io.StringIO()):          # apply_to is chatty
+    for n in range(6):
+        buffer.add_song(f"equipo{n % 3}", f"{n:011d}")
+    buffer.replace_song("equipo0", f"{0:011d}", "dQw4w9WgXcQ")
+    buffer.delete_song("equipo1", f"{4:011d}")
+    queue.set_policy(make_policy("fair", {"quantum": 300}))
+    buffer.apply_to(queue)
+    for n in range(6, 9):
+        buffer.add_song("equipo3", f"{n:011d}")
+    buffer.apply_to(queue)
+    buffer.add_song("equipo4", "0zPjfX8PiGw")
+    buffer.add_song("equipo0", "0zPjfX8PiGw")
+crash(journal)
+
+# WAL replay after a snapshot: the snapshot holds the first operations, the log only the tail.
+snapshot = json.loads(journal.snapshot_path.read_text(encoding="utf-8"))
+tail = [json.loads(line) for line in journal.wal_path.read_text(encoding="utf-8").splitlines()]
+assert snapshot["seq"] > 0 and tail and all(record[0] > snapshot["seq"] for record in tail)
+assert tail[-1][0] == journal._seq
+
+journal, fresh_buffer, fresh_queue, replayed = reopen(directory)
+assert replayed == len(tail)
+assert state(fresh_buffer, fresh_queue) == state(buffer, queue)
+assert fresh_queue.policy.name == "fair" and fresh_queue.is_dispatched("dQw4w9WgXcQ", "equipo0")
+# recovery checkpoints what it replayed, so the next one starts from the snapshot alone
+crash(journal)
+assert journal.wal_path.read_text(encoding="utf-8") == ""
+journal, buffer, queue, replayed = reopen(directory)
+assert replayed == 0 and state(buffer, queue) == state(fresh_buffer, fresh_queue)
+
+# Truncated tail: a record torn by a crash mid-write is dropped, everything before it is kept.
+buffer.add_song("equipo5", "aaaaaaaaaaa")
+buffer.add_song("equipo5", "bbbbbbbbbbb")
+crash(journal)
+expected = state(buffer, queue)
+with journal.wal_path.open("a", encoding="utf-8") as wal:
+    wal.write(f'[{journal._seq + 1},"add","equipo5","ccc')
+journal, buffer, queue, replayed = reopen(directory)
+assert replayed == 2 and state(buffer, queue) == expected
+assert ("equipo5", "ccccccccccc") not in buffer._index
+
+# Log records already in the snapshot (a crash between the snapshot and the truncation) are skipped.
+journal.close()
+seq = json.loads(journal.snapshot_path.read_text(encoding="utf-8"))["seq"]
+with journal.wal_path.open("w", encoding="utf-8") as wal:
+    wal.write(json.dumps([seq, "add", "equipo6", "ddddddddddd"]) + "\n")
+    wal.write(json.dumps([seq + 1, "add", "equipo6", "eeeeeeeeeee"]) + "\n")
+journal, buffer, queue, replayed = reopen(directory)
+assert replayed == 1 and ("equipo6", "ddddddddddd") not in buffer._index
+assert ("equipo6", "eeeeeeeeeee") in buffer._index
+journal.close()
+
+# Round robin keeps a team in the rotation after its last song (it leaves on its next turn),
+# but the snapshot only has non-empty queues: dispatching after a restart must not trip on it.
+directory = tempfile.mkdtemp()
+journal, buffer, queue, _ = reopen(directory)
+buffer.set_dispatch_number(2)
+with contextlib.redirect_stdout(io.StringIO()):
+    buffer.add_song("t1", "dQw4w9WgXcQ")
+    buffer.add_song("t1", "aaaaaaaaaaa")
+    buffer.add_song("t2", "0zPjfX8PiGw")
+    assert [s.team for s in buffer.apply_to(queue)] == ["t1", "t2"]
+assert list(queue.team_order) == ["t1", "t2"] and not queue.queues["t2"]
+journal.close()
+journal, buffer, queue, _ = reopen(directory)
+buffer.set_dispatch_number(2)
+with contextlib.redirect_stdout(io.StringIO()):
+    buffer.add_song("t3", "bbbbbbbbbbb")
+    assert [s.video_id for s in buffer.apply_to(queue)] == ["aaaaaaaaaaa", "bbbbbbbbbbb"]
+# ...nor replaying those dispatches from the log on top of that snapshot after a crash.
+crash(journal)
+expected = state(buffer, queue)
+journal, buffer, queue, replayed = reopen(directory)
+assert replayed > 0 and state(buffer, queue) == expected and queue.is_empty()
+journal.close()
+
+print("journal OK")
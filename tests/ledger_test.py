@@ -0,0 +1,46 @@
+import tempfile
+from pathlib import Path
+
+from services.ledger import LedgerReader, SongLedger
+from services.queue.song_entry import SongEntry, decode_songs
+
+
+directory = Path(tempfile.mkdtemp())
+path = directory / "dispatched_songs.jsonl"
+songs = [SongEntry(f"equipo{n % 3}", f"video{n:05d}A", 1745940600 + n) for n in range(10)]
+
+# The old JSON file is migrated on first use.
+legacy = directory / "dispatched_songs.json"
+legacy.write_text('[{"team": "equipo9", "link": "https://www.youtube.com/watch?v=dQw4w9WgXcQ", "timestamp": "2025-04-29 15:30"}]')
+ledger = SongLedger(path, legacy_path=legacy, fsync=False)
+reader = LedgerReader(path)
+assert reader.refresh() == 1 and reader.songs == [SongEntry("equipo9", "dQw4w9WgXcQ", 1745940600)]
+
+# Appends only add lines; the reader only picks up the new ones.
+ledger.append(songs[:4])
+ledger.close()
+assert reader.refresh() == 4 and reader.refresh() == 0
+assert reader.since(3) == songs[2:4]
+
+# A torn last line is left for later by the reader and cleaned up by the next writer.
+with path.open("a", encoding="utf-8") as fh:
+    fh.write('{"team":"equipo1","video_id":"vid')
+assert reader.refresh() == 0
+ledger = SongLedger(path, legacy_path=None, fsync=False)
+ledger.append(songs[4:6])
+ledger.close()
+assert reader.refresh() == 2
+assert reader.songs[1:] == songs[:6]
+assert path.read_text(encoding="utf-8").count("\n") == 7
+
+# Repeated records are skipped by readers and dropped by compaction; positions hold.
+ledger = SongLedger(path, legacy_path=None, fsync=False, compact_after=2)
+ledger.append([songs[0], songs[6], songs[1]])
+ledger.close()
+assert path.read_text(encoding="utf-8").count("\n") == 8
+assert reader.refresh() == 1 and reader.songs[1:] == songs[:7]
+assert decode_songs("[" + ",".join(path.read_text(encoding="utf-8").splitlines()) + "]")[1:] == songs[:7]
+
+# A fresh reader sees the same order as one that followed along.
+assert LedgerReader(path).since(0) == reader.songs
+print("ledger OK")
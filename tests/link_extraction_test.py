@@ -0,0 +1,44 @@
+from services.link_manager import LinkManager
+from services.video_id import extract_video_ids, video_id_from_url
+from utils.validators import is_youtube_link
+
+VIDEO_ID = "0zPjfX8PiGw"
+
+# Every URL form gives the same canonical ID.
+forms = [
+    f"https://www.youtube.com/watch?v={VIDEO_ID}",
+    f"http://youtube.com/watch?v={VIDEO_ID}&list=PLabc&index=3",
+    f"https://www.youtube.com/watch?feature=share&v={VIDEO_ID}",
+    f"https://m.youtube.com/watch?v={VIDEO_ID}&t=42s",
+    f"https://music.youtube.com/watch?v={VIDEO_ID}&si=xyz",
+    f"https://youtube.com/shorts/{VIDEO_ID}?si=abc",
+    f"https://www.youtube.com/live/{VIDEO_ID}?si=abc",
+    f"https://www.youtube.com/embed/{VIDEO_ID}",
+    f"https://youtu.be/{VIDEO_ID}?si=jacWQmMQMga0Vmi9",
+    f"youtu.be/{VIDEO_ID}",
+    f"<https://youtu.be/{VIDEO_ID}>",
+]
+for url in forms:
+    assert extract_video_ids(url) == [VIDEO_ID], url
+    assert video_id_from_url(url) == VIDEO_ID, url      # YouTubeService / playlist_player
+    assert LinkManager().validate_message(f"mi canción: {url} 🎤") == (True, VIDEO_ID), url
+assert all(is_youtube_link(url) for url in forms) and not is_youtube_link(forms[0] + " " + forms[1])
+
+# Not YouTube, or not a full ID.
+for text in [
+    f"https://notyoutube.com/watch?v={VIDEO_ID}",
+    f"https://evil.youtube.com/watch?v={VIDEO_ID}",
+    "https://www.youtube.com/watch?v=tooShort",
+    f"https://www.youtube.com/watch?v={VIDEO_ID}X",
+    "https://www.youtube.com/channel/UCabcdefghijk",
+    "hola a todos",
+]:
+    assert extract_video_ids(text) == [], text
+    assert LinkManager().validate_message(text) == (False, None), text
+
+# One pass over the message, in order; a song request needs exactly one link.
+text = f"https://youtu.be/{VIDEO_ID} y https://m.youtube.com/watch?v=lV6ppJbzQQM"
+assert extract_video_ids(text) == [VIDEO_ID, "lV6ppJbzQQM"]
+assert LinkManager().validate_message(text) == (False, None)
+assert extract_video_ids(text)[0] is extract_video_ids(forms[8])[0]       # interned
+print("link extraction OK")
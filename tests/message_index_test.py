@@ -0,0 +1,40 @@
+import asyncio
+import tempfile
+from pathlib import Path
+
+from services.message_index import IndexedSong, MessageIndex
+
+
+path = Path(tempfile.mkdtemp()) / "message_index.json"
+
+# Bounded: the oldest messages are evicted first.
+index = MessageIndex(max_entries=3, path=path)
+for message_id in range(5):
+    index.add(message_id, "equipo1", f"video{message_id:05d}A", 42)
+assert len(index) == 3 and 0 not in index and 1 not in index
+assert index.get(4) == IndexedSong("equipo1", "video00004A", 42)
+
+# Edits re-point the message; deletes forget it.
+index.replace(3, "dQw4w9WgXcQ")
+assert index.get(3).video_id == "dQw4w9WgXcQ"
+assert index.pop(2).video_id == "video00002A" and index.pop(2) is None
+index.replace(2, "dQw4w9WgXcQ")       # unknown message: nothing to re-point
+assert 2 not in index
+
+# Saved on shutdown, restored on start (within the new bound).
+index.save()
+assert [index.get(m) for m in (3, 4)] == [MessageIndex(path=path).get(m) for m in (3, 4)]
+assert list(MessageIndex(max_entries=1, path=path)._songs) == [4]
+
+
+# On the event loop changes reach the file within save_delay, without a shutdown save (crash-safe).
+async def live():
+    index = MessageIndex(path=path, save_delay=0.05)
+    for message_id in range(100, 200):
+        index.add(message_id, "equipo2", "dQw4w9WgXcQ", 7)
+    await asyncio.sleep(0.3)
+    assert index._saver.writes == 1
+
+asyncio.run(live())
+assert MessageIndex(path=path).get(199) == IndexedSong("equipo2", "dQw4w9WgXcQ", 7)
+print("message index OK")
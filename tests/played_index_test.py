@@ -0,0 +1,53 @@
+import time
+
+from services.queue.played_index import PlayedIndex
+from services.queue.song_entry import SongEntry, decode_songs, encode_songs
+
+A, B = "0zPjfX8PiGw", "dQw4w9WgXcQ"
+dispatched = [SongEntry("equipo1", A, 100), SongEntry("equipo2", B, 110), SongEntry("equipo3", A, 120)]
+
+# Songs already played (in an earlier run) are not matched again.
+index = PlayedIndex(played=[dispatched[0]])
+assert index.update(dispatched) == 2 and len(index) == 2
+assert index.take(A).team == "equipo3"
+assert index.take(A) is None
+
+# Only songs past the ones seen are indexed; a video dispatched twice plays in dispatch order.
+dispatched += [SongEntry("equipo1", B, 130)]
+assert index.update(dispatched) == 1
+assert [index.take(B).team, index.take(B).team, index.take(B)] == ["equipo2", "equipo1", None]
+assert index.update(dispatched) == 0
+
+# A shorter list is a new ledger: reindexed, still without what was played.
+assert index.update([SongEntry("equipo2", B, 110), SongEntry("equipo4", A, 200)]) == 1
+assert index.take(A).team == "equipo4" and len(index) == 0
+
+# Matching stays O(1) with a long history (the old loop scanned dispatched × played).
+history = [SongEntry(f"equipo{n % 8}", f"{n:011d}", n) for n in range(4000)]
+played = history[:2000]
+start = time.perf_counter()
+for song in history[2000:2100]:
+    next(s for s in history if s.video_id == song.video_id and s not in played)
+scan = (time.perf_counter() - start) / 100
+
+index = PlayedIndex(played)
+index.update(history)
+start = time.perf_counter()
+for song in history[2000:4000]:
+    assert index.take(song.video_id) is song
+indexed = (time.perf_counter() - start) / 2000
+print(f"next song match: {scan * 1e3:.2f} ms scanning, {indexed * 1e6:.2f} µs indexed")
+assert indexed * 100 < scan
+
+# The played songs file: an entry that cannot be read is left out, not the whole history.
+played_file = encode_songs(dispatched[:2])[:-1] + ',{"team":"equipo9","link":"https://vimeo.com/1","timestamp":5}]'
+try:
+    decode_songs(played_file)
+    raise AssertionError("a non-YouTube link should not decode")
+except ValueError:
+    pass
+skipped = []
+assert decode_songs(played_file, on_invalid=lambda entry, error: skipped.append(entry)) == dispatched[:2]
+assert [entry["team"] for entry in skipped] == ["equipo9"]
+
+print("played index OK")
@@ -0,0 +1,60 @@
+import time
+
+from services.presentation_parser import PresentationParser
+
+parser = PresentationParser("Kai Timido Aprendiz", "Kai Oculto")
+
+# The full template, filled in: accepted with the extracted fields.
+TEMPLATE = """🎉 ¡Presentación BCNNokai! 🎉
+👤 Nombre / Nickname: Ana
+🌍 Ciudad o País de origen: Barcelona
+🎂 Edad: 27 años
+🔎 ¿Cómo conociste BCNNokai?: Por una amiga
+🎮 Juegos favoritos / Actividades de interés: Persona 5,
+karaoke y rol
+💼 Ocupación o Intereses:
+🕹️ Plataformas de juego favoritas: PC, Switch
+📺 Anime o Manga favorito: Frieren
+✨ Algo más que te gustaría compartir:"""
+result = parser.parse(TEMPLATE)
+assert result["is_valid"] and "Kai Timido Aprendiz" in result["output_message"]
+assert (result["name"], result["city"], result["age"]) == ("Ana", "Barcelona", 27)
+assert result["interest"] == "Persona 5, karaoke y rol"        # continuation lines are kept
+assert result["platform"] == "PC, Switch" and result["job"] is None and result["additional"] is None
+
+# Labels without emojis, other separators and formatting still count.
+result = parser.parse("Nombre - **Leo**\nEdad: 31\nCómo nos conociste: reddit\nAficiones: anime")
+assert result["is_valid"] and result["name"] == "Leo"
+
+# Template-shaped but incomplete, or a minor: rejected locally, saying why.
+result = parser.parse("👤 Nombre: Leo\n🎂 Edad: 30\n🔎 ¿Cómo conociste BCNNokai?:\n🎮 Juegos favoritos:")
+assert not result["is_valid"]
+assert "cómo nos conociste, intereses" in result["output_message"] and "jungla" in result["output_message"]
+result = parser.parse(TEMPLATE.replace("27 años", "16"))
+assert not result["is_valid"] and result["age"] == 16 and "mayores de edad" in result["output_message"]
+
+# The community, roles and channel named in the replies are the configured ones.
+other = PresentationParser("Aprendiz", "Oculto", community="OtraKai", hidden_channel="recepción")
+assert "Bienvenido/a a OtraKai, Ana" in other.parse(TEMPLATE)["output_message"]
+result = other.parse("👤 Nombre: Leo\n🎂 Edad: 30\n🔎 ¿Cómo conociste BCNNokai?:\n🎮 Juegos favoritos:")
+assert "sigues como Oculto y solo puedes usar el canal recepción" in result["output_message"]
+
+# Ambiguous: left to the LLM.
+assert parser.parse("Hola! Soy Marta, tengo 25 años y os encontré en Instagram. Me encanta el anime.") is None
+assert parser.parse(TEMPLATE.replace("27 años", "veintisiete")) is None          # age in words
+assert parser.parse(TEMPLATE.replace("27 años", "1994")) is None                 # year of birth
+assert parser.parse(TEMPLATE.replace("Edad: 27", "Edad 27")) is None             # label not split
+assert parser.parse("👤 Nombre: Ana\nMe gusta el karaoke") is None               # too few labels
+
+assert (parser.resolved, parser.escalated) == (4, 5)
+assert parser.describe().startswith("4 presentation(s) decided locally, 5 sent to the LLM (44% local)")
+
+# A local decision takes microseconds, not an API round-trip.
+start = time.perf_counter()
+for _ in range(1000):
+    parser.parse(TEMPLATE)
+per_message = (time.perf_counter() - start) / 1000
+print(f"local decision: {per_message * 1e6:.1f} µs")
+assert per_message < 5e-3
+
+print("presentation parser OK")
@@ -0,0 +1,96 @@
+import asyncio
+from types import SimpleNamespace
+
+from bot.resolver import GuildResolver
+
+
+class FakeGuild:
+    """Stand-in for discord.Guild: channels and roles, with the ID lookups the resolver uses."""
+
+    def __init__(self, guild_id):
+        self.id = guild_id
+        self.channels = []
+        self.roles = []
+
+    def get_role(self, role_id):
+        return next((role for role in self.roles if role.id == role_id), None)
+
+
+class FakeBot:
+    def __init__(self, *guilds):
+        self.guilds = list(guilds)
+        self.listeners = {}
+
+    def add_listener(self, func, name):
+        self.listeners[name] = func
+
+    def get_channel(self, channel_id):
+        for guild in self.guilds:
+            for channel in guild.channels:
+                if channel.id == channel_id:
+                    return channel
+        return None
+
+    def dispatch(self, event, *args):
+        asyncio.run(self.listeners[event](*args))
+
+
+def channel(guild, channel_id, name, kind="text"):
+    created = SimpleNamespace(id=channel_id, name=name, guild=guild, type=kind)
+    guild.channels.append(created)
+    return created
+
+
+def role(guild, role_id, name):
+    created = SimpleNamespace(id=role_id, name=name, guild=guild)
+    guild.roles.append(created)
+    return created
+
+
+guild_a, guild_b = FakeGuild(1), FakeGuild(2)
+bot = FakeBot(guild_a, guild_b)
+resolver = GuildResolver(bot)
+resolver.register()
+
+voice = channel(guild_a, 10, "anuncios", kind="voice")
+announcements_a = channel(guild_a, 11, "anuncios")
+output_b = channel(guild_b, 20, "cola")
+host = role(guild_a, 100, "Host")
+
+# Lookups by name, globally or per guild; first match wins, like discord.utils.get.
+assert resolver.channel("cola") is output_b
+assert resolver.channel("anuncios") is voice
+assert resolver.channel("anuncios", guild_a, text_only=True) is announcements_a
+assert resolver.channel("cola", guild_a) is None
+assert resolver.role(guild_a, "Host") is host and resolver.role(guild_b, "Host") is None
+
+# Renames move the entry; the old name no longer resolves.
+renamed = SimpleNamespace(id=20, name="fila", guild=guild_b, type="text")
+guild_b.channels[0] = renamed
+bot.dispatch("on_guild_channel_update", output_b, renamed)
+assert resolver.channel("cola") is None and resolver.channel("fila") is renamed
+
+renamed_role = SimpleNamespace(id=100, name="Presentador", guild=guild_a)
+guild_a.roles[0] = renamed_role
+bot.dispatch("on_guild_role_update", host, renamed_role)
+assert resolver.role(guild_a, "Host") is None and resolver.role(guild_a, "Presentador") is renamed_role
+
+# Creates and deletes.
+created = channel(guild_b, 21, "cola")
+bot.dispatch("on_guild_channel_create", created)
+assert resolver.channel("cola") is created
+guild_b.channels.remove(created)
+bot.dispatch("on_guild_channel_delete", created)
+assert resolver.channel("cola") is None
+
+bot.dispatch("on_guild_role_create", role(guild_a, 101, "Host"))
+assert resolver.role(guild_a, "Host").id == 101
+bot.dispatch("on_guild_role_delete", guild_a.roles.pop())
+assert resolver.role(guild_a, "Host") is None
+
+# Leaving a guild drops its names from the global index.
+bot.guilds.remove(guild_b)
+bot.dispatch("on_guild_remove", guild_b)
+assert resolver.channel("fila") is None and resolver.channel("anuncios") is voice
+
+print("resolver OK")
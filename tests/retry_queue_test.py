@@ -0,0 +1,81 @@
+import asyncio
+import tempfile
+from pathlib import Path
+
+from services.dispatch_worker import DispatchWorker
+from services.queue.song_entry import SongEntry
+from services.retry_queue import RetryQueue
+
+
+directory = Path(tempfile.mkdtemp())
+now = [1_000_000.0]
+
+
+def make_queue():
+    return RetryQueue(directory / "outbox.json", directory / "dead.jsonl",
+                      max_attempts=3, base_delay=10, max_delay=15, clock=lambda: now[0])
+
+
+song = SongEntry("equipo1", "dQw4w9WgXcQ", 0)
+other = SongEntry("equipo2", "aaaaaaaaaaA", 0)
+
+# Tracked songs are durable until resolved; a restart makes in-flight songs due again.
+retries = make_queue()
+retries.track(song)
+retries.track(other)
+retries.resolve(other)
+assert len(retries) == 1 and retries.due() == []
+retries = make_queue()
+assert retries.due() == [(song, 1_000_000.0)]
+assert retries.due() == []          # now in flight
+
+# Bounded exponential backoff, then the dead letters.
+delays = []
+for _ in range(2):
+    delays.append(retries.fail(song, RuntimeError("503 backendError")))
+    now[0] += delays[-1]
+    assert [s for s, _ in retries.due()] == [song]
+assert 5 <= delays[0] <= 10 and 7.5 <= delays[1] <= 15
+assert retries.fail(song, RuntimeError("503 backendError")) is None
+assert len(retries) == 0
+letters = retries.dead_letters()
+assert [(l["song"], l["attempts"], l["error"]) for l in letters] == [(song, 3, "503 backendError")]
+
+# Errors that retrying cannot fix go straight to the dead letters.
+tracked_at = now[0]
+retries.track(other)
+assert retries.fail(other, RuntimeError("videoNotFound"), retryable=False) is None
+assert [l["song"] for l in make_queue().dead_letters()] == [song, other]
+
+# Re-driving moves dead letters back, due at once, with their first-attempt time.
+retries = make_queue()
+assert retries.redrive([1]) == [other]
+assert [l["song"] for l in retries.dead_letters()] == [song]
+assert retries.due() == [(other, tracked_at)]
+assert retries.redrive() == [song] and retries.dead_letters() == []
+
+
+# The worker sends retries through the playlist-checking insert, in order with new songs.
+async def mixed():
+    calls = []
+
+    def insert_many(video_ids):
+        calls.append(("batch", list(video_ids)))
+        return [({}, None) for _ in video_ids]
+
+    def reinsert(video_id, since):
+        calls.append(("once", video_id, since))
+        return {}
+
+    worker = DispatchWorker(lambda video_id: calls.append(("single", video_id)),
+                            insert_many=insert_many, reinsert=reinsert)
+    worker.start()
+    worker.submit(SongEntry("equipo1", "n1", 0))
+    worker.submit(SongEntry("equipo1", "n2", 0))
+    worker.submit(song, 123.0)
+    worker.submit(SongEntry("equipo1", "n3", 0))
+    await worker.stop()
+    return calls
+
+assert asyncio.run(mixed()) == [("batch", ["n1", "n2"]), ("once", song.video_id, 123.0), ("single", "n3")]
+print("retry queue OK")
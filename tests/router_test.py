@@ -0,0 +1,58 @@
+import asyncio
+from types import SimpleNamespace
+
+from bot.channels import ChannelClassifier, ChannelKind
+from bot.router import MessageRouter
+
+
+kinds = ChannelClassifier({
+    "monitored_category": "KARAPARTY",
+    "monitored_channels": ["🎤equipo︱13︱"],
+    "free_talk_channels": ["💬︱charla"],
+    "managment": "managment",
+})
+karaoke = SimpleNamespace(name="KARAPARTY")
+team = SimpleNamespace(id=1, name="🎤equipo︱13︱x", category=karaoke)
+free_talk = SimpleNamespace(id=2, name="💬︱charla", category=karaoke)
+other = SimpleNamespace(id=3, name="random", category=karaoke)
+human, bot = SimpleNamespace(bot=False), SimpleNamespace(bot=True)
+
+router = MessageRouter(kinds)
+seen = []
+
+
+async def team_handler(message):
+    seen.append(("team", message.channel.id))
+
+
+async def guard_handler(message):
+    raise RuntimeError("boom")
+
+
+router.route(ChannelKind.MONITORED, team_handler)
+router.route(ChannelKind.GUARDED, guard_handler)
+
+
+async def stream():
+    await router.dispatch(SimpleNamespace(author=human, channel=team))
+    await router.dispatch(SimpleNamespace(author=bot, channel=team))        # bots are dropped
+    await router.dispatch(SimpleNamespace(author=human, channel=free_talk))  # no route
+    try:
+        await router.dispatch(SimpleNamespace(author=human, channel=other))
+    except RuntimeError:
+        pass
+    else:
+        raise AssertionError("handler errors must propagate")
+
+asyncio.run(stream())
+assert seen == [("team", 1)]
+assert router.stats[ChannelKind.MONITORED].calls == 1
+assert (router.stats[ChannelKind.GUARDED].calls, router.stats[ChannelKind.GUARDED].errors) == (1, 1)
+assert ChannelKind.FREE_TALK not in router.stats
+assert len(router.describe()) == 2
+
+# A cog unloading stops its route.
+router.unroute(ChannelKind.MONITORED)
+asyncio.run(router.dispatch(SimpleNamespace(author=human, channel=team)))
+assert seen == [("team", 1)]
+print("router OK")
@@ -0,0 +1,93 @@
+from collections import deque
+
+from services.queue.scheduling import DeficitRoundRobinPolicy, RoundRobinPolicy, make_policy
+from services.queue.song_entry import SongEntry
+
+
+def queued(durations):
+    """Per-team queues of songs with the given durations (None: unknown)."""
+    return {team: deque(SongEntry(team, f"{team}{n:08d}"[:11], n, d) for n, d in enumerate(songs))
+            for team, songs in durations.items()}
+
+
+def run(policy, queues, limit=None):
+    for team in queues:
+        policy.activate(team)
+    order = []
+    while limit is None or len(order) < limit:
+        song = policy.select(queues)
+        if song is None:
+            break
+        order.append(song)
+    return order
+
+
+# Round robin: one song per team per turn, however long; emptied teams leave the rotation.
+order = run(RoundRobinPolicy(), queued({"a": [600, 600], "b": [60, 60, 60], "c": [60]}))
+assert [s.team for s in order] == ["a", "b", "c", "a", "b", "b"]
+
+# DRR quanta: a team sings while its next song fits in its credit, and carries the rest over.
+policy = DeficitRoundRobinPolicy(quantum=300)
+queues = queued({"a": [200, 200, 200], "b": [500, 100]})
+assert [(s.team, s.duration) for s in run(policy, queues, limit=2)] == [("a", 200), ("a", 200)]
+assert policy.deficit == {"a": 200.0, "b": 300.0} and list(policy.team_order) == ["a", "b"]
+# (a: 300 - 200 = 100, too little for the next; b: 300 < 500, skipped; a: 100 + 300 - 200 = 200)
+assert [(s.team, s.duration) for s in run(policy, queues)] == [("a", 200), ("b", 500), ("b", 100)]
+assert policy.select(queues) is None and not policy.team_order and policy.deficit == {}
+
+# Unknown durations cost the default; a team that runs out of songs loses its credit.
+policy = DeficitRoundRobinPolicy(quantum=300, default_duration=240)
+queues = queued({"a": [None], "b": [100]})
+assert [s.team for s in run(policy, queues, limit=1)] == ["a"] and "a" not in policy.deficit
+queues["a"].append(SongEntry("a", "a0000000009", 9, 50))
+policy.activate("a")
+assert policy.deficit["a"] == 0.0
+
+# Fairness across teams of different sizes: a team with many long songs gets the same
+# airtime as one with a few short ones while both are waiting, not one song each.
+queues = queued({"big": [420] * 40, "small": [90] * 12, "solo": [200] * 3})
+left = {team: len(queue) for team, queue in queues.items()}
+order = run(DeficitRoundRobinPolicy(quantum=300), queues)
+assert len(order) == 55
+airtime = dict.fromkeys(left, 0.0)
+for song in order:
+    if not all(left.values()):
+        break
+    airtime[song.team] += song.duration
+    left[song.team] -= 1
+    # while everyone is waiting, nobody is ahead by more than a quantum plus a song
+    assert max(airtime.values()) - min(airtime.values()) <= 300 + 420, airtime
+served = [s.team for s in order[:12]]
+assert served.count("small") > served.count("big")        # plain round robin would alternate 1:1
+
+# Round robin on the same queues gives the long songs several times the airtime.
+order = run(RoundRobinPolicy(), queued({"big": [420] * 40, "small": [90] * 12}), limit=20)
+big = sum(s.duration for s in order if s.team == "big")
+small = sum(s.duration for s in order if s.team == "small")
+assert big > 4 * small
+
+# Weights scale the quantum: weight 2 gets twice the airtime.
+policy = make_policy("fair", {"quantum": 300, "team_weights": {"vip": 2}})
+order = run(policy, queued({"vip": [100] * 60, "std": [100] * 60}), limit=54)      # 6 turns each
+assert [s.team for s in order].count("vip") == 2 * [s.team for s in order].count("std") == 36
+
+# The rotation and the credit survive a snapshot: the restored policy continues identically.
+songs = {"a": [250, 250, 250, 250], "b": [100] * 6, "c": [400, 400]}
+reference = run(DeficitRoundRobinPolicy(quantum=300), queued(songs))
+policy = DeficitRoundRobinPolicy(quantum=300)
+queues = queued(songs)
+first = run(policy, queues, limit=5)
+restored = make_policy("fair", policy.to_config())
+restored.load_state(policy.to_state())
+assert first + run(restored, queues) == reference
+
+# Bad settings are refused.
+for bad in ({"quantum": -1}, {"default_duration": 0}, {"weights": {"a": 0}}):
+    try:
+        DeficitRoundRobinPolicy(**bad)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError(bad)
+
+print("scheduling OK")
@@ -0,0 +1,63 @@
+import asyncio
+import json
+import tempfile
+import threading
+from pathlib import Path
+
+from utils.state_file import DebouncedSave, load_json, save_json
+
+directory = Path(tempfile.mkdtemp())
+
+# Atomic JSON files; a missing or unreadable one reads as nothing stored.
+save_json(directory / "state" / "a.json", {"b": "ñ"})
+assert load_json(directory / "state" / "a.json", "Test state") == {"b": "ñ"}
+assert not (directory / "state" / "a.tmp").exists()
+(directory / "broken.json").write_text("{not json", encoding="utf-8")
+assert load_json(directory / "broken.json", "Test state") is None
+assert load_json(directory / "missing.json", "Test state") is None and load_json(None, "Test state") is None
+
+# Without an event loop every save is written at once.
+state = {"n": 0}
+saver = DebouncedSave(directory / "counter.json", lambda: dict(state), delay=0.05)
+saver.request()
+assert load_json(saver.path, "Test state") == {"n": 0} and saver.writes == 1
+
+
+async def burst():
+    loop_thread = threading.current_thread()
+    writers = []
+
+    def snapshot():
+        writers.append(threading.current_thread())
+        return dict(state)
+
+    saver = DebouncedSave(directory / "burst.json", snapshot, delay=0.05)
+    # A burst of changes: one write, made after the delay.
+    for n in range(1000):
+        state["n"] = n
+        saver.request()
+    assert saver.writes == 0
+    await asyncio.sleep(0.2)
+    assert saver.writes == 1 and json.loads(saver.path.read_text()) == {"n": 999}
+    assert writers == [loop_thread]         # the state is taken on the loop; only the file I/O is not
+
+    # Changes made while a write is in flight are written after it, never lost or reordered.
+    state["n"] = 1000
+    saver.request()
+    await asyncio.sleep(0.06)
+    state["n"] = 1001
+    saver.request()
+    await asyncio.sleep(0.2)
+    assert json.loads(saver.path.read_text()) == {"n": 1001}
+
+    # flush writes what is pending right away.
+    state["n"] = 1002
+    saver.request()
+    await saver.flush()
+    assert json.loads(saver.path.read_text()) == {"n": 1002}
+    writes = saver.writes
+    await asyncio.sleep(0.1)
+    assert saver.writes == writes
+
+asyncio.run(burst())
+print("state file OK")
@@ -0,0 +1,54 @@
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+
+from services.validation_cache import ValidationCache
+
+path = Path(tempfile.mkdtemp()) / "validation_cache.json"
+now = [1_000_000.0]
+INSTRUCTION = "Tu nombre es Kai..."
+TEXT = "👤 Nombre: Ana\n🎂 Edad: 27\n🔎 ¿Cómo conociste BCNNokai?: un amigo"
+RESULT = {"name": "Ana", "age": 27, "is_valid": True, "output_message": "¡Bienvenida!"}
+
+cache = ValidationCache(path, max_entries=2, ttl=3600, clock=lambda: now[0])
+assert cache.get(INSTRUCTION, TEXT) is None
+cache.put(INSTRUCTION, TEXT, RESULT)
+
+# Re-posts with other case or spacing hit; real edits and other instructions miss.
+assert cache.get(INSTRUCTION, "  " + TEXT.upper().replace("\n", "\n\n ")) == RESULT
+assert cache.get(INSTRUCTION, TEXT.replace("27", "28")) is None
+assert cache.get("otra instrucción", TEXT) is None
+assert (cache.hits, cache.misses) == (1, 3)
+
+# A hit answers in microseconds.
+start = time.perf_counter()
+for _ in range(1000):
+    cache.get(INSTRUCTION, TEXT)
+per_hit = (time.perf_counter() - start) / 1000
+print(f"cache hit: {per_hit * 1e6:.1f} µs")
+assert per_hit < 500e-6
+
+# Survives a restart; least recently used evicted first; entries expire.
+cache.put(INSTRUCTION, "segunda", {"is_valid": False, "output_message": "falta la edad"})
+cache.get(INSTRUCTION, TEXT)
+cache.put(INSTRUCTION, "tercera", {"is_valid": False, "output_message": "falta el nombre"})
+restored = ValidationCache(path, max_entries=2, ttl=3600, clock=lambda: now[0])
+assert restored.get(INSTRUCTION, TEXT) == RESULT and restored.get(INSTRUCTION, "segunda") is None
+now[0] += 3601
+assert ValidationCache(path, clock=lambda: now[0]).get(INSTRUCTION, TEXT) is None
+assert "hit rate" in cache.describe()
+
+
+# On the event loop, a burst of puts is written once, off the loop; close writes what is pending.
+async def burst():
+    cache = ValidationCache(path, max_entries=100, save_delay=60, clock=lambda: now[0])
+    for n in range(50):
+        cache.put(INSTRUCTION, f"presentación {n}", RESULT)
+    assert cache._saver.writes == 0
+    await cache.close()
+    assert cache._saver.writes == 1
+
+asyncio.run(burst())
+assert ValidationCache(path, max_entries=100, clock=lambda: now[0]).get(INSTRUCTION, "presentación 49") == RESULT
+print("validation cache OK")
@@ -0,0 +1,173 @@
+import json
+import time
+from email.parser import BytesParser
+from email.policy import HTTP
+from urllib.parse import parse_qs, urlparse
+
+import httplib2
+from googleapiclient.discovery import build
+
+from services.youtube_service import QuotaAccountant, YouTubeService
+
+
+LATENCY = 0.05      # seconds per HTTP round-trip
+SONGS = 10
+VIDEO_IDS = [f"video{n:05d}A" for n in range(SONGS)]
+
+
+class RecordingHttp:
+    """Mock transport: answers playlistItems list/insert and batch requests, recording every round-trip.
+
+    Like the API, an insert with a position past the end of the playlist is refused, and so is any
+    position when the playlist is not sorted manually; ``reverse_batch`` runs batched calls last first.
+    """
+
+    def __init__(self, playlist_length=7, fail=(), existing=None, fail_batch=False, manual_sort=True,
+                 reverse_batch=False):
+        self.round_trips = []
+        self.fail_batch = fail_batch
+        self.inserts = []
+        self.playlist = [f"old{n:08d}" for n in range(playlist_length)]
+        self.manual_sort = manual_sort
+        self.reverse_batch = reverse_batch
+        self.fail = set(fail)
+        self.existing = existing or {}      # video_id ➜ publishedAt of an item already in the playlist
+
+    def request(self, uri, method="GET", body=None, headers=None, redirections=5, connection_type=None):
+        self.round_trips.append((method, uri.split("?")[0]))
+        time.sleep(LATENCY)
+        if "/batch" in uri:
+            if self.fail_batch:
+                return self._json(400, {"error": {"code": 400, "errors": [{"reason": "badRequest"}]}})
+            return self._batch(body, headers)
+        return self._call(method, uri, body)
+
+    def _call(self, method, uri, body):
+        if method == "GET":
+            video_id = parse_qs(urlparse(uri).query).get("videoId", [None])[0]
+            items = []
+            if video_id in self.existing:
+                items.append({"id": f"item-{video_id}", "snippet": {"publishedAt": self.existing[video_id]}})
+            return self._json(200, {"pageInfo": {"totalResults": len(self.playlist)}, "items": items})
+        snippet = json.loads(body)["snippet"]
+        video_id = snippet["resourceId"]["videoId"]
+        position = snippet.get("position")
+        if video_id in self.fail:
+            return self._json(404, {"error": {"code": 404, "errors": [{"reason": "videoNotFound"}]}})
+        if position is not None and not self.manual_sort:
+            return self._json(400, {"error": {"code": 400, "errors": [{"reason": "manualSortRequired"}]}})
+        if position is not None and position > len(self.playlist):
+            return self._json(400, {"error": {"code": 400, "errors": [{"reason": "invalidPlaylistItemPosition"}]}})
+        self.playlist.insert(len(self.playlist) if position is None else position, video_id)
+        self.inserts.append((position, video_id))
+        return self._json(200, {"id": f"item-{video_id}", "snippet": snippet})
+
+    def _batch(self, body, headers):
+        if isinstance(body, str):
+            body = body.encode()
+        message = BytesParser(policy=HTTP).parsebytes(
+            f"Content-Type: {headers['content-type']}\r\n\r\n".encode() + body
+        )
+        boundary = "batch_response"
+        parts = []
+        calls = list(message.iter_parts())
+        for part in reversed(calls) if self.reverse_batch else calls:
+            inner = part.get_payload(decode=True).decode()
+            request_line, _, rest = inner.partition("\r\n" if "\r\n" in inner else "\n")
+            method, path, _ = request_line.split(" ", 2)
+            inner_body = rest.split("\r\n\r\n", 1)[-1] if "\r\n\r\n" in rest else rest.split("\n\n", 1)[-1]
+            resp, content = self._call(method, path, inner_body)
+            parts.append(
+                f"--{boundary}\r\n"
+                f"Content-Type: application/http\r\n"
+                f"Content-ID: <response-{part['Content-ID'][1:-1]}>\r\n\r\n"
+                f"HTTP/1.1 {resp.status} OK\r\nContent-Type: application/json\r\n\r\n"
+                f"{content.decode()}\r\n"
+            )
+        data = ("".join(parts) + f"--{boundary}--\r\n").encode()
+        return httplib2.Response({"status": "200", "content-type": f"multipart/mixed; boundary={boundary}"}), data
+
+    @staticmethod
+    def _json(status, payload):
+        return httplib2.Response({"status": str(status), "content-type": "application/json"}), json.dumps(payload).encode()
+
+
+def service(http, daily_limit=10_000):
+    client = build("youtube", "v3", http=http, developerKey="test", static_discovery=True)
+    return YouTubeService("unused", "unused", "PLtest", quota=QuotaAccountant(daily_limit), client=client)
+
+
+# One round-trip per song, the way the dispatcher sent them before.
+http = RecordingHttp()
+yt = service(http)
+start = time.perf_counter()
+for video_id in VIDEO_IDS:
+    yt.add_video_to_playlist(video_id)
+single_time = time.perf_counter() - start
+assert len(http.round_trips) == SONGS
+
+# The same songs in one batch: the playlist length lookup plus one batch request.
+http = RecordingHttp(playlist_length=7)
+yt = service(http)
+start = time.perf_counter()
+results = yt.add_videos_to_playlist(VIDEO_IDS)
+batch_time = time.perf_counter() - start
+print(f"{SONGS} songs: {single_time:.2f}s one by one, {batch_time:.2f}s batched")
+assert len(http.round_trips) == 2
+assert [error for _, error in results] == [None] * SONGS
+assert [response["id"] for response, _ in results] == [f"item-{v}" for v in VIDEO_IDS]
+# Explicit positions keep the dispatch order whatever order the API runs the calls in
+assert sorted(http.inserts) == [(7 + n, v) for n, v in enumerate(VIDEO_IDS)] and http.playlist[7:] == VIDEO_IDS
+assert batch_time < single_time / 3
+assert yt.quota.spent == 1 + 50 * SONGS
+
+# Per-item failures are reported in place; the other songs still go in, in order: the
+# positions after the failed one are past the end, so those songs are appended one by one.
+http = RecordingHttp(fail={VIDEO_IDS[3]})
+results = service(http).add_videos_to_playlist(VIDEO_IDS)
+assert [error is None for _, error in results] == [n != 3 for n in range(SONGS)]
+assert http.playlist[7:] == VIDEO_IDS[:3] + VIDEO_IDS[4:]
+assert len(http.round_trips) == 2 + 6
+
+# The API running the calls out of order: positions not reached yet are appended afterwards.
+http = RecordingHttp(reverse_batch=True)
+results = service(http).add_videos_to_playlist(VIDEO_IDS)
+assert [error for _, error in results] == [None] * SONGS and http.playlist[7:] == VIDEO_IDS
+
+# A playlist not sorted manually refuses positions: the songs are appended one by one,
+# and later calls do not try a batch again.
+http = RecordingHttp(manual_sort=False)
+yt = service(http)
+results = yt.add_videos_to_playlist(VIDEO_IDS[:5])
+assert [error for _, error in results] == [None] * 5 and http.playlist[7:] == VIDEO_IDS[:5]
+assert not yt.positions_supported
+http.round_trips.clear()
+results = yt.add_videos_to_playlist(VIDEO_IDS[5:])
+assert [error for _, error in results] == [None] * 5 and http.playlist[7:] == VIDEO_IDS
+assert http.round_trips == [("POST", http.round_trips[0][1])] * 5 and "/batch" not in http.round_trips[0][1]
+
+# Only what the quota can pay for is sent.
+http = RecordingHttp()
+results = service(http, daily_limit=1 + 50 * 4).add_videos_to_playlist(VIDEO_IDS)
+assert [type(error).__name__ if error else None for _, error in results] == [None] * 4 + ["QuotaExhaustedError"] * 6
+assert len(http.inserts) == 4
+
+# If the batch request itself fails, the affordable videos go one by one, each charged once.
+http = RecordingHttp(fail_batch=True)
+yt = service(http, daily_limit=1 + 50 * 4)
+results = yt.add_videos_to_playlist(VIDEO_IDS)
+assert [type(error).__name__ if error else None for _, error in results] == [None] * 4 + ["QuotaExhaustedError"] * 6
+assert http.inserts == [(None, v) for v in VIDEO_IDS[:4]]
+assert yt.quota.spent == 1 + 50 * 4
+
+# A retry does not insert again a video an earlier attempt already added.
+http = RecordingHttp(existing={VIDEO_IDS[0]: "2025-04-29T15:30:05Z", VIDEO_IDS[1]: "2025-04-28T10:00:00Z"})
+yt = service(http)
+first_attempt = 1745940600      # 2025-04-29 15:30 UTC
+assert yt.add_video_to_playlist_once(VIDEO_IDS[0], first_attempt)["id"] == f"item-{VIDEO_IDS[0]}"
+assert http.inserts == []
+# ...but the same video added before the first attempt (another team's request) does not count
+yt.add_video_to_playlist_once(VIDEO_IDS[1], first_attempt)
+assert [video_id for _, video_id in http.inserts] == [VIDEO_IDS[1]]
+
+print("youtube batch OK")
@@ -0,0 +1,147 @@
+import json
+import tempfile
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
+
+from services.youtube_service import QUOTA_TIMEZONE, QuotaAccountant, QuotaExhaustedError, YouTubeService
+
+
+class StubYouTube(BaseHTTPRequestHandler):
+    """Local stand-in for the Data API playlistItems endpoint with its own daily quota."""
+
+    quota_left = 0          # units the "server" still accepts today
+    failures = []           # (status, reason) answers to give before succeeding
+    requests = 0
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        cls = type(self)
+        cls.requests += 1
+        if cls.failures:
+            self._reply(*cls.failures.pop(0))
+        elif cls.quota_left < 50:
+            self._reply(403, "quotaExceeded")
+        else:
+            cls.quota_left -= 50
+            self._reply(200, None)
+
+    def _reply(self, status, reason):
+        if reason is None:
+            body = {"kind": "youtube#playlistItem", "id": f"item-{type(self).requests}"}
+        else:
+            body = {"error": {"code": status, "message": reason, "errors": [{"reason": reason}]}}
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+def reset_server(quota_left, failures=()):
+    StubYouTube.quota_left = quota_left
+    StubYouTube.failures = list(failures)
+    StubYouTube.requests = 0
+
+
+server = ThreadingHTTPServer(("127.0.0.1", 0), StubYouTube)
+threading.Thread(target=server.serve_forever, daemon=True).start()
+client = build(
+    "youtube", "v3",
+    developerKey="test",
+    client_options={"api_endpoint": f"http://127.0.0.1:{server.server_port}/"},
+    static_discovery=True,
+)
+
+
+def service(daily_limit=10_000):
+    return YouTubeService("unused", "unused", "PLtest", quota=QuotaAccountant(daily_limit),
+                          backoff_base=0.01, client=client)
+
+
+# Transient 503/429 answers are retried with backoff; every attempt is charged.
+reset_server(10_000, failures=[(503, "backendError"), (429, "rateLimitExceeded")])
+yt = service()
+assert yt.add_video_to_playlist("dQw4w9WgXcQ")["id"] == "item-3"
+assert StubYouTube.requests == 3
+assert yt.quota.spent == 150
+
+# Other 403s are not retried.
+reset_server(10_000, failures=[(403, "forbidden")])
+yt = service()
+try:
+    yt.add_video_to_playlist("dQw4w9WgXcQ")
+    raise AssertionError("forbidden should not succeed")
+except HttpError as exc:
+    assert exc.resp.status == 403
+assert StubYouTube.requests == 1
+
+# The server runs out of quota before our count does: the budget is marked spent
+# and later calls fail without reaching the API.
+reset_server(150)
+yt = service()
+for _ in range(3):
+    yt.add_video_to_playlist("dQw4w9WgXcQ")
+for _ in range(2):
+    try:
+        yt.add_video_to_playlist("dQw4w9WgXcQ")
+        raise AssertionError("quota should be exhausted")
+    except QuotaExhaustedError:
+        pass
+assert StubYouTube.requests == 4
+assert yt.quota.remaining() == 0
+
+# Our own count runs out first: nothing is sent.
+reset_server(10_000)
+yt = service(daily_limit=100)
+yt.add_video_to_playlist("dQw4w9WgXcQ")
+yt.add_video_to_playlist("dQw4w9WgXcQ")
+try:
+    yt.add_video_to_playlist("dQw4w9WgXcQ")
+    raise AssertionError("local quota should be exhausted")
+except QuotaExhaustedError:
+    pass
+assert StubYouTube.requests == 2
+
+# The count starts over at midnight Pacific time.
+now = [datetime(2025, 4, 29, 23, 59, tzinfo=QUOTA_TIMEZONE).timestamp()]
+quota = QuotaAccountant(100, clock=lambda: now[0])
+quota.exhaust()
+assert quota.remaining() == 0 and quota.seconds_until_reset() == 60
+now[0] += 61
+assert quota.remaining() == 100
+
+# The count is saved atomically while the worker spends and the event loop reads it:
+# a restart finds every unit spent, never a torn file.
+state_file = Path(tempfile.mkdtemp()) / "youtube_quota.json"
+quota = QuotaAccountant(10_000_000, state_file=state_file)
+
+
+def spender():
+    for _ in range(200):
+        quota.spend(50)
+
+
+def reader():
+    for _ in range(200):
+        spent = 10_000_000 - quota.remaining()
+        assert QuotaAccountant(10_000_000, state_file=state_file).spent >= spent
+
+threads = [threading.Thread(target=spender) for _ in range(4)] + [threading.Thread(target=reader)]
+for thread in threads:
+    thread.start()
+for thread in threads:
+    thread.join()
+assert QuotaAccountant(10_000_000, state_file=state_file).spent == quota.spent == 4 * 200 * 50
+assert json.loads(state_file.read_text())["spent"] == 40_000 and not state_file.with_suffix(".tmp").exists()
+
+server.shutdown()
+print("youtube quota OK")
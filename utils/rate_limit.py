@@ -0,0 +1,45 @@
+import asyncio
+import time
+from typing import Callable
+
+
+class TokenBucket:
+    """Token-bucket rate limiter.
+
+    Tokens accrue at ``rate`` per second up to ``capacity`` (the burst size);
+    each operation spends one or more of them. ``try_acquire`` never waits,
+    ``acquire`` suspends the calling coroutine until the tokens are there, so
+    waiting for the bucket never blocks the event loop.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1, clock: Callable[[], float] = time.monotonic) -> None:
+        if rate <= 0 or capacity < 1:
+            raise ValueError("TokenBucket needs rate > 0 and capacity >= 1")
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self._tokens = float(capacity)
+        self._updated = clock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def delay(self, tokens: float = 1) -> float:
+        """Seconds until *tokens* are available (0 if they already are)."""
+        self._refill()
+        return max(0.0, (tokens - self._tokens) / self.rate)
+
+    def try_acquire(self, tokens: float = 1) -> bool:
+        """Spend *tokens* if available right now; return whether they were."""
+        self._refill()
+        if self._tokens < tokens:
+            return False
+        self._tokens -= tokens
+        return True
+
+    async def acquire(self, tokens: float = 1) -> None:
+        """Wait (asynchronously) until *tokens* can be spent, then spend them."""
+        while not self.try_acquire(tokens):
+            await asyncio.sleep(self.delay(tokens))
@@ -0,0 +1,160 @@
+import asyncio
+import json
+import os
+from pathlib import Path
+from typing import Any, Callable, Optional, TextIO, Union
+
+# Project‑wide logger helper
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+PathLike = Union[str, Path]
+
+
+def write_atomic(path: PathLike, write: Callable[[TextIO], Any], fsync: bool = False) -> None:
+    """
+    Replace *path* with what *write* puts in a file, atomically.
+
+    The content goes to ``<path>.tmp`` first, which then replaces *path*, so
+    a crash leaves either the old file or the new one, never half of it.
+
+    Args:
+        path (str | Path): The file to write.
+        write (Callable): ``write(fh)``, fills the open text file.
+        fsync (bool): Flush the temporary file to disk before the replace.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    with tmp_path.open("w", encoding="utf-8") as fh:
+        write(fh)
+        if fsync:
+            fh.flush()
+            os.fsync(fh.fileno())
+    os.replace(tmp_path, path)
+
+
+def save_json(path: PathLike, data: Any, fsync: bool = False, **dump_options: Any) -> None:
+    """
+    Write *data* as JSON to *path*, atomically (see :func:`write_atomic`).
+
+    Args:
+        path (str | Path): The file to write.
+        data: Anything ``json.dump`` accepts (with *dump_options*).
+        fsync (bool): Flush the file to disk before it replaces the old one.
+        **dump_options: Extra ``json.dump`` arguments (``separators``, ``default``...).
+    """
+    dump_options.setdefault("ensure_ascii", False)
+    write_atomic(path, lambda fh: json.dump(data, fh, **dump_options), fsync)
+
+
+def load_json(path: Optional[PathLike], description: str) -> Any:
+    """
+    The JSON stored in *path*, or None if there is none.
+
+    A file that cannot be read or parsed is logged and treated as missing:
+    state files are caches of what the bot can rebuild or do without.
+
+    Args:
+        path (str | Path, optional): The file to read (None: nothing stored).
+        description (str): What the file holds, for the log ("Message index"...).
+
+    Returns:
+        The parsed JSON, or None.
+    """
+    if path is None or not Path(path).exists():
+        return None
+    try:
+        with Path(path).open("r", encoding="utf-8") as fh:
+            return json.load(fh)
+    except (OSError, ValueError) as exc:
+        logger.error("%s %s unreadable, ignoring it: %s", description, path, exc)
+        return None
+
+
+class DebouncedSave:
+    """
+    Saves of one JSON state file, coalesced and written off the event loop.
+
+    ``request`` marks the state as changed; ``delay`` seconds later the
+    state is taken (``snapshot()``, on the event loop, so it is consistent)
+    and written by :func:`save_json` in a worker thread. Any number of
+    changes within the delay cost one write, and the loop never waits for
+    the disk. One write runs at a time, so an older snapshot never replaces
+    a newer one. A crash loses at most the last ``delay`` seconds of changes.
+
+    Without a running event loop (scripts, synchronous tests) every request
+    is written at once, as before. Call ``flush`` on shutdown.
+    """
+
+    def __init__(self, path: PathLike, snapshot: Callable[[], Any], delay: float = 0.5, **dump_options: Any) -> None:
+        """
+        Args:
+            path (str | Path): The file to write.
+            snapshot (Callable): ``snapshot()``, the JSON data to write; must not be mutated afterwards.
+            delay (float): Seconds changes are collected before a write.
+            **dump_options: Extra ``json.dump`` arguments.
+        """
+        self.path = Path(path)
+        self.snapshot = snapshot
+        self.delay = delay
+        self.dump_options = dump_options
+        self.writes = 0
+        self._dirty = False
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._writer: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def request(self) -> None:
+        """Note that the state changed; it is written within ``delay`` seconds."""
+        self._dirty = True
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._write_now()
+            return
+        if loop is not self._loop:
+            # first use, or the loop a pending timer was on has gone
+            self._loop, self._timer, self._writer = loop, None, None
+        if self._timer is None and self._writer is None:
+            self._timer = loop.call_later(self.delay, self._start_write)
+
+    async def flush(self) -> None:
+        """Write any pending change now and wait until it is on disk."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._writer is not None:
+            await asyncio.gather(self._writer, return_exceptions=True)
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if self._dirty:
+            self._dirty = False
+            self.writes += 1
+            await asyncio.to_thread(save_json, self.path, self.snapshot(), **self.dump_options)
+
+    # ------------------------------------------------------------------
+
+    def _write_now(self) -> None:
+        self._dirty = False
+        self.writes += 1
+        save_json(self.path, self.snapshot(), **self.dump_options)
+
+    def _start_write(self) -> None:
+        self._timer = None
+        self._dirty = False
+        self.writes += 1
+        self._writer = asyncio.get_running_loop().create_task(
+            asyncio.to_thread(save_json, self.path, self.snapshot(), **self.dump_options)
+        )
+        self._writer.add_done_callback(self._written)
+
+    def _written(self, writer: asyncio.Task) -> None:
+        self._writer = None
+        if not writer.cancelled() and writer.exception() is not None:
+            logger.error("Could not write %s: %s", self.path, writer.exception())
+            self._dirty = True
+        if self._dirty and self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.delay, self._start_write)
@@ -1,5 +1,4 @@
-import re
+from services.video_id import extract_video_ids
 
 def is_youtube_link(link):
-    regex = r'(https?://(?:www\.)?youtube\.com/watch\?v=[\w-]+|https?://youtu\.be/[\w-]+)'
-    return re.match(regex, link) is not None
+    return len(extract_video_ids(link)) == 1
@@ -9,7 +9,8 @@ WARNING_MESSAGES = {
     "unwanted_channel": "Error: No puedes escribir en este canal.",
     "invalid_message": "Error: El mensaje enviado no es un link de Youtube, o no tiene el formato correcto.",
     "delete_dispatched_song": "Error: La canción ya se ha enviado a la playlist, no se puede eliminar mas.",
-    "edit_dispatched_song": "Error: La canción ya se ha enviado a la playlist, no se puede editar mas."
+    "edit_dispatched_song": "Error: La canción ya se ha enviado a la playlist, no se puede editar mas.",
+    "flooding": "Error: Estás enviando demasiados mensajes seguidos; los últimos se han borrado. Espera un poco."
 }
 
 async def warn_user( 